@@ -0,0 +1 @@
+"""Benchmarks de rendimiento del solver y de GameState"""
@@ -0,0 +1,135 @@
+"""Compara la memoria y la velocidad de GameState y CompactGameState.
+
+Uso:
+    python -m benchmarks.backends
+    python -m benchmarks.backends --size 100 --density 0.3 --repeat 3
+    python -m benchmarks.backends --board benchmarks/corpus/50x50_dense_1.txt
+
+Por defecto genera un tablero de 100x100 (siempre el mismo para una semilla).
+Mide la memoria del estado cargado y con la mitad de la solución colocada,
+el tiempo de carga y de copy(), las operaciones por segundo de
+can_add_bridge, add_bridge y check_victory y el tiempo de resolución.
+"""
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+
+from hashi import AutoPlayer, GameState
+from hashi.compact import CompactGameState
+from hashi.generator import random_layout
+
+from benchmarks.bench import ops_per_second
+
+BACKENDS = {"listas": GameState, "compacto": CompactGameState}
+
+
+def _load(backend, board, filename):
+    return backend(filename) if filename else backend.from_board(board)
+
+
+def _memory(build):
+    """Bytes que siguen reservados tras build() (lo que ocupa el objeto que devuelve)"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used, result
+
+
+def bench_backend(backend, board, filename, solution, repeat, count=20000):
+    """Medidas de un backend; solution son los pasos de una solución del tablero"""
+    load_seconds = min(_timed(lambda: _load(backend, board, filename)) for _ in range(repeat))
+    empty_bytes, state = _memory(lambda: _load(backend, board, filename))
+
+    def place_half():
+        for start, end, _ in solution[:len(solution) // 2]:
+            state.add_bridge(start, end)
+    half_bytes, _ = _memory(place_half)
+    copy_seconds = min(_timed(state.copy) for _ in range(repeat))
+
+    pairs = list(state.edges)
+    free_pairs = [pair for edge_id, pair in enumerate(pairs) if not state.edge_counts[edge_id]]
+
+    def can_add(n):
+        for i in range(n):
+            start, end = pairs[i % len(pairs)]
+            state.can_add_bridge(start, end)
+
+    def add_remove(n):
+        for i in range(n // 2):
+            start, end = free_pairs[i % len(free_pairs)]
+            state.add_bridge(start, end)
+            state.remove_bridge(start, end)
+
+    def victory(n):
+        for _ in range(n):
+            state.check_victory()
+
+    state.reset()
+    player = AutoPlayer(state)
+    solve_seconds = _timed(player.solve)
+    return {
+        "state_bytes": empty_bytes,
+        "bridges_bytes": half_bytes,
+        "load_seconds": load_seconds,
+        "copy_seconds": copy_seconds,
+        "can_add_bridge": ops_per_second(can_add, count, repeat),
+        "add_bridge": ops_per_second(add_remove, count, repeat),
+        "check_victory": ops_per_second(victory, count, repeat),
+        "solve_seconds": solve_seconds,
+        "solved": state.check_victory(),
+    }
+
+
+def _timed(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memoria y velocidad de los backends de GameState")
+    parser.add_argument("--board", help="Archivo de tablero (por defecto se genera uno)")
+    parser.add_argument("--size", type=int, default=100, help="Lado del tablero generado")
+    parser.add_argument("--density", type=float, default=0.3, help="Densidad del tablero generado")
+    parser.add_argument("--seed", type=int, default=1, help="Semilla del tablero generado")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por medida (se toma la mejor)")
+    args = parser.parse_args(argv)
+
+    board = None
+    if not args.board:
+        board, _ = random_layout(args.size, args.size, args.density, random.Random(f"{args.size}-{args.seed}"),
+                                 min_islands=int(args.size * args.size * args.density / 3))
+    reference = _load(GameState, board, args.board)
+    player = AutoPlayer(reference)
+    if not player.solve():
+        print("El tablero no tiene solución", file=sys.stderr)
+        return 1
+    solution = player.solution_steps
+    print(f"Tablero {reference.rows}x{reference.cols}: {len(reference.islands)} islas, "
+          f"{len(reference.edges)} aristas, {len(solution)} puentes en la solución")
+
+    results = {name: bench_backend(backend, board, args.board, solution, args.repeat)
+               for name, backend in BACKENDS.items()}
+    rows = (
+        ("Memoria del estado (KiB)", "state_bytes", lambda value: f"{value / 1024:.0f}"),
+        ("Memoria de la mitad de los puentes (KiB)", "bridges_bytes", lambda value: f"{value / 1024:.0f}"),
+        ("Carga (ms)", "load_seconds", lambda value: f"{value * 1000:.1f}"),
+        ("copy() (ms)", "copy_seconds", lambda value: f"{value * 1000:.2f}"),
+        ("can_add_bridge (ops/s)", "can_add_bridge", lambda value: f"{value:.0f}"),
+        ("add_bridge + remove_bridge (ops/s)", "add_bridge", lambda value: f"{value:.0f}"),
+        ("check_victory (ops/s)", "check_victory", lambda value: f"{value:.0f}"),
+        ("Resolución (s)", "solve_seconds", lambda value: f"{value:.2f}"),
+    )
+    print(f"{'':42s}" + "".join(f"{name:>12s}" for name in BACKENDS))
+    for label, key, fmt in rows:
+        print(f"{label:42s}" + "".join(f"{fmt(results[name][key]):>12s}" for name in BACKENDS))
+    return 0 if all(result["solved"] for result in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
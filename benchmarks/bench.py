@@ -0,0 +1,192 @@
+"""Benchmarks del solver y de las operaciones de GameState.
+
+Uso:
+    python -m benchmarks.bench --save benchmarks/baseline.json
+    python -m benchmarks.bench --compare benchmarks/baseline.json --threshold 0.25
+
+Para cada tablero del corpus mide el tiempo de AutoPlayer.solve(), los nodos
+de búsqueda, los nodos por segundo y el pico de memoria. Además mide
+operaciones por segundo de can_add_bridge, add_bridge y check_victory. Al
+comparar con una línea base, cualquier medida que empeore más que el umbral
+cuenta como fallo (código de salida 1).
+"""
+
+import argparse
+import datetime
+import glob
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from hashi import AutoPlayer, GameState
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+# Tablero usado en los microbenchmarks (el más grande del corpus)
+MICRO_BOARD = "50x50_dense_1.txt"
+
+
+def _solve_once(filename):
+    """Resuelve un tablero desde cero y devuelve (segundos, estadísticas, resuelto)"""
+    state = GameState(filename)
+    player = AutoPlayer(state)
+    start = time.perf_counter()
+    solved = player.solve()
+    elapsed = time.perf_counter() - start
+    return elapsed, player.stats, solved
+
+
+def bench_solve(filename, repeat):
+    """Mejor tiempo de varias repeticiones y pico de memoria de una ejecución aparte"""
+    times = []
+    stats = None
+    solved = False
+    for _ in range(repeat):
+        elapsed, stats, solved = _solve_once(filename)
+        times.append(elapsed)
+
+    # tracemalloc ralentiza la ejecución: la memoria se mide sin contar en el tiempo
+    tracemalloc.start()
+    _solve_once(filename)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = min(times)
+    return {
+        "solved": solved,
+        "seconds": best,
+        "nodes": stats.nodes,
+        "nodes_per_second": stats.nodes / best if best > 0 else 0.0,
+        "backtracks": stats.backtracks,
+        "max_depth": stats.max_depth,
+        "peak_memory_bytes": peak,
+    }
+
+
+def ops_per_second(operation, count, repeat):
+    """Operaciones por segundo (mejor de repeat tandas de count llamadas)"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        operation(count)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return count / best if best > 0 else 0.0
+
+
+def bench_micro(filename, repeat, count=20000):
+    """Microbenchmarks de GameState sobre un tablero resuelto a medias"""
+    state = GameState(filename)
+    player = AutoPlayer(state)
+    player.solve()
+    # Dejar la mitad de los puentes para que las comprobaciones tengan trabajo real
+    steps = player.solution_steps
+    state.reset()
+    for start, end, _ in steps[:len(steps) // 2]:
+        state.add_bridge(start, end)
+    pairs = [(start, end) for start, end in state.edges]
+
+    def can_add(n):
+        for i in range(n):
+            start, end = pairs[i % len(pairs)]
+            state.can_add_bridge(start, end)
+
+    # Aristas todavía sin puente: agregar y quitar uno no altera el tablero
+    free_pairs = [pair for edge_id, pair in enumerate(pairs) if not state.edge_counts[edge_id]]
+
+    def add_remove(n):
+        for i in range(n // 2):
+            start, end = free_pairs[i % len(free_pairs)]
+            state.add_bridge(start, end)
+            state.remove_bridge(start, end)
+
+    def victory(n):
+        for _ in range(n):
+            state.check_victory()
+
+    return {
+        "can_add_bridge": ops_per_second(can_add, count, repeat),
+        "add_bridge": ops_per_second(add_remove, count, repeat),
+        "check_victory": ops_per_second(victory, count, repeat),
+    }
+
+
+def run(corpus, repeat, pattern="*.txt"):
+    """Ejecuta todos los benchmarks y devuelve el resultado serializable"""
+    files = sorted(glob.glob(os.path.join(corpus, pattern)))
+    results = {
+        "meta": {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+        },
+        "solve": {},
+        "micro": {},
+    }
+    for filename in files:
+        name = os.path.basename(filename)
+        results["solve"][name] = bench_solve(filename, repeat)
+        entry = results["solve"][name]
+        print(f"{name:28s} {entry['seconds'] * 1000:9.1f} ms {entry['nodes']:7d} nodos "
+              f"{entry['nodes_per_second']:10.0f} nodos/s {entry['peak_memory_bytes'] / 1024:9.0f} KiB")
+
+    micro_board = os.path.join(corpus, MICRO_BOARD)
+    if os.path.exists(micro_board):
+        results["micro"] = bench_micro(micro_board, repeat)
+        for name, ops in results["micro"].items():
+            print(f"{name:28s} {ops:12.0f} ops/s")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Lista de regresiones: medidas que empeoran más que threshold (fracción)"""
+    regressions = []
+    for name, entry in results["solve"].items():
+        base = baseline.get("solve", {}).get(name)
+        if not base:
+            continue
+        if base["solved"] and not entry["solved"]:
+            regressions.append(f"{name}: ya no se resuelve")
+        if base["seconds"] > 0 and entry["seconds"] > base["seconds"] * (1 + threshold):
+            regressions.append(f"{name}: {base['seconds'] * 1000:.1f} ms -> {entry['seconds'] * 1000:.1f} ms")
+    for name, ops in results["micro"].items():
+        base = baseline.get("micro", {}).get(name)
+        if base and ops < base / (1 + threshold):
+            regressions.append(f"{name}: {base:.0f} -> {ops:.0f} ops/s")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del solver de Hashiwokakero")
+    parser.add_argument("--corpus", default=CORPUS_DIR, help="Directorio con los tableros")
+    parser.add_argument("--pattern", default="*.txt", help="Filtro de tableros dentro del corpus")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por medida (se toma la mejor)")
+    parser.add_argument("--save", help="Guardar los resultados como línea base JSON")
+    parser.add_argument("--compare", help="Línea base JSON con la que comparar")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Empeoramiento relativo que cuenta como fallo (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    results = run(args.corpus, args.repeat, args.pattern)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regresiones (umbral {args.threshold:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nSin regresiones respecto a {args.compare} (umbral {args.threshold:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,34 @@
+"""Genera el corpus de benchmarks (determinista: mismas semillas, mismos tableros).
+
+Uso:
+    python -m benchmarks.make_corpus
+"""
+
+import os
+import random
+
+from hashi.generator import format_board, random_layout
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+SIZES = (7, 10, 15, 20, 30, 40, 50)
+DENSITIES = {"sparse": 0.2, "medium": 0.3, "dense": 0.45}
+SEEDS = (1, 2)
+
+
+def main():
+    os.makedirs(CORPUS_DIR, exist_ok=True)
+    for size in SIZES:
+        for name, density in DENSITIES.items():
+            for seed in SEEDS:
+                # Al menos un tercio de las islas colocadas en el tablero final
+                min_islands = int(size * size * density / 3)
+                board, _ = random_layout(size, size, density, random.Random(f"{size}-{name}-{seed}"),
+                                         min_islands=min_islands)
+                filename = os.path.join(CORPUS_DIR, f"{size:02d}x{size:02d}_{name}_{seed}.txt")
+                with open(filename, "w") as f:
+                    f.write(format_board(board))
+                print(filename)
+
+
+if __name__ == "__main__":
+    main()
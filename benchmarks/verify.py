@@ -0,0 +1,102 @@
+"""Compara la verificación por lotes con un bucle de check_victory.
+
+Uso:
+    python -m benchmarks.verify
+    python -m benchmarks.verify --size 30 --candidates 10000
+    python -m benchmarks.verify --board benchmarks/corpus/50x50_dense_1.txt
+
+Genera candidatos a partir de la solución del tablero (la solución, la
+solución con algunas aristas cambiadas y asignaciones al azar), los
+comprueba con BatchVerifier y uno a uno con el setter bridges más
+check_victory, y comprueba que ambos dan el mismo veredicto.
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from hashi import AutoPlayer, GameState
+from hashi.generator import random_layout
+from hashi.verify import BatchVerifier, assignment_matrix
+
+
+def make_candidates(game_state, solution, count, rng):
+    """Lista de count asignaciones por id de arista alrededor de la solución"""
+    edge_total = len(game_state.edges)
+    candidates = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.2:
+            candidate = list(solution)
+        elif kind < 0.8:
+            candidate = list(solution)
+            for _ in range(rng.randint(1, 3)):
+                candidate[rng.randrange(edge_total)] = rng.randint(0, 2)
+        else:
+            candidate = [rng.choice((0, 0, 0, 1, 2)) for _ in range(edge_total)]
+        candidates.append(candidate)
+    return candidates
+
+
+def loop_verify(game_state, candidates):
+    """Veredictos uno a uno con el setter bridges y check_victory (con cruces, como el lote)"""
+    edges = game_state.edges
+    crossings = game_state.edge_crossings
+    verdicts = []
+    for candidate in candidates:
+        crossed = any(count and any(candidate[other] for other in crossings[edge_id])
+                      for edge_id, count in enumerate(candidate))
+        game_state.bridges = [(*edges[edge_id], count) for edge_id, count in enumerate(candidate) if count]
+        verdicts.append(not crossed and game_state.check_victory())
+    return verdicts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verificación por lotes frente a check_victory")
+    parser.add_argument("--board", help="Archivo de tablero (por defecto se genera uno)")
+    parser.add_argument("--size", type=int, default=30, help="Lado del tablero generado")
+    parser.add_argument("--density", type=float, default=0.3, help="Densidad del tablero generado")
+    parser.add_argument("--seed", type=int, default=1, help="Semilla del tablero y de los candidatos")
+    parser.add_argument("--candidates", type=int, default=10000, help="Número de candidatos")
+    args = parser.parse_args(argv)
+
+    if args.board:
+        game_state = GameState(args.board)
+    else:
+        board, _ = random_layout(args.size, args.size, args.density, random.Random(f"{args.size}-{args.seed}"),
+                                 min_islands=int(args.size * args.size * args.density / 3))
+        game_state = GameState.from_board(board)
+    player = AutoPlayer(game_state.copy())
+    if not player.solve():
+        print("El tablero no tiene solución", file=sys.stderr)
+        return 1
+    solution = assignment_matrix(game_state, [player.game_state.bridges])[0].tolist()
+    candidates = make_candidates(game_state, solution, args.candidates, random.Random(args.seed))
+    print(f"Tablero {game_state.rows}x{game_state.cols}: {len(game_state.islands)} islas, "
+          f"{len(game_state.edges)} aristas, {len(candidates)} candidatos")
+
+    start = time.perf_counter()
+    verifier = BatchVerifier(game_state)
+    matrix = assignment_matrix(game_state, candidates)
+    prepare_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    batch = verifier.verify(matrix)
+    batch_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    looped = loop_verify(game_state.copy(), candidates)
+    loop_seconds = time.perf_counter() - start
+
+    print(f"Preparación del lote: {prepare_seconds * 1000:.1f} ms")
+    print(f"Lote: {batch_seconds * 1000:.1f} ms ({len(candidates) / batch_seconds:.0f} candidatos/s)")
+    print(f"Bucle: {loop_seconds * 1000:.1f} ms ({len(candidates) / loop_seconds:.0f} candidatos/s)")
+    print(f"Aceleración: {loop_seconds / batch_seconds:.1f}x, {int(batch.sum())} soluciones válidas")
+    if batch.tolist() != looped:
+        print("Los veredictos no coinciden", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
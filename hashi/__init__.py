@@ -0,0 +1,6 @@
+"""Núcleo de Hashiwokakero sin dependencias de pygame (tablero y solver)"""
+
+from hashi.solver import AutoPlayer, EdgeSolver, TranspositionTable
+from hashi.state import GameState
+
+__all__ = ["AutoPlayer", "EdgeSolver", "GameState", "TranspositionTable"]
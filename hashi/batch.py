@@ -0,0 +1,117 @@
+"""Resolución por lotes de muchos tableros en paralelo (sin pygame).
+
+Uso:
+    python -m hashi.batch board*.txt -o resultados.jsonl -j 8
+
+Escribe una línea JSON por tablero y al final un resumen del rendimiento.
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from hashi.solver import EdgeSolver
+from hashi.state import GameState
+
+
+def solve_file(filename, max_nodes=500000):
+    """Resuelve un tablero y devuelve el resultado como diccionario serializable"""
+    result = {"file": filename}
+    start_time = time.perf_counter()
+    try:
+        state = GameState(filename)
+        load_time = time.perf_counter() - start_time
+        solver = EdgeSolver(state, max_nodes)
+        solved = solver.solve()
+    except (OSError, ValueError, IndexError) as error:
+        result.update(status="error", error=str(error), seconds=time.perf_counter() - start_time)
+        return result
+
+    if solved:
+        status = "solved"
+    elif solver.limit_reached:
+        status = "limit"
+    else:
+        status = "unsolvable"
+    result.update(
+        status=status,
+        rows=state.rows,
+        cols=state.cols,
+        islands=len(state.islands),
+        nodes=solver.nodes,
+        load_seconds=load_time,
+        seconds=time.perf_counter() - start_time,
+        stats=solver.stats.to_dict(),
+    )
+    if solved:
+        result["bridges"] = [[start[0], start[1], end[0], end[1], value]
+                             for (start, end), value in zip(state.edges, solver.values()) if value]
+    return result
+
+
+def expand_patterns(patterns):
+    """Expande comodines (útil en terminales que no lo hacen, como cmd de Windows)"""
+    files = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        files.extend(matches)
+    return files
+
+
+def run_batch(files, output, workers=None, max_nodes=500000):
+    """Resuelve los tableros en un pool de procesos y escribe una línea JSON por tablero"""
+    workers = workers or os.cpu_count() or 1
+    counts = {}
+    solve_time = 0.0
+    start_time = time.perf_counter()
+
+    # Bloques grandes reducen la comunicación entre procesos cuando hay miles de tableros
+    chunksize = max(1, len(files) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(solve_file, files, [max_nodes] * len(files), chunksize=chunksize)
+        for result in results:
+            output.write(json.dumps(result) + "\n")
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+            solve_time += result["seconds"]
+
+    wall_time = time.perf_counter() - start_time
+    return {
+        "puzzles": len(files),
+        "workers": workers,
+        "status": counts,
+        "wall_seconds": wall_time,
+        "cpu_seconds": solve_time,
+        "puzzles_per_second": len(files) / wall_time if wall_time > 0 else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resuelve muchos tableros de Hashiwokakero en paralelo")
+    parser.add_argument("files", nargs="+", help="Archivos de tablero (admite comodines)")
+    parser.add_argument("-o", "--output", default="-", help="Archivo JSON lines de salida (- para stdout)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Procesos (por defecto, todos los núcleos)")
+    parser.add_argument("--max-nodes", type=int, default=500000, help="Límite de nodos de búsqueda por tablero")
+    parser.add_argument("--log-level", default="WARNING", help="Nivel de logging (DEBUG, INFO, WARNING...)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper(), format="%(levelname)s %(name)s: %(message)s")
+
+    files = expand_patterns(args.files)
+    if args.output == "-":
+        summary = run_batch(files, sys.stdout, args.workers, args.max_nodes)
+    else:
+        with open(args.output, "w") as output:
+            summary = run_batch(files, output, args.workers, args.max_nodes)
+
+    status = ", ".join(f"{name}={count}" for name, count in sorted(summary["status"].items()))
+    print(f"{summary['puzzles']} tableros en {summary['wall_seconds']:.2f} s con {summary['workers']} procesos "
+          f"({summary['puzzles_per_second']:.1f} tableros/s; {status})", file=sys.stderr)
+    return 0 if summary["status"].get("error", 0) == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
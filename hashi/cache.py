@@ -0,0 +1,135 @@
+"""Caché persistente de soluciones, compartida por las 8 simetrías del tablero.
+
+Un tablero girado o reflejado tiene las mismas soluciones, transformadas.
+Cada tablero se lleva a su forma canónica (la menor de sus 8 versiones por
+giros de 90° y reflexiones) y la caché guarda la solución en coordenadas
+canónicas con el hash de esa forma como clave. Una consulta desde cualquier
+orientación devuelve la solución transformada de vuelta a la del tablero
+pedido. Los datos van en SQLite (solo biblioteca estándar); si se supera
+max_entries se descartan las soluciones usadas hace más tiempo.
+
+Uso:
+    auto_player.cache = SolutionCache("soluciones.sqlite")
+    auto_player.solve()  # Consulta la caché antes de buscar y guarda lo que encuentra
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+import zlib
+
+logger = logging.getLogger(__name__)
+
+# Archivo de la caché por defecto
+CACHE_FILE = "hashi_soluciones.sqlite"
+# Soluciones que se guardan como máximo (se descartan las usadas hace más tiempo)
+CACHE_MAX_ENTRIES = 1000
+
+# Las 8 simetrías del cuadrado como (trasponer, invertir filas, invertir columnas):
+# primero se invierten filas y columnas y después se traspone
+SYMMETRIES = [(transpose, flip_rows, flip_cols) for transpose in (False, True)
+              for flip_rows in (False, True) for flip_cols in (False, True)]
+
+
+def transform_point(symmetry, rows, cols, point):
+    """Posición de point tras aplicar symmetry a un tablero de rows x cols"""
+    transpose, flip_rows, flip_cols = symmetry
+    row, col = point
+    if flip_rows:
+        row = rows - 1 - row
+    if flip_cols:
+        col = cols - 1 - col
+    return (col, row) if transpose else (row, col)
+
+
+def inverse_point(symmetry, rows, cols, point):
+    """Posición en el tablero original (de rows x cols) de un punto transformado con symmetry"""
+    transpose, flip_rows, flip_cols = symmetry
+    row, col = (point[1], point[0]) if transpose else point
+    if flip_rows:
+        row = rows - 1 - row
+    if flip_cols:
+        col = cols - 1 - col
+    return row, col
+
+
+def canonical_form(game_state):
+    """(simetría, clave): la simetría que lleva el tablero a su forma canónica y el hash de esa forma"""
+    rows, cols = game_state.rows, game_state.cols
+    best_symmetry, best_form = None, None
+    for symmetry in SYMMETRIES:
+        shape = (cols, rows) if symmetry[0] else (rows, cols)
+        islands = sorted(transform_point(symmetry, rows, cols, (row, col)) + (value,)
+                         for row, col, value in game_state.islands)
+        form = (shape, islands)
+        if best_form is None or form < best_form:
+            best_symmetry, best_form = symmetry, form
+    key = hashlib.sha256(json.dumps(best_form, separators=(",", ":")).encode()).hexdigest()
+    return best_symmetry, key
+
+
+class SolutionCache:
+    """Soluciones conocidas en un archivo SQLite, con a lo sumo max_entries tableros"""
+
+    def __init__(self, filename=CACHE_FILE, max_entries=CACHE_MAX_ENTRIES):
+        self.filename = filename
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._connection = sqlite3.connect(filename)
+        with self._connection:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS solutions "
+                                     "(key TEXT PRIMARY KEY, bridges BLOB NOT NULL, used REAL NOT NULL)")
+
+    def lookup(self, game_state, check=None):
+        """Puentes por id de arista de la solución guardada (None si el tablero no está).
+
+        Con check, una función que recibe esos puentes, la entrada solo se
+        usa (y cuenta como acierto) si check devuelve True.
+        """
+        symmetry, key = canonical_form(game_state)
+        row = self._connection.execute("SELECT bridges FROM solutions WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        rows, cols = game_state.rows, game_state.cols
+        values = [0] * len(game_state.edges)
+        for start_row, start_col, end_row, end_col, count in json.loads(zlib.decompress(row[0])):
+            start = inverse_point(symmetry, rows, cols, (start_row, start_col))
+            end = inverse_point(symmetry, rows, cols, (end_row, end_col))
+            edge_id = game_state.edge_ids.get(game_state.edge_key(start, end))
+            if edge_id is None:
+                # Solo pasaría con una colisión del hash o un archivo corrupto
+                logger.warning("Entrada de la caché que no corresponde al tablero: %s", key)
+                self.misses += 1
+                return None
+            values[edge_id] = count
+        if check is not None and not check(values):
+            self.misses += 1
+            return None
+        with self._connection:
+            self._connection.execute("UPDATE solutions SET used = ? WHERE key = ?", (time.time(), key))
+        self.hits += 1
+        return values
+
+    def store(self, game_state, values):
+        """Guarda una solución dada como puentes por id de arista"""
+        symmetry, key = canonical_form(game_state)
+        rows, cols = game_state.rows, game_state.cols
+        bridges = [transform_point(symmetry, rows, cols, start) + transform_point(symmetry, rows, cols, end)
+                   + (count,) for (start, end), count in zip(game_state.edges, values) if count]
+        data = zlib.compress(json.dumps(bridges, separators=(",", ":")).encode())
+        with self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO solutions (key, bridges, used) VALUES (?, ?, ?)",
+                                     (key, data, time.time()))
+            self._connection.execute("DELETE FROM solutions WHERE key NOT IN "
+                                     "(SELECT key FROM solutions ORDER BY used DESC LIMIT ?)", (self.max_entries,))
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+    def close(self):
+        self._connection.close()
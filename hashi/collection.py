@@ -0,0 +1,188 @@
+"""Colecciones de muchos tableros en un solo archivo con índice.
+
+Formato (enteros little-endian):
+    cabecera  MAGIC, versión (uint32), número de tableros (uint32),
+              posición del índice (uint64)
+    cuerpo    por tablero: filas y columnas (uint16) y las celdas en
+              nibbles, dos por byte (el valor de una isla cabe en 4 bits)
+    índice    count + 1 posiciones (uint64); el tablero n ocupa
+              [índice[n], índice[n + 1])
+
+El archivo se abre con mmap: cargar el tablero n solo lee su registro y el
+recorrido completo no guarda más de un tablero a la vez.
+
+Uso:
+    python -m hashi.collection pack board*.txt -o tableros.hcol
+    python -m hashi.collection info tableros.hcol
+    python -m hashi.collection extract tableros.hcol 42
+"""
+
+import argparse
+import mmap
+import operator
+import struct
+import sys
+from array import array
+
+MAGIC = b"HASHICOL"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQ")
+DIMENSIONS = struct.Struct("<HH")
+# Valor máximo de una celda (4 bits por celda)
+MAX_CELL_VALUE = 15
+
+# Byte empaquetado -> (celda par, celda impar)
+_NIBBLES = [(byte & 0x0F, byte >> 4) for byte in range(256)]
+# Valor de celda -> nibble alto
+_HIGH = [value << 4 for value in range(MAX_CELL_VALUE + 1)]
+
+
+def pack_board(board):
+    """Registro binario de un tablero (dimensiones y celdas en nibbles)"""
+    rows = len(board)
+    cols = len(board[0]) if board else 0
+    cells = [value for row in board for value in row]
+    if cells and (min(cells) < 0 or max(cells) > MAX_CELL_VALUE):
+        raise ValueError(f"Valores de celda fuera de rango (0-{MAX_CELL_VALUE})")
+    if len(cells) % 2:
+        cells.append(0)
+    body = bytes(map(operator.or_, cells[0::2], map(_HIGH.__getitem__, cells[1::2])))
+    return DIMENSIONS.pack(rows, cols) + body
+
+
+def unpack_board(data, offset=0):
+    """Matriz del tablero a partir de un registro empaquetado"""
+    rows, cols = DIMENSIONS.unpack_from(data, offset)
+    start = offset + DIMENSIONS.size
+    cells = []
+    for byte in data[start:start + (rows * cols + 1) // 2]:
+        cells.extend(_NIBBLES[byte])
+    return [cells[row * cols:(row + 1) * cols] for row in range(rows)]
+
+
+class CollectionWriter:
+    """Escribe una colección tablero a tablero, sin tenerlos todos en memoria"""
+
+    def __init__(self, filename):
+        self.file = open(filename, "wb")
+        self.offsets = array("Q")
+        self.file.write(HEADER.pack(MAGIC, VERSION, 0, 0))
+
+    def add(self, board):
+        """Añade un tablero al final de la colección"""
+        self.offsets.append(self.file.tell())
+        self.file.write(pack_board(board))
+
+    def close(self):
+        """Escribe el índice y completa la cabecera"""
+        if self.file.closed:
+            return
+        count = len(self.offsets)
+        index_offset = self.file.tell()
+        self.offsets.append(index_offset)
+        if sys.byteorder != "little":
+            self.offsets.byteswap()
+        self.offsets.tofile(self.file)
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, count, index_offset))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class PuzzleCollection:
+    """Acceso aleatorio a los tableros de una colección mediante mmap"""
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.data) < HEADER.size:
+            self.data.close()
+            raise ValueError(f"{filename}: no es una colección de tableros")
+        magic, version, self.count, self.index_offset = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            self.data.close()
+            raise ValueError(f"{filename}: no es una colección de tableros (versión {VERSION})")
+
+    def __len__(self):
+        return self.count
+
+    def offset(self, index):
+        """Posición del registro del tablero index dentro del archivo"""
+        return struct.unpack_from("<Q", self.data, self.index_offset + 8 * index)[0]
+
+    def board(self, index):
+        """Matriz del tablero index (admite índices negativos)"""
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(f"Tablero {index} fuera de rango (0-{self.count - 1})")
+        return unpack_board(self.data, self.offset(index))
+
+    __getitem__ = board
+
+    def game_state(self, index, state_class=None):
+        """Estado del tablero index: un GameState, o de la clase state_class (p. ej. CompactGameState)"""
+        if state_class is None:
+            from hashi.state import GameState
+            state_class = GameState
+        return state_class.from_board(self.board(index))
+
+    def __iter__(self):
+        """Recorre los tableros en orden, uno a la vez"""
+        for index in range(self.count):
+            yield unpack_board(self.data, self.offset(index))
+
+    def close(self):
+        self.data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def pack_files(files, output):
+    """Convierte archivos de tablero (formato board*.txt) en una colección"""
+    from hashi.state import GameState
+    with CollectionWriter(output) as writer:
+        for filename in files:
+            writer.add(GameState(filename).board)
+    return len(files)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Colecciones de tableros de Hashiwokakero")
+    commands = parser.add_subparsers(dest="command", required=True)
+    pack = commands.add_parser("pack", help="Crea una colección a partir de archivos de tablero")
+    pack.add_argument("files", nargs="+", help="Archivos de tablero (admite comodines)")
+    pack.add_argument("-o", "--output", required=True, help="Archivo de colección")
+    info = commands.add_parser("info", help="Muestra el número de tableros")
+    info.add_argument("collection")
+    extract = commands.add_parser("extract", help="Escribe un tablero en el formato de board*.txt")
+    extract.add_argument("collection")
+    extract.add_argument("index", type=int)
+    args = parser.parse_args(argv)
+
+    if args.command == "pack":
+        from hashi.batch import expand_patterns
+        count = pack_files(expand_patterns(args.files), args.output)
+        print(f"{count} tableros en {args.output}", file=sys.stderr)
+    elif args.command == "info":
+        with PuzzleCollection(args.collection) as collection:
+            print(f"{args.collection}: {len(collection)} tableros")
+    else:
+        from hashi.generator import format_board
+        with PuzzleCollection(args.collection) as collection:
+            sys.stdout.write(format_board(collection.board(args.index)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,484 @@
+"""Representación compacta del tablero para tableros grandes.
+
+CompactGameState tiene la misma interfaz que GameState, pero no guarda
+diccionarios ni listas de tuplas por isla o por arista:
+    islas      arrays de filas, columnas y valores (como GameState) y la
+               clave row * cols + col de cada isla, para buscarla por bisección
+    aristas    extremos (índices de isla) y arista vecina en cada dirección
+               en arrays de enteros de 32 bits
+    cruces     formato CSR: un array de ids y otro con el inicio de cada arista
+    puentes    bytearray indexado por id de arista (edge_counts) y grados en
+               un array por isla
+    máscaras   por fila y por columna, las celdas con isla (camino bloqueado)
+               y las cruzadas por algún puente (cruces en O(1))
+islands, edges, edge_ids, island_index, island_edges y edge_crossings son
+vistas que construyen las tuplas al pedirlas. Solo admite puentes entre
+islas vecinas (los demás no caben en edge_counts).
+"""
+
+from array import array
+from bisect import bisect_left
+
+from hashi.state import GameState, _zobrist_keys
+
+
+def _interior(low, high):
+    """Máscara de los bits estrictamente entre low y high"""
+    return ((1 << (high - low - 1)) - 1) << (low + 1)
+
+
+class CompactLayout:
+    """Islas, aristas candidatas y cruces de un tablero en arrays (compartido por las copias)"""
+
+    def __init__(self, rows, cols, island_rows, island_cols, island_values):
+        self.rows = rows
+        self.cols = cols
+        self.island_rows = island_rows
+        self.island_cols = island_cols
+        self.island_values = island_values
+        count = len(island_values)
+        self.keys = array('q', (row * cols + col for row, col in zip(island_rows, island_cols)))
+
+        # Islas por fila y por columna como máscaras de bits
+        self.row_islands = [0] * rows
+        self.col_islands = [0] * cols
+        for row, col in zip(island_rows, island_cols):
+            self.row_islands[row] |= 1 << col
+            self.col_islands[col] |= 1 << row
+
+        # Aristas en el mismo orden que GameState: por isla, primero abajo y luego a la derecha
+        below = array('i', [-1]) * count
+        last_in_col = array('i', [-1]) * cols
+        for i, col in enumerate(island_cols):
+            if last_in_col[col] >= 0:
+                below[last_in_col[col]] = i
+            last_in_col[col] = i
+        self.edge_start = array('i')
+        self.edge_end = array('i')
+        self.up = array('i', [-1]) * count  # Isla -> id de la arista en esa dirección (-1 si no hay)
+        self.down = array('i', [-1]) * count
+        self.left = array('i', [-1]) * count
+        self.right = array('i', [-1]) * count
+        for i in range(count):
+            j = below[i]
+            if j >= 0:
+                self.down[i] = self.up[j] = len(self.edge_start)
+                self.edge_start.append(i)
+                self.edge_end.append(j)
+            if i + 1 < count and island_rows[i + 1] == island_rows[i]:
+                self.right[i] = self.left[i + 1] = len(self.edge_start)
+                self.edge_start.append(i)
+                self.edge_end.append(i + 1)
+
+        # Cruces: una arista vertical cruza, en cada fila intermedia, la horizontal entre
+        # las islas más próximas a cada lado de su columna (si las hay en esa fila)
+        crossings = [[] for _ in range(len(self.edge_start))]
+        for edge_id, (i, j) in enumerate(zip(self.edge_start, self.edge_end)):
+            col = island_cols[i]
+            if island_cols[j] != col:
+                continue
+            for row in range(island_rows[i] + 1, island_rows[j]):
+                mask = self.row_islands[row]
+                before = mask & ((1 << col) - 1)
+                if not before or not mask >> col:
+                    continue
+                other = self.right[self.index(row, before.bit_length() - 1)]
+                crossings[edge_id].append(other)
+                crossings[other].append(edge_id)
+        self.crossing_start = array('i', [0])
+        self.crossing_ids = array('i')
+        for others in crossings:
+            self.crossing_ids.extend(others)
+            self.crossing_start.append(len(self.crossing_ids))
+
+    def index(self, row, col):
+        """Índice de la isla en (row, col) o None"""
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return None
+        key = row * self.cols + col
+        keys = self.keys
+        i = bisect_left(keys, key)
+        return i if i < len(keys) and keys[i] == key else None
+
+    def position(self, i):
+        return self.island_rows[i], self.island_cols[i]
+
+    def edge_between(self, start, end):
+        """Id de la arista entre dos posiciones o None (no son islas vecinas alineadas)"""
+        (row, col), (end_row, end_col) = start, end
+        if row == end_row:
+            low, high = (col, end_col) if col < end_col else (end_col, col)
+            mask = self.row_islands[row] if 0 <= row < self.rows else 0
+            # Las dos celdas tienen isla y no hay ninguna entre ellas
+            if (low < 0 or low == high or not mask >> low & 1 or not mask >> high & 1
+                    or mask & _interior(low, high)):
+                return None
+            return self.right[self.index(row, low)]
+        if col == end_col:
+            low, high = (row, end_row) if row < end_row else (end_row, row)
+            mask = self.col_islands[col] if 0 <= col < self.cols else 0
+            if low < 0 or not mask >> low & 1 or not mask >> high & 1 or mask & _interior(low, high):
+                return None
+            return self.down[self.index(low, col)]
+        return None
+
+
+class _IslandView:
+    """Secuencia de islas (row, col, value) construidas al pedirlas"""
+
+    def __init__(self, layout):
+        self.layout = layout
+
+    def __len__(self):
+        return len(self.layout.island_values)
+
+    def __getitem__(self, i):
+        layout = self.layout
+        if isinstance(i, slice):
+            return [(layout.island_rows[k], layout.island_cols[k], layout.island_values[k])
+                    for k in range(*i.indices(len(self)))]
+        return layout.island_rows[i], layout.island_cols[i], layout.island_values[i]
+
+    def __iter__(self):
+        layout = self.layout
+        return zip(layout.island_rows, layout.island_cols, layout.island_values)
+
+
+class _IslandIndex:
+    """Posición -> índice de isla, por bisección sobre las claves"""
+
+    def __init__(self, layout):
+        self.layout = layout
+
+    def get(self, pos, default=None):
+        i = self.layout.index(*pos)
+        return default if i is None else i
+
+    def __getitem__(self, pos):
+        i = self.layout.index(*pos)
+        if i is None:
+            raise KeyError(pos)
+        return i
+
+    def __contains__(self, pos):
+        return self.layout.index(*pos) is not None
+
+    def __len__(self):
+        return len(self.layout.keys)
+
+
+class _EdgeView:
+    """Secuencia de aristas (start_pos, end_pos) construidas al pedirlas"""
+
+    def __init__(self, layout):
+        self.layout = layout
+
+    def __len__(self):
+        return len(self.layout.edge_start)
+
+    def __getitem__(self, edge_id):
+        layout = self.layout
+        if isinstance(edge_id, slice):
+            return [self[k] for k in range(*edge_id.indices(len(self)))]
+        return layout.position(layout.edge_start[edge_id]), layout.position(layout.edge_end[edge_id])
+
+    def __iter__(self):
+        position = self.layout.position
+        for i, j in zip(self.layout.edge_start, self.layout.edge_end):
+            yield position(i), position(j)
+
+
+class _EdgeIds:
+    """(start_pos, end_pos) -> id de arista"""
+
+    def __init__(self, layout):
+        self.layout = layout
+
+    def get(self, key, default=None):
+        edge_id = self.layout.edge_between(*key)
+        return default if edge_id is None else edge_id
+
+    def __getitem__(self, key):
+        edge_id = self.layout.edge_between(*key)
+        if edge_id is None:
+            raise KeyError(key)
+        return edge_id
+
+    def __contains__(self, key):
+        return self.layout.edge_between(*key) is not None
+
+    def __len__(self):
+        return len(self.layout.edge_start)
+
+
+class _IslandEdges:
+    """Posición -> [(id de arista, vecino)] arriba, abajo, izquierda y derecha"""
+
+    def __init__(self, layout):
+        self.layout = layout
+
+    def __getitem__(self, pos):
+        layout = self.layout
+        i = layout.index(*pos)
+        if i is None:
+            raise KeyError(pos)
+        entries = []
+        for edge_id, ends in ((layout.up[i], layout.edge_start), (layout.down[i], layout.edge_end),
+                              (layout.left[i], layout.edge_start), (layout.right[i], layout.edge_end)):
+            if edge_id >= 0:
+                entries.append((edge_id, layout.position(ends[edge_id])))
+        return entries
+
+    def get(self, pos, default=None):
+        return self[pos] if self.layout.index(*pos) is not None else default
+
+    def __contains__(self, pos):
+        return self.layout.index(*pos) is not None
+
+    def __len__(self):
+        return len(self.layout.keys)
+
+
+class _Crossings:
+    """Id de arista -> ids de las aristas que la cruzan (trozo del array CSR)"""
+
+    def __init__(self, layout):
+        self.layout = layout
+
+    def __len__(self):
+        return len(self.layout.edge_start)
+
+    def __getitem__(self, edge_id):
+        start = self.layout.crossing_start
+        return self.layout.crossing_ids[start[edge_id]:start[edge_id + 1]]
+
+
+class CompactGameState(GameState):
+    """GameState sobre arrays y máscaras de bits (misma interfaz, mucha menos memoria)"""
+
+    def _build_edges(self):
+        """Construye la disposición compacta y las vistas con la interfaz de GameState"""
+        self.layout = layout = CompactLayout(self.rows, self.cols, self.island_rows, self.island_cols,
+                                             self.island_values)
+        self.islands = _IslandView(layout)
+        self.island_index = _IslandIndex(layout)
+        self.edges = _EdgeView(layout)
+        self.edge_ids = _EdgeIds(layout)
+        self.island_edges = _IslandEdges(layout)
+        self.edge_crossings = _Crossings(layout)
+        self.zobrist_keys = _zobrist_keys(len(self.edges))
+
+    @property
+    def bridges(self):
+        """Lista de puentes: (start_pos, end_pos, count)"""
+        edges = self.edges
+        return [(*edges[edge_id], count) for edge_id, count in enumerate(self.edge_counts) if count]
+
+    @bridges.setter
+    def bridges(self, bridges):
+        layout = self.layout
+        self.edge_counts = bytearray(len(layout.edge_start))  # Id de arista -> puentes
+        self._degree = array('l', [0]) * len(layout.keys)  # Índice de isla -> puentes conectados
+        self._row_bridges = [0] * self.rows  # Fila -> columnas cruzadas por un puente vertical
+        self._col_bridges = [0] * self.cols  # Columna -> filas cruzadas por un puente horizontal
+        for start, end, count in bridges:
+            edge_id = layout.edge_between(start, end)
+            if edge_id is None:
+                raise ValueError(f"No hay arista entre {start} y {end}")
+            self.edge_counts[edge_id] = count
+            self._degree[layout.edge_start[edge_id]] += count
+            self._degree[layout.edge_end[edge_id]] += count
+        self._bridge_total = 0  # Aristas con algún puente
+        for edge_id, count in enumerate(self.edge_counts):
+            if count:
+                self._bridge_total += 1
+                self._occupy(edge_id, True)
+        self._shared = False
+        self._counts = None
+        self._pending = set()
+        self.state_hash = 0
+        for edge_id, count in enumerate(self.edge_counts):
+            self.state_hash ^= self.zobrist_keys[edge_id][self._count_mask(count)]
+        self._unsatisfied = sum(1 for degree, required in zip(self._degree, self.island_values) if degree != required)
+        self._components_dirty = True
+
+    def _occupy(self, edge_id, occupied):
+        """Marca (o desmarca) en las máscaras las celdas que atraviesa el puente de una arista"""
+        layout = self.layout
+        i, j = layout.edge_start[edge_id], layout.edge_end[edge_id]
+        row, col = layout.position(i)
+        end_row, end_col = layout.position(j)
+        if row == end_row:
+            masks, bit, cells = self._col_bridges, 1 << row, range(col + 1, end_col)
+        else:
+            masks, bit, cells = self._row_bridges, 1 << col, range(row + 1, end_row)
+        for cell in cells:
+            if occupied:
+                masks[cell] |= bit
+            else:
+                masks[cell] &= ~bit
+
+    def _crosses(self, edge_id):
+        """Algún puente colocado cruza esta arista"""
+        i, j = self.layout.edge_start[edge_id], self.layout.edge_end[edge_id]
+        row, col = self.island_rows[i], self.island_cols[i]
+        if row == self.island_rows[j]:
+            return self._row_bridges[row] >> (col + 1) & ((1 << (self.island_cols[j] - col - 1)) - 1) != 0
+        return self._col_bridges[col] >> (row + 1) & ((1 << (self.island_rows[j] - row - 1)) - 1) != 0
+
+    def count_bridges_for_island(self, row, col):
+        """Cuenta puentes conectados a una isla"""
+        i = self.layout.index(row, col)
+        return 0 if i is None else self._degree[i]
+
+    def get_bridge_between(self, start, end):
+        """Obtiene el puente entre dos islas (si existe)"""
+        edge_id = self.layout.edge_between(start, end)
+        if edge_id is None or not self.edge_counts[edge_id]:
+            return None
+        return (*self.edges[edge_id], self.edge_counts[edge_id])
+
+    def can_add_bridge(self, start, end):
+        """Verifica si se puede agregar un puente entre dos islas"""
+        edge_id = self.layout.edge_between(start, end)
+        if edge_id is None:
+            if start == end:
+                return False, "No puedes conectar una isla consigo misma"
+            if start[0] != end[0] and start[1] != end[1]:
+                return False, "Los puentes deben ser horizontales o verticales"
+            return False, "Hay una isla en el camino"
+        if self._crosses(edge_id):
+            return False, "Los puentes no pueden cruzarse"
+        if self.edge_counts[edge_id] >= 2:
+            return False, "Ya hay 2 puentes entre estas islas"
+        i, j = self.layout.edge_start[edge_id], self.layout.edge_end[edge_id]
+        if start[0] != self.island_rows[i] or start[1] != self.island_cols[i]:
+            i, j = j, i
+        if self._degree[i] >= self.island_values[i]:
+            return False, f"La isla {self.island_values[i]} ya tiene todos sus puentes"
+        if self._degree[j] >= self.island_values[j]:
+            return False, f"La isla destino ya tiene todos sus puentes"
+        return True, "OK"
+
+    def can_add_edge(self, edge_id):
+        """Versión rápida de can_add_bridge para una arista candidata (sin mensaje)"""
+        if self.edge_counts[edge_id] >= 2 or self._crosses(edge_id):
+            return False
+        i, j = self.layout.edge_start[edge_id], self.layout.edge_end[edge_id]
+        return self._degree[i] < self.island_values[i] and self._degree[j] < self.island_values[j]
+
+    def add_bridge(self, start, end):
+        """Agrega un puente entre dos islas vecinas"""
+        edge_id = self.layout.edge_between(start, end)
+        if edge_id is None:
+            raise ValueError(f"No hay arista entre {start} y {end}")
+        if self._shared:
+            self._unshare()
+        count = self.edge_counts[edge_id]
+        self.edge_counts[edge_id] = count + 1
+        i, j = self.layout.edge_start[edge_id], self.layout.edge_end[edge_id]
+        if not count:
+            self._bridge_total += 1
+            self._occupy(edge_id, True)
+            if not self._components_dirty:
+                self._union_islands(i, j)
+        self._change_island_degree(i, 1)
+        self._change_island_degree(j, 1)
+        keys = self.zobrist_keys[edge_id]
+        self.state_hash ^= keys[self._count_mask(count)] ^ keys[self._count_mask(count + 1)]
+        self._pending.add(edge_id)
+        return True
+
+    def remove_bridge(self, start, end):
+        """Elimina un puente entre dos islas"""
+        edge_id = self.layout.edge_between(start, end)
+        if edge_id is None or not self.edge_counts[edge_id]:
+            return False
+        if self._shared:
+            self._unshare()
+        count = self.edge_counts[edge_id]
+        self.edge_counts[edge_id] = count - 1
+        if count == 1:
+            self._bridge_total -= 1
+            self._occupy(edge_id, False)
+            self._components_dirty = True
+        self._change_island_degree(self.layout.edge_start[edge_id], -1)
+        self._change_island_degree(self.layout.edge_end[edge_id], -1)
+        keys = self.zobrist_keys[edge_id]
+        self.state_hash ^= keys[self._count_mask(count)] ^ keys[self._count_mask(count - 1)]
+        self._pending.add(edge_id)
+        return True
+
+    def _unshare(self):
+        """Copia propia de los arrays de puentes antes del primer cambio tras copy()"""
+        self.edge_counts = bytearray(self.edge_counts)
+        self._degree = array('l', self._degree)
+        self._row_bridges = list(self._row_bridges)
+        self._col_bridges = list(self._col_bridges)
+        self._shared = False
+
+    def _change_island_degree(self, i, delta):
+        """Actualiza el grado de la isla i y el contador de islas insatisfechas"""
+        before = self._degree[i]
+        self._degree[i] = before + delta
+        required = self.island_values[i]
+        self._unsatisfied += (before + delta != required) - (before != required)
+
+    def _union_islands(self, i, j):
+        root_i, root_j = self._find(i), self._find(j)
+        if root_i != root_j:
+            self._parent[root_i] = root_j
+            self._components -= 1
+
+    def _rebuild_components(self):
+        """Reconstruye la unión-búsqueda a partir de los puentes actuales"""
+        self._parent = list(range(len(self.island_values)))
+        self._components = len(self.island_values)
+        self._components_dirty = False
+        for edge_id, count in enumerate(self.edge_counts):
+            if count:
+                self._union_islands(self.layout.edge_start[edge_id], self.layout.edge_end[edge_id])
+
+    def check_connectivity(self):
+        """Verifica que todas las islas estén conectadas mediante puentes"""
+        if not len(self.island_values):
+            return True
+        if not self._bridge_total:
+            return False
+        if self._components_dirty:
+            self._rebuild_components()
+        return self._components == 1
+
+    def check_victory(self):
+        """Verifica si el juego está completo"""
+        return not self._unsatisfied and bool(self._bridge_total) and self.check_connectivity()
+
+    def copy(self):
+        """Copia con la disposición compartida; los arrays de puentes se duplican al cambiar"""
+        new_state = CompactGameState.__new__(CompactGameState)
+        new_state.rows = self.rows
+        new_state.cols = self.cols
+        new_state.island_rows = self.island_rows
+        new_state.island_cols = self.island_cols
+        new_state.island_values = self.island_values
+        new_state.layout = self.layout
+        # Las vistas solo leen la disposición: se comparten
+        new_state.islands = self.islands
+        new_state.island_index = self.island_index
+        new_state.edges = self.edges
+        new_state.edge_ids = self.edge_ids
+        new_state.island_edges = self.island_edges
+        new_state.edge_crossings = self.edge_crossings
+        new_state.zobrist_keys = self.zobrist_keys
+        new_state.state_hash = self.state_hash
+        self._shared = new_state._shared = True
+        new_state.edge_counts = self.edge_counts
+        new_state._degree = self._degree
+        new_state._row_bridges = self._row_bridges
+        new_state._col_bridges = self._col_bridges
+        new_state._bridge_total = self._bridge_total
+        new_state._counts = self._counts
+        new_state._pending = set(self._pending)
+        new_state._unsatisfied = self._unsatisfied
+        new_state._components_dirty = True
+        return new_state
@@ -0,0 +1,167 @@
+"""Generación de tableros a partir de una disposición aleatoria de puentes.
+
+Uso:
+    python -m hashi.generator -n 500 --size 15x15 --density 0.3 -o puzzles/ -j 8
+
+Solo se guardan los tableros con solución única, uno por archivo, en el
+formato de board*.txt.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from hashi.solver import EdgeSolver
+from hashi.state import GameState
+
+# Nodos máximos para decidir si un tablero candidato tiene solución única
+UNIQUENESS_MAX_NODES = 20000
+
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def random_layout(rows, cols, density, rng=None, extra_edges=0.5, min_islands=2):
+    """Genera un tablero resoluble y la disposición de puentes que lo resuelve.
+
+    Coloca islas al azar (sin islas pegadas), las une con un árbol aleatorio
+    de puentes que no se cruzan, descarta las islas que quedaron fuera y añade
+    puentes extra con probabilidad extra_edges. Si quedan menos de min_islands
+    islas se vuelve a empezar. Los valores de las islas se derivan de esa
+    disposición. Devuelve (board, {(start, end): puentes}).
+    """
+    rng = rng or random.Random()
+    while True:
+        board = [[0] * cols for _ in range(rows)]
+        for row in range(rows):
+            for col in range(cols):
+                if (rng.random() < density and not (row and board[row - 1][col])
+                        and not (col and board[row][col - 1])):
+                    board[row][col] = 1
+        state = GameState.from_board(board)
+        if len(state.islands) < 2:
+            continue
+
+        # Árbol aleatorio (Kruskal con aristas barajadas) respetando los cruces
+        parent = list(range(len(state.islands)))
+        order = list(range(len(state.edges)))
+        rng.shuffle(order)
+        values = [0] * len(state.edges)
+        for edge_id in order:
+            if any(values[other] for other in state.edge_crossings[edge_id]):
+                continue
+            start, end = state.edges[edge_id]
+            root_i = _find(parent, state.island_index[start])
+            root_j = _find(parent, state.island_index[end])
+            if root_i != root_j:
+                parent[root_i] = root_j
+                values[edge_id] = rng.choice((1, 2))
+
+        # Quedarse con la componente más grande
+        sizes = {}
+        for i in range(len(state.islands)):
+            root = _find(parent, i)
+            sizes[root] = sizes.get(root, 0) + 1
+        main_root = max(sizes, key=sizes.get)
+        if sizes[main_root] < max(2, min_islands):
+            continue
+        kept = {(row, col) for i, (row, col, _) in enumerate(state.islands) if _find(parent, i) == main_root}
+
+        for edge_id in order:
+            start, end = state.edges[edge_id]
+            if start not in kept or end not in kept:
+                values[edge_id] = 0
+            elif (not values[edge_id] and rng.random() < extra_edges
+                  and not any(values[other] for other in state.edge_crossings[edge_id])):
+                values[edge_id] = rng.choice((1, 2))
+
+        layout = {}
+        clues = {}
+        for edge_id, value in enumerate(values):
+            if value:
+                start, end = state.edges[edge_id]
+                layout[(start, end)] = value
+                clues[start] = clues.get(start, 0) + value
+                clues[end] = clues.get(end, 0) + value
+        board = [[clues.get((row, col), 0) for col in range(cols)] for row in range(rows)]
+        return board, layout
+
+
+def format_board(board):
+    """Texto del tablero en el formato de los archivos board*.txt"""
+    lines = [f"{len(board)},{len(board[0]) if board else 0}"]
+    lines.extend("".join(str(value) for value in row) for row in board)
+    return "\n".join(lines) + "\n"
+
+
+def generate_unique(rows, cols, density, rng=None, max_attempts=1000):
+    """Genera un tablero con solución única.
+
+    Descarta los candidatos con más de una solución (o cuya comprobación
+    supera UNIQUENESS_MAX_NODES). Devuelve (board, intentos) o (None,
+    intentos) si no lo consigue en max_attempts.
+    """
+    rng = rng or random.Random()
+    for attempt in range(1, max_attempts + 1):
+        board, _ = random_layout(rows, cols, density, rng)
+        solver = EdgeSolver(GameState.from_board(board), UNIQUENESS_MAX_NODES)
+        if solver.count_solutions(2) == 1 and not solver.limit_reached:
+            return board, attempt
+    return None, max_attempts
+
+
+def _generate_task(args):
+    """Tarea de un proceso: un tablero único con su propia semilla reproducible"""
+    rows, cols, density, seed, index = args
+    return index, generate_unique(rows, cols, density, random.Random(f"{seed}-{index}"))
+
+
+def generate_many(count, rows, cols, density, seed=0, workers=None):
+    """Genera count tableros únicos en paralelo; produce (índice, board, intentos)"""
+    workers = workers or os.cpu_count() or 1
+    tasks = [(rows, cols, density, seed, index) for index in range(count)]
+    chunksize = max(1, count // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for index, (board, attempts) in executor.map(_generate_task, tasks, chunksize=chunksize):
+            yield index, board, attempts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera tableros de Hashiwokakero con solución única")
+    parser.add_argument("-n", "--count", type=int, default=100, help="Número de tableros")
+    parser.add_argument("--size", default="15x15", help="Tamaño FILASxCOLUMNAS")
+    parser.add_argument("--density", type=float, default=0.3, help="Probabilidad de isla por celda")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla (la misma semilla da los mismos tableros)")
+    parser.add_argument("-o", "--output", default="puzzles", help="Directorio de salida")
+    parser.add_argument("--prefix", default="puzzle_", help="Prefijo de los archivos")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Procesos (por defecto, todos los núcleos)")
+    args = parser.parse_args(argv)
+
+    rows, cols = (int(value) for value in args.size.lower().split("x"))
+    os.makedirs(args.output, exist_ok=True)
+    start_time = time.perf_counter()
+    written = 0
+    attempts = 0
+    for index, board, tries in generate_many(args.count, rows, cols, args.density, args.seed, args.workers):
+        attempts += tries
+        if board is None:
+            continue
+        with open(os.path.join(args.output, f"{args.prefix}{index:06d}.txt"), "w") as f:
+            f.write(format_board(board))
+        written += 1
+
+    elapsed = time.perf_counter() - start_time
+    print(f"{written} tableros únicos de {rows}x{cols} en {elapsed:.2f} s "
+          f"({written / elapsed if elapsed > 0 else 0:.1f} tableros/s, {attempts} candidatos)", file=sys.stderr)
+    return 0 if written == args.count else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
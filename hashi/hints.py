@@ -0,0 +1,154 @@
+"""Pistas para el jugador humano a partir de deducciones en caché.
+
+HintEngine mantiene un EdgeSolver con los puentes del jugador aplicados
+como mínimos. Cada puente nuevo solo propaga sus consecuencias y quitar
+uno deshace el trail hasta ese puente y vuelve a aplicar los posteriores,
+así que una pista no necesita resolver el tablero de nuevo.
+
+Crear el motor es barato; el trabajo caro (cotas, solución de referencia y
+propagación inicial) está en build(), que solo usa una copia vacía del
+tablero y puede ir en otro hilo. Hasta que ready es True las pistas no
+están disponibles y sync() no hace nada; hint() espera a la construcción en
+curso (o la hace) en lugar de empezar otra.
+"""
+
+import logging
+import threading
+
+from hashi.solver import EdgeSolver
+
+logger = logging.getLogger(__name__)
+
+# Nodos máximos para buscar la solución de referencia al crear el motor
+HINT_MAX_NODES = 20000
+
+# Tipos de pista
+HINT_WRONG = "wrong"  # Un puente del jugador no está en ninguna solución
+HINT_CONFLICT = "conflict"  # Los puentes del jugador se contradicen entre sí
+HINT_FORCED = "forced"  # Puente que se deduce de los ya colocados
+HINT_SOLUTION = "solution"  # Puente de la única solución (no sale por simple deducción)
+HINT_NONE = "none"  # No hay nada que sugerir (tablero completo o sin deducciones)
+
+
+class Hint:
+    """Pista: tipo, arista (start, end) o None y mensaje para el jugador"""
+
+    def __init__(self, kind, edge, message):
+        self.kind = kind
+        self.edge = edge
+        self.message = message
+
+    def __repr__(self):
+        return f"Hint({self.kind!r}, {self.edge!r}, {self.message!r})"
+
+
+class HintEngine:
+    """Deducciones en caché sobre el estado de un GameState"""
+
+    def __init__(self, game_state):
+        self.game_state = game_state
+        self._empty = game_state.copy()
+        self._empty.bridges = []
+        self.solver = None
+        self.applied = []  # Pila de (id de arista, puentes, marca del trail antes de aplicarlo)
+        self.counts = [0] * len(game_state.edges)  # Puentes aplicados por arista
+        self.conflict = None  # Posición en applied del primer puente contradictorio
+        self.ready = False  # build() ha terminado
+        self._build_lock = threading.Lock()  # Una sola construcción aunque la pidan dos hilos
+
+    def build(self):
+        """Calcula lo que solo depende del tablero (no toca el GameState del jugador)"""
+        with self._build_lock:
+            if not self.ready:
+                self._build()
+        return self
+
+    def _build(self):
+        """Cotas, solución de referencia y motor incremental"""
+        empty = self._empty
+
+        # Cotas de cada arista válidas para cualquier solución (solo dependen del tablero)
+        bounds = EdgeSolver(empty)
+        self.solvable = bounds.prepare()
+        self.upper = [EdgeSolver.DOMAIN_MAX[mask] for mask in bounds.domains]
+
+        # Solución de referencia si es única: cualquier puente de más es un error seguro
+        reference = EdgeSolver(empty, HINT_MAX_NODES)
+        unique = reference.count_solutions(2) == 1 and not reference.limit_reached
+        self.solution = reference.values() if unique else None
+
+        # Motor incremental con los puentes del jugador
+        solver = EdgeSolver(empty)
+        solver.prepare()
+        self.solver = solver
+        self.ready = True
+
+    def sync(self):
+        """Pone el motor al día con los puentes actuales del GameState"""
+        if not self.ready:
+            return
+        target = self.game_state.edge_counts
+        changed = [edge_id for edge_id, count in enumerate(target) if count != self.counts[edge_id]]
+        if not changed:
+            return
+
+        # Quitar (o cambiar) un puente: deshacer hasta él y reaplicar los posteriores
+        position = len(self.applied)
+        for index, (edge_id, count, _) in enumerate(self.applied):
+            if target[edge_id] < count:
+                position = index
+                break
+        if position < len(self.applied):
+            replay = [(edge_id, target[edge_id]) for edge_id, _, _ in self.applied[position:]
+                      if target[edge_id]]
+            self.solver.undo_to(self.applied[position][2])
+            for edge_id, _, _ in self.applied[position:]:
+                self.counts[edge_id] = 0
+            del self.applied[position:]
+            if self.conflict is not None and self.conflict >= position:
+                self.conflict = None
+        else:
+            replay = []
+
+        # Puentes nuevos (o aumentados) en el orden de las aristas
+        seen = {edge_id for edge_id, _ in replay}
+        replay.extend((edge_id, target[edge_id]) for edge_id in changed
+                      if edge_id not in seen and target[edge_id] > self.counts[edge_id])
+        for edge_id, count in replay:
+            if count <= self.counts[edge_id]:
+                continue
+            self.applied.append((edge_id, count, self.solver.trail_mark()))
+            self.counts[edge_id] = count
+            if self.conflict is None and not self.solver.require(edge_id, count):
+                self.conflict = len(self.applied) - 1
+
+    def hint(self):
+        """Siguiente pista para el estado actual (construye el motor si hace falta)"""
+        if not self.ready:
+            self.build()
+        self.sync()
+        state = self.game_state
+        counts = state.edge_counts
+
+        # Primero los errores: puentes que ninguna solución puede tener
+        for edge_id, count in enumerate(counts):
+            if count > self.upper[edge_id] or (self.solution is not None and count > self.solution[edge_id]):
+                return Hint(HINT_WRONG, state.edges[edge_id], "Este puente no está en ninguna solución")
+        if not self.solvable:
+            return Hint(HINT_NONE, None, "El tablero no tiene solución")
+        if self.conflict is not None:
+            edge_id = self.applied[self.conflict][0]
+            return Hint(HINT_CONFLICT, state.edges[edge_id], "Este puente contradice a los anteriores")
+
+        # Después, el siguiente puente deducido
+        domain_min = EdgeSolver.DOMAIN_MIN
+        for edge_id, mask in enumerate(self.solver.domains):
+            if domain_min[mask] > counts[edge_id]:
+                return Hint(HINT_FORCED, state.edges[edge_id], "Este puente es obligatorio")
+        if self.solution is not None:
+            for edge_id, value in enumerate(self.solution):
+                if value > counts[edge_id]:
+                    return Hint(HINT_SOLUTION, state.edges[edge_id], "Este puente está en la solución")
+        if state.check_victory():
+            return Hint(HINT_NONE, None, "El tablero ya está resuelto")
+        return Hint(HINT_NONE, None, "No hay ningún puente obligatorio")
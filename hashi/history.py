@@ -0,0 +1,52 @@
+"""Deshacer y rehacer para el jugador humano con instantáneas persistentes"""
+
+from collections import deque
+
+# Estados que se conservan como máximo (los más antiguos se descartan)
+HISTORY_MAX_STATES = 10000
+
+
+class History:
+    """Historial de estados de un GameState.
+
+    Cada estado es una instantánea de GameState.snapshot(): guardar uno
+    solo cuesta las aristas que cambiaron y comparte casi toda su memoria
+    con el anterior, así que miles de estados ocupan poco. Deshacer y
+    rehacer solo tocan las aristas que cambiaron.
+    """
+
+    def __init__(self, game_state, max_states=HISTORY_MAX_STATES):
+        self.game_state = game_state
+        self.past = deque([game_state.snapshot()], maxlen=max_states)  # El último es el estado actual
+        self.future = []  # Estados deshechos, el último es el siguiente a rehacer
+
+    def record(self):
+        """Guarda el estado actual si cambió desde el último guardado; True si lo guardó"""
+        snapshot = self.game_state.snapshot()
+        if next(snapshot.diff(self.past[-1]), None) is None:
+            return False
+        self.past.append(snapshot)
+        self.future.clear()
+        return True
+
+    def undo(self):
+        """Vuelve al estado anterior; False si no hay nada que deshacer"""
+        # Los cambios sin guardar cuentan como un paso más
+        self.record()
+        if len(self.past) < 2:
+            return False
+        self.future.append(self.past.pop())
+        self.game_state.restore(self.past[-1])
+        return True
+
+    def redo(self):
+        """Rehace el último estado deshecho; False si no hay ninguno"""
+        if not self.future:
+            return False
+        snapshot = self.future.pop()
+        self.past.append(snapshot)
+        self.game_state.restore(snapshot)
+        return True
+
+    def __len__(self):
+        return len(self.past) + len(self.future)
@@ -0,0 +1,146 @@
+"""Resolución paralela de un solo tablero difícil.
+
+Los primeros niveles del árbol de búsqueda se dividen en subproblemas
+independientes (prefijos de decisiones sobre las primeras aristas). Los
+subproblemas van a una cola compartida de la que cada proceso toma el
+siguiente en cuanto queda libre; al encontrar una solución se avisa a todos
+para que abandonen su trabajo.
+
+Uso:
+    python -m hashi.parallel board.txt -j 8
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+import time
+
+from hashi.solver import EdgeSolver, TranspositionTable
+from hashi.state import GameState
+
+logger = logging.getLogger(__name__)
+
+# Subproblemas por proceso: con más trozos que procesos el reparto se equilibra solo
+SUBPROBLEMS_PER_WORKER = 8
+# Profundidad máxima de la división inicial
+MAX_SPLIT_DEPTH = 12
+
+
+def split_search(game_state, target, max_nodes=500000):
+    """Divide la búsqueda en al menos target prefijos (si el árbol lo permite)"""
+    prefixes = [()]
+    for depth in range(1, MAX_SPLIT_DEPTH + 1):
+        prefixes = EdgeSolver(game_state, max_nodes).split(depth)
+        if len(prefixes) >= target:
+            break
+        # Todas las ramas terminaron antes de esta profundidad: no se puede dividir más
+        if all(len(prefix) < depth for prefix in prefixes):
+            break
+    return prefixes
+
+
+def _worker(game_state, tasks, results, stop, max_nodes):
+    """Toma subproblemas de la cola hasta vaciarla o hasta que otro proceso encuentre solución"""
+    # Los estados fallidos valen para cualquier subproblema del mismo tablero
+    table = TranspositionTable()
+    while not stop.is_set():
+        prefix = tasks.get()
+        if prefix is None:
+            break
+        solver = EdgeSolver(game_state, max_nodes, table=table, cancel=stop.is_set)
+        found = solver.solve(prefix)
+        results.put((found, solver.values() if found else None, solver.nodes,
+                     solver.limit_reached and not solver.cancelled))
+        if found:
+            stop.set()
+
+
+def parallel_solve(game_state, workers=None, max_nodes=500000, split_target=None):
+    """Resuelve un tablero con varios procesos.
+
+    Devuelve (valores por arista o None, estadísticas). max_nodes limita cada
+    subproblema por separado. El estado es "solved", "limit" (algún
+    subproblema agotó sus nodos), "error" (los procesos terminaron sin dar
+    todos los resultados) o "unsolvable", solo si todos los subproblemas
+    terminaron sin solución.
+    """
+    workers = workers or os.cpu_count() or 1
+    start_time = time.perf_counter()
+    prefixes = split_search(game_state, split_target or workers * SUBPROBLEMS_PER_WORKER, max_nodes)
+    stats = {"workers": workers, "subproblems": len(prefixes), "nodes": 0, "status": None}
+
+    tasks = multiprocessing.Queue()
+    results = multiprocessing.Queue()
+    stop = multiprocessing.Event()
+    for prefix in prefixes:
+        tasks.put(prefix)
+    for _ in range(workers):
+        tasks.put(None)
+
+    processes = [multiprocessing.Process(target=_worker, args=(game_state, tasks, results, stop, max_nodes),
+                                         daemon=True)
+                 for _ in range(min(workers, len(prefixes)))]
+    for process in processes:
+        process.start()
+    stats["workers"] = len(processes)
+
+    solution = None
+    limit_hit = False
+    pending = len(prefixes)
+    try:
+        while pending and solution is None:
+            try:
+                found, values, nodes, limit_reached = results.get(timeout=0.1)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    break
+                continue
+            pending -= 1
+            stats["nodes"] += nodes
+            if found:
+                solution = values
+            elif limit_reached:
+                limit_hit = True
+    finally:
+        stop.set()
+        for process in processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+
+    if solution is not None:
+        stats["status"] = "solved"
+    elif pending:
+        logger.warning("Los procesos terminaron con %d subproblemas sin resolver", pending)
+        stats["status"] = "error"
+    else:
+        stats["status"] = "limit" if limit_hit else "unsolvable"
+    stats["seconds"] = time.perf_counter() - start_time
+    return solution, stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resuelve un tablero de Hashiwokakero con varios procesos")
+    parser.add_argument("file", help="Archivo de tablero")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Procesos (por defecto, todos los núcleos)")
+    parser.add_argument("--max-nodes", type=int, default=500000, help="Límite de nodos por subproblema")
+    parser.add_argument("--log-level", default="WARNING", help="Nivel de logging (DEBUG, INFO, WARNING...)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper(), format="%(levelname)s %(name)s: %(message)s")
+
+    state = GameState(args.file)
+    values, stats = parallel_solve(state, args.workers, args.max_nodes)
+    print(f"{stats['status']}: {stats['subproblems']} subproblemas, {stats['workers']} procesos, "
+          f"{stats['nodes']} nodos, {stats['seconds']:.3f} s")
+    if values is not None:
+        for (start, end), value in zip(state.edges, values):
+            if value:
+                print(f"{start} - {end}: {value}")
+    return 0 if values is not None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""Vector persistente de enteros con estructura compartida.
+
+Es un trie de BRANCH hijos por nodo (tuplas inmutables). Cambiar una
+posición copia solo el camino desde la raíz hasta su hoja (O(log n)) y el
+resto de nodos se comparte con la versión anterior, así que guardar una
+versión es guardar su raíz (O(1)) y miles de versiones casi iguales ocupan
+poco más que una.
+"""
+
+# Hijos por nodo (potencia de 2)
+BITS = 5
+BRANCH = 1 << BITS
+MASK = BRANCH - 1
+
+
+class PersistentVector:
+    """Vector inmutable: set() devuelve una versión nueva que comparte casi todo con esta"""
+
+    __slots__ = ("size", "shift", "root")
+
+    def __init__(self, values=()):
+        values = list(values)
+        nodes = [tuple(values[start:start + BRANCH]) for start in range(0, len(values), BRANCH)]
+        shift = 0
+        while len(nodes) > 1:
+            nodes = [tuple(nodes[start:start + BRANCH]) for start in range(0, len(nodes), BRANCH)]
+            shift += BITS
+        self.size = len(values)
+        self.shift = shift
+        self.root = nodes[0] if nodes else ()
+
+    @classmethod
+    def _with_root(cls, size, shift, root):
+        vector = cls.__new__(cls)
+        vector.size = size
+        vector.shift = shift
+        vector.root = root
+        return vector
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.size:
+            raise IndexError(f"Índice {index} fuera de rango (0-{self.size - 1})")
+        node = self.root
+        shift = self.shift
+        while shift:
+            node = node[index >> shift & MASK]
+            shift -= BITS
+        return node[index & MASK]
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def set(self, index, value):
+        """Versión con value en la posición index (copia un nodo por nivel)"""
+        if not 0 <= index < self.size:
+            raise IndexError(f"Índice {index} fuera de rango (0-{self.size - 1})")
+        # Bajar guardando el camino y reconstruirlo de la hoja a la raíz
+        path = []
+        node = self.root
+        shift = self.shift
+        while shift:
+            slot = index >> shift & MASK
+            path.append((node, slot))
+            node = node[slot]
+            shift -= BITS
+        slot = index & MASK
+        if node[slot] == value:
+            return self
+        node = node[:slot] + (value,) + node[slot + 1:]
+        for parent, slot in reversed(path):
+            node = parent[:slot] + (node,) + parent[slot + 1:]
+        return PersistentVector._with_root(self.size, self.shift, node)
+
+    def diff(self, other):
+        """Posiciones en que difiere de otra versión del mismo tamaño.
+
+        Los subárboles compartidos se saltan sin recorrerlos: entre dos
+        versiones separadas por k cambios cuesta O(k log n).
+        """
+        if self.size != other.size:
+            raise ValueError("Los vectores tienen tamaños distintos")
+        pending = [(self.root, other.root, self.shift, 0)]
+        while pending:
+            mine, theirs, shift, base = pending.pop()
+            if mine is theirs:
+                continue
+            if not shift:
+                for offset, (value, other_value) in enumerate(zip(mine, theirs)):
+                    if value != other_value:
+                        yield base + offset
+                continue
+            for slot in range(len(mine) - 1, -1, -1):
+                pending.append((mine[slot], theirs[slot], shift - BITS, base + (slot << shift)))
+
+    def tolist(self):
+        """Lista con todos los valores"""
+        nodes = [self.root]
+        for _ in range(self.shift // BITS):
+            nodes = [child for node in nodes for child in node]
+        return [value for node in nodes for value in node]
+
+    def __repr__(self):
+        return f"PersistentVector({self.tolist()!r})"
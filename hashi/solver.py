@@ -0,0 +1,1231 @@
+"""Solver automático: propagación de restricciones y búsqueda sobre dominios de aristas"""
+
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+
+from hashi.state import _zobrist_keys
+from hashi.stats import (END_CANCELLED, END_CONTRADICTION, END_EXHAUSTED, END_NODE_LIMIT, END_SOLVED,
+                         SolverStats)
+
+logger = logging.getLogger(__name__)
+
+# Estados fallidos que recuerda el solver (tabla de transposición)
+TRANSPOSITION_TABLE_SIZE = 200000
+
+# Nodos entre dos líneas de progreso en el log (nivel DEBUG)
+PROGRESS_LOG_NODES = 100000
+# Nodos entre consultas de cancelación en la resolución en segundo plano
+BACKGROUND_CANCEL_CHECK_INTERVAL = 16
+# Milisegundos de búsqueda por llamada al resolver sin hilos (SlicedSolve)
+SOLVE_SLICE_MS = 10
+# Nodos máximos de cada búsqueda al reducir un conjunto de puentes en conflicto
+CONFLICT_MAX_NODES = 20000
+
+# Semilla fija para las claves de las islas (los hashes son reproducibles)
+ISLAND_KEYS_SEED = 0x15A4D
+# Puentes que faltan a una isla: de -8 a 8, desplazados para indexar las claves
+RESIDUAL_OFFSET = 8
+
+_island_key_table = []
+_island_rng = random.Random(ISLAND_KEYS_SEED)
+_free_key_table = []
+_MASK64 = (1 << 64) - 1
+
+
+def _island_keys(count):
+    """Claves de las islas 0..count-1: una por cada demanda pendiente y una de pertenencia"""
+    while len(_island_key_table) < count:
+        _island_key_table.append(tuple(_island_rng.getrandbits(64) for _ in range(2 * RESIDUAL_OFFSET + 2)))
+    return _island_key_table[:count]
+
+
+def _free_keys(count):
+    """Claves Zobrist de las aristas 0..count-1 con 0 en las máscaras de un solo valor"""
+    for keys in _zobrist_keys(count)[len(_free_key_table):]:
+        _free_key_table.append(tuple(key if mask & (mask - 1) else 0 for mask, key in enumerate(keys)))
+    return _free_key_table[:count]
+
+
+def _mix(value):
+    """Mezcla splitmix64: convierte la firma de una componente en una clave"""
+    value = (value + 0x9E3779B97F4A7C15) & _MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+class TranspositionTable:
+    """Conjunto acotado de hashes de estados sin solución, con expulsión LRU"""
+
+    def __init__(self, max_size=TRANSPOSITION_TABLE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def contains(self, state_hash):
+        """Consulta un estado y actualiza los contadores de aciertos y fallos"""
+        if state_hash in self.entries:
+            self.entries.move_to_end(state_hash)
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def add(self, state_hash):
+        """Registra un estado del que ya se sabe que no tiene solución"""
+        self.entries[state_hash] = None
+        self.entries.move_to_end(state_hash)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        """Contadores para dimensionar la tabla"""
+        return {"size": len(self.entries), "max_size": self.max_size, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
+
+
+class EdgeSolver:
+    """Motor de búsqueda sobre los dominios de las aristas candidatas.
+
+    Cada arista tiene un dominio que es un subconjunto de {0, 1, 2}, guardado
+    como máscara de bits (el bit v indica que el valor v sigue siendo posible).
+    Cada reducción de dominio se apila en el trail y deshacer una rama solo
+    restaura lo que cambió en ella.
+
+    La propagación usa una cola de islas: solo se vuelven a examinar las islas
+    con alguna arista cuyo dominio cambió.
+
+    La tabla de transposición usa el hash del subproblema que queda por
+    resolver: dominios de las aristas todavía libres, puentes que faltan a
+    cada isla y partición en componentes de los puentes seguros. Dos nodos
+    con el mismo subproblema tienen las mismas soluciones aunque se llegara a
+    ellos fijando aristas distintas.
+    """
+
+    FULL_DOMAIN = 0b111
+    DOMAIN_VALUES = [tuple(v for v in range(3) if mask >> v & 1) for mask in range(8)]
+    DOMAIN_MIN = [values[0] if values else 0 for values in DOMAIN_VALUES]
+    DOMAIN_MAX = [values[-1] if values else 0 for values in DOMAIN_VALUES]
+
+    # Reglas de deducción (para las estadísticas)
+    RULES = ("crossing", "capacity", "isolation", "component")
+
+    # Cada cuántos nodos se consulta la función de cancelación
+    CANCEL_CHECK_INTERVAL = 1024
+
+    def __init__(self, game_state, max_nodes=500000, table=None, cancel=None):
+        self.game_state = game_state
+        self.max_nodes = max_nodes
+        # Subproblemas (ver state_hash) ya explorados sin encontrar solución
+        self.table = table if table is not None else TranspositionTable()
+        # Función sin argumentos que devuelve True para abortar la búsqueda
+        self.cancel = cancel
+        self.nodes = 0
+        self.limit_reached = False  # La búsqueda se interrumpió (límite o cancelación)
+        self.cancelled = False
+        self.solution_limit = 1  # La búsqueda para al encontrar tantas soluciones
+        self.solutions = 0
+        self.solution = None  # Valores por arista de la primera solución encontrada
+        self.forced = None  # Mínimo de cada arista tras la propagación inicial (puentes seguros)
+        self.depth = 0  # Decisiones en la rama que se está explorando
+        self.trail = []  # Pila de (id de arista, dominio anterior)
+        self.rule_counts = dict.fromkeys(self.RULES, 0)
+        self.pruned_components = 0  # Nodos podados por componentes aisladas
+        self.backtracks = 0  # Valores probados que hubo que deshacer
+        self.depth_counts = []  # Profundidad -> nodos visitados
+        self.stats = SolverStats()  # Estadísticas de la última resolución
+        self.done = True  # No hay ninguna búsqueda a medias (ver begin y run)
+        self.consistent = True  # La propagación inicial no encontró contradicción
+        self._stack = []
+        self._entering = False
+
+        index = game_state.island_index
+        self.clues = [required for _, _, required in game_state.islands]
+        self.island_edges = [[edge_id for edge_id, _ in game_state.island_edges[(row, col)]]
+                             for row, col, _ in game_state.islands]
+        self.edge_islands = [(index[start], index[end]) for start, end in game_state.edges]
+        self.crossings = game_state.edge_crossings
+
+        # Cola de islas pendientes de examinar
+        self.queue = deque()
+        self.queued = [False] * len(self.clues)
+
+        # Dominio inicial: entre los puentes ya colocados y el máximo que admiten ambas islas
+        self.domains = []
+        for edge_id, (i, j) in enumerate(self.edge_islands):
+            low = game_state.edge_counts[edge_id]
+            high = min(2, self.clues[i], self.clues[j])
+            mask = 0
+            for value in range(low, high + 1):
+                mask |= 1 << value
+            self.domains.append(mask)
+
+        # Hash Zobrist del subproblema restante. Las aristas fijadas no cuentan:
+        # su efecto queda en la demanda de las islas y en la partición.
+        self.free_keys = _free_keys(len(game_state.edges))
+        self.island_keys = _island_keys(len(self.clues))
+        self.residual = list(self.clues)  # Puentes que aún faltan a cada isla
+        for edge_id, (i, j) in enumerate(self.edge_islands):
+            low = self.DOMAIN_MIN[self.domains[edge_id]]
+            self.residual[i] -= low
+            self.residual[j] -= low
+        self.state_hash = 0
+        for edge_id, mask in enumerate(self.domains):
+            self.state_hash ^= self.free_keys[edge_id][mask]
+        for i, residual in enumerate(self.residual):
+            self.state_hash ^= self.island_keys[i][residual + RESIDUAL_OFFSET]
+
+        # Unión-búsqueda con deshacer sobre las aristas con puente seguro (mínimo > 0).
+        # Por cada raíz guarda el tamaño, los puentes que aún faltan a sus islas
+        # y la firma de sus miembros (suma de claves) para el hash de la partición.
+        self.parent = list(range(len(self.clues)))
+        self.size = [1] * len(self.clues)
+        self.demand = list(self.clues)
+        self.signature = [keys[-1] for keys in self.island_keys]
+        for signature in self.signature:
+            self.state_hash ^= _mix(signature)
+        self.unions = []  # Raíces absorbidas (-1 si la arista no unió nada)
+        for edge_id, mask in enumerate(self.domains):
+            if mask and not mask & 1:
+                self._union(edge_id)
+                self.demand[self._find(self.edge_islands[edge_id][0])] -= 2 * self.DOMAIN_MIN[mask]
+
+    def solve(self, assumptions=()):
+        """Busca una asignación válida; devuelve True si la encuentra.
+
+        assumptions es una secuencia de (id de arista, valor) que se fijan
+        antes de buscar, por ejemplo el prefijo de un subproblema.
+        """
+        return self._run(assumptions, 1) > 0
+
+    def count_solutions(self, limit=2, assumptions=()):
+        """Cuenta soluciones, deteniéndose al llegar a limit.
+
+        Con limit=2 distingue un tablero de solución única (1) de uno ambiguo
+        (2). Si limit_reached queda en True la cuenta está incompleta.
+        """
+        return self._run(assumptions, limit)
+
+    def _run(self, assumptions, solution_limit):
+        """Propaga, fija las suposiciones y busca hasta solution_limit soluciones"""
+        self.begin(solution_limit, assumptions)
+        self.run()
+        return self.solutions
+
+    def begin(self, solution_limit=1, assumptions=(), restart=True):
+        """Prepara una búsqueda reanudable; run() la hace avanzar.
+
+        Propaga, fija las suposiciones y deja la búsqueda en la raíz. Entre
+        dos llamadas a run() el motor queda en un estado coherente: se puede
+        continuar más tarde o abandonar con abandon(). Se puede llamar otra vez
+        con el mismo motor: primero vuelve a los dominios de partida. Con
+        restart=False la raíz es el estado actual (por ejemplo tras prepare()
+        y require()) y al terminar se vuelve a él con undo_to().
+        """
+        # Una búsqueda anterior deja aplicadas su rama y su propagación
+        if restart:
+            self.undo_to(0)
+        self.nodes = 0
+        self.pruned_components = 0
+        self.backtracks = 0
+        self.depth_counts = []
+        self.limit_reached = False
+        self.cancelled = False
+        self.solution_limit = solution_limit
+        self.solutions = 0
+        self.solution = None
+        self.depth = 0
+        self._next_progress_log = PROGRESS_LOG_NODES
+        self.stats = SolverStats()
+        self._stack = []  # Un nivel por decisión: [arista, valores a probar, siguiente, marca, hash, soluciones]
+        self._entering = False  # Hay un nodo pendiente de examinar en la cima de la rama
+
+        start_time = time.perf_counter()
+        self.consistent = self._propagate_initial() if restart else True
+        for edge_id, value in assumptions:
+            if not self.consistent:
+                break
+            self.consistent = self._narrow(edge_id, 1 << value) and self._propagate()
+        self.stats.phases["propagation"] = time.perf_counter() - start_time
+        if self.consistent:
+            self.forced = [self.DOMAIN_MIN[mask] for mask in self.domains]
+            self._entering = True
+            self.done = False
+        else:
+            self._finish()
+
+    def run(self, nodes=None, ms=None):
+        """Avanza la búsqueda hasta terminar o hasta gastar nodes nodos o ms milisegundos.
+
+        Devuelve True si la búsqueda terminó (el resultado queda en solutions,
+        solution y stats) y False si se puede continuar con otra llamada.
+        """
+        if self.done:
+            return True
+        start_time = time.perf_counter()
+        deadline = start_time + ms / 1000 if ms is not None else None
+        finished = self._search(nodes, deadline)
+        self.stats.phases["search"] += time.perf_counter() - start_time
+        if finished:
+            self._finish()
+        return finished
+
+    def abandon(self):
+        """Abandona una búsqueda a medias: deshace la rama y la da por cancelada"""
+        if self.done:
+            return
+        self.limit_reached = True
+        self.cancelled = True
+        self._unwind()
+        self._finish()
+
+    def _finish(self):
+        """Cierra la búsqueda: motivo de fin y estadísticas"""
+        self.done = True
+        self._entering = False
+        if not self.consistent:
+            end_reason = END_CONTRADICTION
+        elif self.cancelled:
+            end_reason = END_CANCELLED
+        elif self.limit_reached:
+            end_reason = END_NODE_LIMIT
+        elif self.solutions >= self.solution_limit:
+            end_reason = END_SOLVED
+        else:
+            end_reason = END_EXHAUSTED
+        self._fill_stats(end_reason)
+        logger.debug("Resolución terminada: %r", self.stats)
+
+    def _fill_stats(self, end_reason):
+        """Copia los contadores de la búsqueda en self.stats"""
+        stats = self.stats
+        stats.end_reason = end_reason
+        stats.nodes = self.nodes
+        stats.solutions = self.solutions
+        stats.propagations = dict(self.rule_counts)
+        stats.backtracks = self.backtracks
+        stats.depth_histogram = list(self.depth_counts)
+        stats.max_depth = max(len(self.depth_counts) - 1, 0)
+        stats.pruned_components = self.pruned_components
+        stats.table = self.table.stats()
+
+    def _checkpoint(self):
+        """Tareas periódicas de la búsqueda: progreso en el log y cancelación.
+
+        Devuelve True si hay que abortar.
+        """
+        if self.nodes >= self._next_progress_log:
+            self._next_progress_log += PROGRESS_LOG_NODES
+            logger.debug("Búsqueda: %d nodos, profundidad %d, %d retrocesos", self.nodes, self.depth,
+                         self.backtracks)
+        return self.cancel is not None and self.cancel()
+
+    def prepare(self):
+        """Propagación inicial para usar el motor paso a paso (sin búsqueda).
+
+        Después, require() añade puentes, trail_mark() y undo_to() permiten
+        volver atrás. Devuelve False si el tablero ya es contradictorio.
+        """
+        self.undo_to(0)
+        return self._propagate_initial()
+
+    def require(self, edge_id, count):
+        """Exige al menos count puentes en una arista y propaga; False si hay contradicción"""
+        mask = self.FULL_DOMAIN & ~((1 << count) - 1)
+        return self._narrow(edge_id, mask) and self._propagate()
+
+    def trail_mark(self):
+        """Marca del estado actual para undo_to"""
+        return len(self.trail)
+
+    def undo_to(self, mark):
+        """Vuelve al estado de una marca de trail_mark"""
+        for island in self.queue:
+            self.queued[island] = False
+        self.queue.clear()
+        self._undo(mark)
+
+    def split(self, depth):
+        """Prefijos de decisiones de los primeros depth niveles de la búsqueda.
+
+        Cada prefijo es una tupla de (id de arista, valor) que sobrevive a la
+        propagación; juntos cubren todo el espacio de búsqueda. Las ramas que
+        quedan completas antes de depth se devuelven más cortas.
+        """
+        self.trail = []
+        if not self._propagate_initial():
+            return []
+        prefixes = []
+        self._split(depth, (), prefixes)
+        return prefixes
+
+    def _split(self, depth, prefix, prefixes):
+        if not self._can_connect():
+            return
+        edge_id = self._select_edge()
+        if depth == 0 or edge_id is None:
+            prefixes.append(prefix)
+            return
+        mark = len(self.trail)
+        for value in reversed(self.DOMAIN_VALUES[self.domains[edge_id]]):
+            if self._narrow(edge_id, 1 << value) and self._propagate():
+                self._split(depth - 1, prefix + ((edge_id, value),), prefixes)
+            self._undo(mark)
+
+    def values(self):
+        """Valor de cada arista en la primera solución encontrada (None si no hay)"""
+        return list(self.solution) if self.solution is not None else None
+
+    def _propagate_initial(self):
+        """Aplica las restricciones de los puentes ya colocados y examina todas las islas"""
+        for edge_id, mask in enumerate(self.domains):
+            if not mask:
+                return False
+            if not mask & 1:
+                for other in self.crossings[edge_id]:
+                    if not self._narrow(other, 1, "crossing"):
+                        return False
+        for island in range(len(self.clues)):
+            self._enqueue(island)
+        return self._propagate()
+
+    def _enqueue(self, island):
+        if not self.queued[island]:
+            self.queued[island] = True
+            self.queue.append(island)
+
+    def _narrow(self, edge_id, mask, rule=None):
+        """Reduce el dominio de una arista y encola sus dos islas.
+
+        rule indica la deducción que provocó el cambio (None para decisiones
+        de la búsqueda). Devuelve False si el dominio queda vacío.
+        """
+        old = self.domains[edge_id]
+        new = old & mask
+        if new == old:
+            return True
+        if not new:
+            return False
+        self.trail.append((edge_id, old))
+        self.domains[edge_id] = new
+        keys = self.free_keys[edge_id]
+        self.state_hash ^= keys[old] ^ keys[new]
+        increase = self.DOMAIN_MIN[new] - self.DOMAIN_MIN[old]
+        if increase:
+            self._change_residual(edge_id, -increase)
+            if old & 1:
+                self._union(edge_id)
+            self.demand[self._find(self.edge_islands[edge_id][0])] -= 2 * increase
+        if rule is not None:
+            self.rule_counts[rule] += 1
+
+        # Si la arista tiene puente seguro, las que la cruzan quedan en 0
+        if not new & 1:
+            for other in self.crossings[edge_id]:
+                if not self._narrow(other, 1, "crossing"):
+                    return False
+
+        i, j = self.edge_islands[edge_id]
+        self._enqueue(i)
+        self._enqueue(j)
+        return True
+
+    def _propagate(self):
+        """Procesa la cola de islas hasta el punto fijo; False si hay contradicción"""
+        queue = self.queue
+        while queue:
+            island = queue.popleft()
+            self.queued[island] = False
+            if not (self._propagate_capacity(island) and self._propagate_components(island)):
+                for pending in queue:
+                    self.queued[pending] = False
+                queue.clear()
+                return False
+        return True
+
+    def _propagate_capacity(self, island):
+        """Acota cada arista por lo que falta a la isla y lo que pueden aportar las demás.
+
+        Un valor v es posible en una arista si el resto de aristas de la isla
+        todavía puede sumar exactamente clue - v.
+        """
+        domains = self.domains
+        clue = self.clues[island]
+        edge_ids = self.island_edges[island]
+        low = high = 0
+        for edge_id in edge_ids:
+            mask = domains[edge_id]
+            low += self.DOMAIN_MIN[mask]
+            high += self.DOMAIN_MAX[mask]
+        if not low <= clue <= high:
+            return False
+        if low == high:
+            return True
+
+        for edge_id in edge_ids:
+            mask = domains[edge_id]
+            others_low = low - self.DOMAIN_MIN[mask]
+            others_high = high - self.DOMAIN_MAX[mask]
+            allowed = 0
+            for value in self.DOMAIN_VALUES[mask]:
+                if others_low <= clue - value <= others_high:
+                    allowed |= 1 << value
+            # Con cotas de antes del cambio la poda es más débil, pero sigue siendo correcta;
+            # la isla vuelve a la cola y se revisa con las cotas nuevas
+            if allowed != mask and not self._narrow(edge_id, allowed, "capacity"):
+                return False
+        return True
+
+    def _change_residual(self, edge_id, delta):
+        """Actualiza la demanda pendiente de los extremos de una arista y su hash"""
+        residual = self.residual
+        for i in self.edge_islands[edge_id]:
+            keys = self.island_keys[i]
+            self.state_hash ^= keys[residual[i] + RESIDUAL_OFFSET] ^ keys[residual[i] + delta + RESIDUAL_OFFSET]
+            residual[i] += delta
+
+    def _find(self, island):
+        """Raíz de la componente de puentes seguros (sin compresión, para poder deshacer)"""
+        parent = self.parent
+        while parent[island] != island:
+            island = parent[island]
+        return island
+
+    def _union(self, edge_id):
+        """Une las componentes de los extremos de una arista (unión por tamaño)"""
+        i, j = self.edge_islands[edge_id]
+        root_i, root_j = self._find(i), self._find(j)
+        if root_i == root_j:
+            self.unions.append(-1)
+            return
+        if self.size[root_i] > self.size[root_j]:
+            root_i, root_j = root_j, root_i
+        self.parent[root_i] = root_j
+        self.size[root_j] += self.size[root_i]
+        self.demand[root_j] += self.demand[root_i]
+        signature_i, signature_j = self.signature[root_i], self.signature[root_j]
+        merged = (signature_i + signature_j) & _MASK64
+        self.state_hash ^= _mix(signature_i) ^ _mix(signature_j) ^ _mix(merged)
+        self.signature[root_j] = merged
+        self.unions.append(root_i)
+
+    def _unmerge(self):
+        """Deshace la última unión"""
+        root_i = self.unions.pop()
+        if root_i < 0:
+            return
+        root_j = self.parent[root_i]
+        self.size[root_j] -= self.size[root_i]
+        self.demand[root_j] -= self.demand[root_i]
+        signature_i, merged = self.signature[root_i], self.signature[root_j]
+        signature_j = (merged - signature_i) & _MASK64
+        self.state_hash ^= _mix(signature_i) ^ _mix(signature_j) ^ _mix(merged)
+        self.signature[root_j] = signature_j
+        self.parent[root_i] = root_i
+
+    def _propagate_components(self, island):
+        """Prohíbe valores que cerrarían una componente aislada del resto.
+
+        Si al fijar una arista a v las islas de ambas componentes quedan
+        completas sin alcanzar todas las islas, v no puede ser parte de la
+        solución. Los casos 1-1 y 2-2 entre islas sueltas se cuentan aparte.
+        """
+        total = len(self.clues)
+        if total <= 2:
+            return True
+        root = self._find(island)
+        own_demand = self.demand[root]
+        # Una sola arista aporta como mucho 2 puentes a cada extremo
+        if own_demand > 4:
+            return True
+
+        for edge_id in self.island_edges[island]:
+            mask = self.domains[edge_id]
+            if len(self.DOMAIN_VALUES[mask]) < 2:
+                continue
+            i, j = self.edge_islands[edge_id]
+            other_root = self._find(j if i == island else i)
+            if other_root == root:
+                merged_size, demand = self.size[root], own_demand
+            else:
+                merged_size = self.size[root] + self.size[other_root]
+                demand = own_demand + self.demand[other_root]
+            if merged_size >= total or demand > 4:
+                continue
+
+            low = self.DOMAIN_MIN[mask]
+            allowed = mask
+            for value in self.DOMAIN_VALUES[mask]:
+                if value > low and demand - 2 * (value - low) == 0:
+                    allowed &= ~(1 << value)
+            if allowed != mask:
+                rule = "isolation" if merged_size == 2 and low == 0 else "component"
+                if not self._narrow(edge_id, allowed, rule):
+                    return False
+        return True
+
+    def _undo(self, mark):
+        """Deshace el trail hasta la marca indicada"""
+        trail = self.trail
+        domains = self.domains
+        domain_min = self.DOMAIN_MIN
+        while len(trail) > mark:
+            edge_id, old = trail.pop()
+            current = domains[edge_id]
+            keys = self.free_keys[edge_id]
+            self.state_hash ^= keys[current] ^ keys[old]
+            increase = domain_min[current] - domain_min[old]
+            if increase:
+                self._change_residual(edge_id, increase)
+                self.demand[self._find(self.edge_islands[edge_id][0])] += 2 * increase
+                if old & 1:
+                    self._unmerge()
+            domains[edge_id] = old
+
+    def _select_edge(self):
+        """Elige la arista a ramificar: la de la isla con menos aristas sin fijar (MRV)"""
+        best_edge = None
+        best_key = None
+        for island, edge_ids in enumerate(self.island_edges):
+            free = [edge_id for edge_id in edge_ids if len(self.DOMAIN_VALUES[self.domains[edge_id]]) > 1]
+            if not free:
+                continue
+            key = (len(free), -self.clues[island])
+            if best_key is None or key < best_key:
+                best_key = key
+                best_edge = min(free, key=lambda edge_id: len(self.DOMAIN_VALUES[self.domains[edge_id]]))
+        return best_edge
+
+    def _can_connect(self):
+        """Verifica que las aristas que aún pueden tener puente conecten todas las islas.
+
+        Un grupo de islas completas cuyas demás aristas ya están en 0 queda
+        separado del resto en este grafo, así que se detecta en cuanto se
+        cierra y no al llegar a una hoja. Con todas las aristas fijadas
+        equivale a comprobar la conectividad de la solución.
+        """
+        parent = list(range(len(self.clues)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        components = len(parent)
+        for edge_id, (i, j) in enumerate(self.edge_islands):
+            if self.domains[edge_id] == 1:
+                continue
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[root_i] = root_j
+                components -= 1
+                if components == 1:
+                    return True
+        return components <= 1
+
+    def _search(self, node_budget=None, deadline=None):
+        """Búsqueda en profundidad con pila explícita, propagando tras cada decisión.
+
+        Cada nivel de self._stack es un nodo con una arista elegida: los
+        valores que quedan por probar, la marca del trail para deshacerlos,
+        el hash del subproblema y las soluciones que había al entrar. Avanza
+        hasta terminar o hasta gastar node_budget nodos o llegar a deadline
+        (perf_counter) antes de examinar un nodo; devuelve True si terminó.
+        """
+        stack = self._stack
+        stop = self.nodes + node_budget if node_budget is not None else None
+        domain_values = self.DOMAIN_VALUES
+        while True:
+            if self._entering:
+                # Examinar el nodo de la cima de la rama
+                if stop is not None and self.nodes >= stop:
+                    return False
+                if deadline is not None and time.perf_counter() >= deadline:
+                    return False
+                self._entering = False
+                self.nodes += 1
+                if self.nodes > self.max_nodes:
+                    self.limit_reached = True
+                    self._unwind()
+                    return True
+                if self.nodes % self.CANCEL_CHECK_INTERVAL == 0 and self._checkpoint():
+                    self.limit_reached = True
+                    self.cancelled = True
+                    self._unwind()
+                    return True
+                if self.depth < len(self.depth_counts):
+                    self.depth_counts[self.depth] += 1
+                else:
+                    self.depth_counts.append(1)
+
+                if self.table.contains(self.state_hash):
+                    # El mismo subproblema ya se exploró por otro camino
+                    failed = True
+                elif not self._can_connect():
+                    # Poda: alguna componente ya no puede alcanzar al resto del tablero
+                    self.pruned_components += 1
+                    self.table.add(self.state_hash)
+                    failed = True
+                else:
+                    edge_id = self._select_edge()
+                    if edge_id is None:
+                        # Todas las aristas fijadas y conectadas: es una solución
+                        self.solutions += 1
+                        if self.solution is None:
+                            self.solution = [self.DOMAIN_MIN[mask] for mask in self.domains]
+                        if self.solutions >= self.solution_limit:
+                            return True
+                        failed = True
+                    else:
+                        # Probar primero el valor más alto: suele completar islas antes
+                        values = domain_values[self.domains[edge_id]][::-1]
+                        stack.append([edge_id, values, 0, len(self.trail), self.state_hash, self.solutions])
+                        failed = False
+                if failed:
+                    if not stack:
+                        return True
+                    self._backtrack(stack[-1])
+
+            if not stack:
+                return True
+            frame = stack[-1]
+            edge_id, values, position, mark = frame[0], frame[1], frame[2], frame[3]
+            if position < len(values):
+                frame[2] = position + 1
+                self.depth += 1
+                if self._narrow(edge_id, 1 << values[position]) and self._propagate():
+                    self._entering = True
+                else:
+                    self._backtrack(frame)
+                continue
+
+            # Valores agotados: solo se registran los subárboles sin ninguna solución
+            stack.pop()
+            if self.solutions == frame[5]:
+                self.table.add(frame[4])
+            if not stack:
+                return True
+            self._backtrack(stack[-1])
+
+    def _backtrack(self, frame):
+        """Deshace el valor que se estaba probando en el nivel frame"""
+        self.depth -= 1
+        self.backtracks += 1
+        self._undo(frame[3])
+
+    def _unwind(self):
+        """Deshace toda la rama actual (búsqueda interrumpida: nada se registra en la tabla)"""
+        stack = self._stack
+        while stack:
+            self._backtrack(stack.pop())
+        self._entering = False
+
+
+def minimal_conflict(game_state, max_nodes=CONFLICT_MAX_NODES, cancel=None):
+    """Subconjunto mínimo de los puentes colocados que no cabe en ninguna solución.
+
+    Devuelve los ids de arista del conjunto (cada una con al menos los
+    puentes que tiene en game_state) o None si los puentes caben en alguna
+    solución. Si ni el tablero vacío tiene solución, el conjunto es vacío.
+    Es ConflictReduction de una vez; ver allí los detalles. Si la primera
+    comprobación no termina (max_nodes o cancel) no se sabe si caben y se
+    lanza ConflictUndecided.
+    """
+    reduction = ConflictReduction(game_state, max_nodes, cancel)
+    reduction.run()
+    if reduction.undecided:
+        raise ConflictUndecided("No se pudo comprobar si los puentes caben en alguna solución")
+    return reduction.conflict
+
+
+class ConflictUndecided(Exception):
+    """La búsqueda del conflicto se detuvo antes de saber si los puentes caben"""
+
+
+class ConflictReduction:
+    """Búsqueda del conjunto mínimo en conflicto que se puede hacer por trozos.
+
+    Se quita un puente cada vez y se descarta si el resto sigue siendo
+    imposible. Cada prueba propaga primero sobre un motor incremental y solo
+    busca si la propagación no basta. Si una búsqueda llega a max_nodes o
+    cancel() se activa, ese puente se queda: el conjunto sigue siendo
+    contradictorio pero puede no ser mínimo (limit_reached queda en True).
+    Si eso pasa en la primera comprobación, con todos los puentes, no se
+    sabe si caben: conflict queda en None y undecided en True.
+
+    run(ms) avanza como mucho unos ms milisegundos (sin límite si es None)
+    y devuelve True al terminar; el resultado queda en conflict.
+    """
+
+    def __init__(self, game_state, max_nodes=CONFLICT_MAX_NODES, cancel=None):
+        self.game_state = game_state
+        self.max_nodes = max_nodes
+        self.cancel = cancel
+        self.counts = list(game_state.edge_counts)
+        self.done = False
+        self.conflict = None
+        self.limit_reached = False  # Alguna prueba se detuvo por max_nodes o cancel
+        self.undecided = False  # No se sabe si los puentes caben (conflict es None)
+        self._deadline = None
+        self._steps = self._reduce()
+
+    def run(self, ms=None):
+        """Avanza la reducción; True si ya terminó"""
+        if self.done:
+            return True
+        self._deadline = time.perf_counter() + ms / 1000 if ms is not None else None
+        for _ in self._steps:
+            if self._deadline is not None and time.perf_counter() >= self._deadline:
+                return False
+        self.done = True
+        return True
+
+    def _cancelled(self):
+        return self.cancel is not None and self.cancel()
+
+    def _reduce(self):
+        """Generador con la reducción completa: cede el control entre pruebas y entre trozos de búsqueda"""
+        counts = self.counts
+        placed = [edge_id for edge_id, count in enumerate(counts) if count]
+        empty = self.game_state.copy()
+        empty.bridges = []
+        self._propagation = EdgeSolver(empty, self.max_nodes, cancel=self.cancel)
+        yield
+        if not self._propagation.prepare():
+            self.conflict = []
+            return
+
+        # Si la propagación ya detecta el conflicto, basta con el prefijo hasta el puente que lo provoca
+        conflict = placed
+        mark = self._propagation.trail_mark()
+        for position, edge_id in enumerate(placed):
+            if not self._propagation.require(edge_id, counts[edge_id]):
+                conflict = placed[:position + 1]
+                break
+        self._propagation.undo_to(mark)
+        if conflict is placed and not (yield from self._refuted(placed)):
+            self.undecided = self.limit_reached
+            return
+
+        for edge_id in list(conflict):
+            if self._cancelled():
+                self.limit_reached = True
+                break
+            yield
+            rest = [other for other in conflict if other != edge_id]
+            if (yield from self._refuted(rest)):
+                conflict = rest
+        self.conflict = conflict
+
+    def _refuted(self, edge_ids):
+        """True si ninguna solución tiene esos puentes (generador: la búsqueda va por trozos).
+
+        La búsqueda parte del motor incremental con los puentes ya exigidos,
+        sin volver a propagar el tablero entero. La tabla de transposición se
+        comparte entre pruebas: su clave es el subproblema que queda.
+        """
+        propagation = self._propagation
+        mark = propagation.trail_mark()
+        refuted = not all(propagation.require(edge_id, self.counts[edge_id]) for edge_id in edge_ids)
+        if not refuted:
+            propagation.begin(restart=False)
+            while not propagation.run(ms=self._slice_ms()):
+                yield
+            refuted = not propagation.solutions and not propagation.limit_reached
+            self.limit_reached = self.limit_reached or propagation.limit_reached
+        propagation.undo_to(mark)
+        return refuted
+
+    def _slice_ms(self):
+        """Milisegundos que quedan del trozo actual (None sin límite)"""
+        if self._deadline is None:
+            return None
+        return max(0.0, (self._deadline - time.perf_counter()) * 1000)
+
+
+class BackgroundSolve:
+    """Resolución en un hilo aparte sobre una copia del tablero.
+
+    El hilo solo toca su copia; el hilo principal consulta progress(),
+    forced_values() y, cuando done es True, found, values y conflict. El
+    EdgeSolver se construye dentro del hilo (en tableros enormes también tarda).
+    """
+
+    def __init__(self, game_state, max_nodes=500000):
+        self._cancel = threading.Event()
+        self.game_state = game_state.copy()
+        self.max_nodes = max_nodes
+        self.solver = None
+        self.done = False
+        self.found = False
+        self.values = None
+        self.conflict = None  # Sin solución: conjunto mínimo de puentes del tablero en conflicto
+        self.conflict_undecided = False  # La reducción no pudo decidir si los puentes caben
+        self._searched = False  # _complete ya recogió el resultado de la búsqueda
+        self._reduction = None  # ConflictReduction pendiente cuando no hay solución
+        self.start_time = None
+        self.elapsed = 0.0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def _run(self):
+        self._begin()
+        if not self._cancel.is_set():
+            self.solver.run()
+        self._complete()
+        if self._reduction is not None:
+            self._reduction.run()
+        self._finish()
+
+    def _begin(self):
+        """Construye el motor y hace la propagación inicial"""
+        self.solver = EdgeSolver(self.game_state, self.max_nodes, cancel=self._cancel.is_set)
+        # Consultar la cancelación más a menudo: la interfaz espera respuesta rápida a ESC
+        self.solver.CANCEL_CHECK_INTERVAL = BACKGROUND_CANCEL_CHECK_INTERVAL
+        self.solver.begin()
+
+    def _complete(self):
+        """Recoge el resultado de la búsqueda; sin solución prepara la reducción del conflicto"""
+        self.solver.abandon()  # Sin efecto si la búsqueda ya terminó
+        self._searched = True
+        self.found = self.solver.solutions > 0
+        self.values = self.solver.values()
+        if not self.found and not self.solver.limit_reached and self.game_state.bridges:
+            self._reduction = ConflictReduction(self.game_state, cancel=self._cancel.is_set)
+
+    def _finish(self):
+        """Cierra la tarea con el conflicto (si lo hubo)"""
+        if self._reduction is not None:
+            self.conflict = self._reduction.conflict
+            self.conflict_undecided = self._reduction.undecided
+        self.elapsed = time.perf_counter() - self.start_time
+        self.done = True
+
+    def step(self, ms):
+        """El hilo avanza solo; devuelve True cuando ha terminado"""
+        return self.done
+
+    def cancel(self):
+        """Pide abandonar la búsqueda (tarda como mucho CANCEL_CHECK_INTERVAL nodos)"""
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set() and not self.found
+
+    def forced_values(self):
+        """Puentes seguros deducidos antes de buscar (None si aún no se conocen)"""
+        return self.solver.forced if self.solver is not None else None
+
+    def progress(self):
+        """Nodos, profundidad actual y segundos transcurridos"""
+        solver = self.solver
+        elapsed = self.elapsed if self.done else time.perf_counter() - self.start_time
+        return {"nodes": solver.nodes if solver else 0, "depth": solver.depth if solver else 0, "elapsed": elapsed}
+
+
+class SlicedSolve(BackgroundSolve):
+    """Resolución sin hilos: el bucle del juego la hace avanzar con step().
+
+    start() hace la propagación inicial y cada step(ms) continúa la
+    búsqueda (y después la reducción del conflicto, si no hay solución)
+    durante ms milisegundos como mucho. Tiene la misma interfaz que
+    BackgroundSolve.
+    """
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        self._begin()
+        return self
+
+    def step(self, ms):
+        """Avanza la búsqueda durante ms milisegundos; devuelve True cuando ha terminado"""
+        if self.done:
+            return True
+        if not self._searched:
+            if not self._cancel.is_set() and not self.solver.run(ms=ms):
+                return False
+            self._complete()
+            if self._reduction is not None:
+                return False  # La reducción empieza en el siguiente trozo
+        if self._reduction is not None and not self._reduction.run(ms=ms):
+            return False
+        self._finish()
+        return True
+
+
+class AutoPlayer:
+    """Jugador automático que resuelve el juego con propagación y búsqueda sobre dominios de aristas"""
+
+    def __init__(self, game_state):
+        self.game_state = game_state
+        self.solution_steps = []
+        self.solving = False
+        self.step_index = 0
+        self.iterations = 0
+        self.max_iterations = 500000  # Límite de seguridad aumentado
+        self.deductions = {}  # Regla -> deducciones hechas en la última resolución
+        self.table_stats = {}  # Contadores de la tabla de transposición
+        self.stats = None  # SolverStats de la última resolución
+        self.background = None  # BackgroundSolve (o SlicedSolve) en curso
+        self.threaded = True  # False: resolver por trozos desde el bucle del juego, sin hilos
+        self.initial_bridges = []  # Puentes del tablero al empezar la última resolución
+        self.conflict = None  # Ids de arista de los puentes iniciales que no caben en ninguna solución
+        self.conflict_undecided = False  # No se pudo comprobar si los puentes iniciales caben
+        self.cache = None  # SolutionCache: soluciones conocidas (también del tablero girado o reflejado)
+        self._planned = []  # Puentes por arista que tendrá el tablero tras los pasos encolados
+
+    def solve(self, stats_file=None):
+        """Resuelve el juego y guarda los pasos de la solución.
+
+        Los puentes ya colocados se respetan: solo se busca el resto y los
+        pasos son los puentes que faltan. Si no caben en ninguna solución,
+        self.conflict queda con el conjunto mínimo en conflicto (y si no se
+        pudo comprobar, self.conflict_undecided queda en True). Las
+        estadísticas quedan en self.stats; con stats_file se guardan además
+        como JSON. Con self.cache, una solución guardada evita la búsqueda
+        (y self.stats queda en None).
+        """
+        logger.info("Iniciando resolución automática...")
+        self.solution_steps = []  # Limpiar pasos anteriores
+        self.iterations = 0
+        self.conflict = None
+        self.conflict_undecided = False
+
+        # Guardar estado inicial
+        initial_bridges = [bridge for bridge in self.game_state.bridges]
+        self.initial_bridges = initial_bridges
+
+        values = self._cached_values()
+        if values is not None:
+            self._apply_assignment(values)
+            self.stats = None
+            logger.info("Solución recuperada de la caché con %d pasos", len(self.solution_steps))
+            return True
+
+        # Propagación de deducciones y búsqueda sobre dominios
+        solver = EdgeSolver(self.game_state, self.max_iterations)
+        found = solver.solve()
+        self._record_stats(solver.stats, stats_file)
+        if solver.limit_reached:
+            logger.warning("Límite de iteraciones alcanzado (%d)", self.max_iterations)
+        if found:
+            self._apply_assignment(solver.values())
+            logger.info("¡Solución encontrada con %d pasos! (%d nodos, %.3f s)", len(self.solution_steps),
+                        self.iterations, self.stats.seconds)
+
+            # Verificar que la solución es válida
+            if self.game_state.check_victory():
+                logger.debug("Solución validada: %d puentes, conectividad verificada", len(self.game_state.bridges))
+                if self.cache is not None:
+                    self.cache.store(self.game_state, self.game_state.edge_counts)
+                return True
+            else:
+                logger.error("La solución no es válida (conectividad: %s)", self.game_state.check_connectivity())
+                # Restaurar estado inicial
+                self.game_state.bridges = initial_bridges
+                return False
+        else:
+            logger.info("No se encontró solución (%s, %d nodos)", self.stats.end_reason, self.iterations)
+            if initial_bridges and not solver.limit_reached:
+                try:
+                    self.conflict = minimal_conflict(self.game_state)
+                except ConflictUndecided:
+                    self.conflict_undecided = True
+                self._log_conflict()
+            # Restaurar estado inicial
+            self.game_state.bridges = initial_bridges
+            return False
+
+    def _cached_values(self):
+        """Solución de la caché que respeta los puentes ya colocados (None si no hay ninguna).
+
+        La entrada se comprueba sobre una copia antes de usarla: un archivo
+        corrupto o una colisión del hash hacen que se busque de nuevo.
+        """
+        if self.cache is None:
+            return None
+        return self.cache.lookup(self.game_state, check=self._usable_cached_values)
+
+    def _usable_cached_values(self, values):
+        """True si values respeta los puentes ya colocados y es una solución válida"""
+        if any(count > value for count, value in zip(self.game_state.edge_counts, values)):
+            return False
+        if not self._valid_assignment(values):
+            logger.warning("La solución de la caché no es válida; se resuelve de nuevo")
+            return False
+        return True
+
+    def _valid_assignment(self, values):
+        """True si values (puentes por id de arista) es una solución del tablero"""
+        state = self.game_state
+        if any(not 0 <= count <= 2 for count in values):
+            return False
+        if any(count and any(values[other] for other in state.edge_crossings[edge_id])
+               for edge_id, count in enumerate(values)):
+            return False
+        trial = state.copy()
+        trial.bridges = [(*state.edges[edge_id], count) for edge_id, count in enumerate(values) if count]
+        return trial.check_victory()
+
+    def _log_conflict(self):
+        """Informa de los puentes iniciales en conflicto"""
+        if self.conflict_undecided:
+            logger.warning("No se pudo comprobar si los puentes colocados caben en alguna solución (límite de %d "
+                           "nodos); se abandona", CONFLICT_MAX_NODES)
+        if self.conflict:
+            logger.info("%d puentes colocados no caben en ninguna solución: %s", len(self.conflict),
+                        ", ".join(f"{start}-{end}" for start, end in map(self.game_state.edges.__getitem__,
+                                                                         self.conflict)))
+
+    def _record_stats(self, stats, stats_file=None):
+        """Guarda las estadísticas de una resolución (y opcionalmente las escribe en JSON)"""
+        self.stats = stats
+        self.iterations = stats.nodes
+        self.deductions = dict(stats.propagations)
+        self.table_stats = dict(stats.table)
+        logger.debug("Deducciones por regla: %s", ", ".join(f"{rule}={count}" for rule, count in
+                                                             self.deductions.items()))
+        logger.debug("Tabla de transposición: %d aciertos, %d fallos", self.table_stats["hits"],
+                     self.table_stats["misses"])
+        if stats_file:
+            stats.write_json(stats_file)
+
+    def count_solutions(self, limit=2):
+        """Cuenta las soluciones desde el tablero actual, deteniéndose en limit"""
+        solver = EdgeSolver(self.game_state, self.max_iterations)
+        count = solver.count_solutions(limit)
+        self._record_stats(solver.stats)
+        return count
+
+    def solve_parallel(self, workers=None):
+        """Resuelve repartiendo los primeros niveles de la búsqueda entre varios procesos"""
+        from hashi.parallel import parallel_solve
+
+        self.solution_steps = []
+        self.step_index = 0
+        self.conflict = None
+        self.conflict_undecided = False
+        self.initial_bridges = self.game_state.bridges
+        values, stats = parallel_solve(self.game_state, workers, max_nodes=self.max_iterations)
+        self.iterations = stats["nodes"]
+        logger.info("Búsqueda paralela: %d subproblemas en %d procesos, %d nodos", stats["subproblems"],
+                    stats["workers"], stats["nodes"])
+        if values is None:
+            logger.info("No se encontró solución (%s)", stats["status"])
+            return False
+        self._apply_assignment(values)
+        return self.game_state.check_victory()
+
+    def start_background_solve(self):
+        """Lanza la búsqueda en un hilo; los pasos llegan con update_background_solve.
+
+        Parte de los puentes actuales: los pasos son solo los que faltan. Si
+        la solución está en self.cache no se lanza nada: los pasos quedan en
+        solution_steps y devuelve None.
+        """
+        self.solution_steps = []
+        self.step_index = 0
+        self.solving = True
+        self.conflict = None
+        self.conflict_undecided = False
+        self.initial_bridges = self.game_state.bridges
+        self._planned = list(self.game_state.edge_counts)
+        values = self._cached_values()
+        if values is not None:
+            self._queue_assignment(values)
+            self.solving = False
+            self.stats = None
+            logger.info("Solución recuperada de la caché con %d pasos", len(self.solution_steps))
+            return None
+        task_class = BackgroundSolve if self.threaded else SlicedSolve
+        self.background = task_class(self.game_state, self.max_iterations).start()
+        return self.background
+
+    def update_background_solve(self, slice_ms=SOLVE_SLICE_MS):
+        """Encola los pasos que ya se conocen; devuelve True mientras la búsqueda siga en curso.
+
+        Sin hilos, cada llamada avanza además la búsqueda slice_ms
+        milisegundos. Los puentes seguros de la propagación inicial están en
+        todas las soluciones, así que la reproducción puede empezar con ellos
+        antes de que termine la búsqueda; la solución completa añade el resto.
+        """
+        task = self.background
+        if task is None:
+            return False
+        task.step(slice_ms)
+        values = task.values if task.done and task.found else task.forced_values()
+        if values is not None:
+            self._queue_assignment(values)
+        if not task.done:
+            return True
+
+        self.background = None
+        self.solving = False
+        self._record_stats(task.solver.stats)
+        if task.found:
+            logger.info("¡Solución encontrada con %d pasos en %.2f s!", len(self.solution_steps), task.elapsed)
+            if self.cache is not None:
+                self.cache.store(self.game_state, task.values)
+        elif task.cancelled:
+            logger.info("Resolución cancelada tras %d nodos", self.iterations)
+        else:
+            logger.info("No se encontró solución (%s, %d nodos)", self.stats.end_reason, self.iterations)
+            self.conflict = task.conflict
+            self.conflict_undecided = task.conflict_undecided
+            self._log_conflict()
+        return False
+
+    def cancel_background_solve(self):
+        """Cancela la búsqueda en curso (el resultado llega en la siguiente actualización)"""
+        if self.background is not None:
+            self.background.cancel()
+
+    def _queue_assignment(self, values):
+        """Añade a solution_steps los puentes que faltan para llegar a values"""
+        state = self.game_state
+        for edge_id, value in enumerate(values):
+            missing = value - self._planned[edge_id]
+            if missing > 0:
+                start, end = state.edges[edge_id]
+                self.solution_steps.extend([(start, end, "add")] * missing)
+                self._planned[edge_id] = value
+
+    def _apply_assignment(self, values):
+        """Coloca los puentes que faltan según los valores por arista y registra los pasos"""
+        state = self.game_state
+        for edge_id, value in enumerate(values):
+            start, end = state.edges[edge_id]
+            for _ in range(value - state.edge_counts[edge_id]):
+                state.add_bridge(start, end)
+                self.solution_steps.append((start, end, "add"))
+
+    def start_visualization(self):
+        """Inicia la visualización paso a paso desde los puentes con que empezó la resolución"""
+        self.solving = True
+        self.step_index = 0
+        self.game_state.bridges = self.initial_bridges
+
+    def next_step(self):
+        """Ejecuta el siguiente paso de la solución"""
+        if self.step_index < len(self.solution_steps):
+            start, end, action = self.solution_steps[self.step_index]
+            if action == "add":
+                self.game_state.add_bridge(start, end)
+            self.step_index += 1
+            return True
+        return False
@@ -0,0 +1,523 @@
+"""Modelo del tablero: islas, aristas candidatas y puentes colocados"""
+
+import random
+from array import array
+from bisect import bisect_left, bisect_right
+
+from hashi.persistent import PersistentVector
+
+# Semilla de las claves Zobrist de las aristas
+ZOBRIST_SEED = 0x5A0B12
+# Valor máximo de una isla: 4 vecinos con 2 puentes cada uno
+MAX_CLUE = 8
+
+# Claves ya generadas, compartidas por todos los tableros (dependen solo del id de arista)
+_zobrist_table = []
+_zobrist_rng = random.Random(ZOBRIST_SEED)
+
+
+def _zobrist_keys(count):
+    """Claves Zobrist de las aristas 0..count-1 (8 por arista, una por máscara)"""
+    while len(_zobrist_table) < count:
+        _zobrist_table.append(tuple(_zobrist_rng.getrandbits(64) for _ in range(8)))
+    return _zobrist_table[:count]
+
+
+class GameState:
+    """Clase que maneja el estado del juego (tablero y puentes)"""
+
+    def __init__(self, filename):
+        self.load_board(filename)
+        self.bridges = []  # Lista de puentes: (start_pos, end_pos, count)
+
+    @staticmethod
+    def edge_key(start, end):
+        """Clave normalizada de una arista, la de edge_ids (independiente del orden de los extremos)"""
+        return (start, end) if start <= end else (end, start)
+
+    @staticmethod
+    def _count_mask(count):
+        """Índice de la clave Zobrist para un número de puentes.
+
+        Más de 2 puentes solo aparece si se llama a add_bridge sin comprobar
+        can_add_bridge; esos estados comparten la clave de la máscara vacía.
+        """
+        return 1 << count if count <= 2 else 0
+
+    @property
+    def bridges(self):
+        """Lista de puentes: (start_pos, end_pos, count)"""
+        return list(self._bridges.values())
+
+    @bridges.setter
+    def bridges(self, bridges):
+        # Reconstruir los índices incrementales a partir de la lista
+        self._bridges = {}  # Arista normalizada -> (start_pos, end_pos, count)
+        self._degree = {}  # Isla -> puentes conectados
+        self.edge_counts = [0] * len(self.edges)  # Id de arista -> puentes
+        for start, end, count in bridges:
+            key = self.edge_key(start, end)
+            self._bridges[key] = (start, end, count)
+            self._degree[start] = self._degree.get(start, 0) + count
+            self._degree[end] = self._degree.get(end, 0) + count
+            edge_id = self.edge_ids.get(key)
+            if edge_id is not None:
+                self.edge_counts[edge_id] = count
+        self._shared = False  # copy() comparte los puentes hasta que alguno cambie (ver _unshare)
+        # Versión persistente de edge_counts: se construye en la primera snapshot()
+        self._counts = None
+        self._pending = set()  # Aristas cambiadas desde la última snapshot()
+        # Hash Zobrist de los puentes colocados
+        self.state_hash = 0
+        for edge_id, count in enumerate(self.edge_counts):
+            self.state_hash ^= self.zobrist_keys[edge_id][self._count_mask(count)]
+        # Islas cuyo número de puentes no coincide con su valor
+        self._unsatisfied = sum(1 for row, col, required in self.islands
+                                if self._degree.get((row, col), 0) != required)
+        self._components_dirty = True
+
+    @classmethod
+    def from_board(cls, board):
+        """Crea un estado a partir de una matriz de valores, sin pasar por un archivo"""
+        state = cls.__new__(cls)
+        state.set_board(board)
+        state.bridges = []
+        return state
+
+    @classmethod
+    def from_collection(cls, filename, index):
+        """Crea un estado con el tablero index de una colección (ver PuzzleCollection.game_state)"""
+        from hashi.collection import PuzzleCollection
+        with PuzzleCollection(filename) as collection:
+            return collection.game_state(index, cls)
+
+    @classmethod
+    def from_islands(cls, rows, cols, islands):
+        """Crea un estado a partir de una lista de islas (row, col, value)"""
+        state = cls.__new__(cls)
+        state.set_islands(rows, cols, [row for row, _, _ in islands], [col for _, col, _ in islands],
+                          [value for _, _, value in islands])
+        state.bridges = []
+        return state
+
+    def load_board(self, filename):
+        """Carga el tablero desde un archivo.
+
+        Admite dos formatos, distinguidos por la cabecera:
+            denso    "filas,columnas" y una línea de dígitos por fila
+            disperso "filas,columnas,islas" y una línea "fila,columna,valor"
+                     por isla (también separadas por espacios)
+        """
+        with open(filename, 'r') as f:
+            header = f.readline().strip().split(',')
+            rows, cols = int(header[0]), int(header[1])
+            if len(header) > 2:
+                # Formato disperso: todos los números de una vez
+                values = array('l', map(int, f.read().replace(',', ' ').split()))
+                count = int(header[2])
+                if len(values) != 3 * count:
+                    raise ValueError(f"Se esperaban {count} islas y hay {len(values) / 3:g}")
+                self.set_islands(rows, cols, values[0::3], values[1::3], values[2::3])
+                return
+
+            island_rows = array('l')
+            island_cols = array('l')
+            island_values = array('l')
+            for row in range(rows):
+                line = f.readline().strip()
+                # Solo se convierten las celdas con isla
+                for col, char in enumerate(line):
+                    if char != '0':
+                        island_rows.append(row)
+                        island_cols.append(col)
+                        island_values.append(int(char))
+        self.set_islands(rows, cols, island_rows, island_cols, island_values)
+
+    def set_board(self, board):
+        """Fija la matriz del tablero y precalcula sus aristas"""
+        cols = len(board[0]) if board else 0
+        islands = [(row, col, value) for row, line in enumerate(board) for col, value in enumerate(line) if value > 0]
+        self.set_islands(len(board), cols, [row for row, _, _ in islands], [col for _, col, _ in islands],
+                         [value for _, _, value in islands])
+
+    def set_islands(self, rows, cols, island_rows, island_cols, island_values):
+        """Fija las islas (tres secuencias paralelas) y precalcula sus aristas.
+
+        Solo se guardan las islas, en arrays ordenados por filas: la memoria
+        depende del número de islas y no de rows * cols.
+        """
+        order = range(len(island_values))
+        keys = [row * cols + col for row, col in zip(island_rows, island_cols)]
+        if any(keys[i] >= keys[i + 1] for i in range(len(keys) - 1)):
+            order = sorted(order, key=keys.__getitem__)
+            if any(keys[order[i]] == keys[order[i + 1]] for i in range(len(order) - 1)):
+                raise ValueError("Hay dos islas en la misma celda")
+        self.rows = rows
+        self.cols = cols
+        self.island_rows = array('l', (island_rows[i] for i in order))
+        self.island_cols = array('l', (island_cols[i] for i in order))
+        self.island_values = array('l', (island_values[i] for i in order))
+        for row, col, value in zip(self.island_rows, self.island_cols, self.island_values):
+            if not (0 <= row < rows and 0 <= col < cols):
+                raise ValueError(f"Isla fuera del tablero: {(row, col, value)}")
+            if not 1 <= value <= MAX_CLUE:
+                raise ValueError(f"Valor de isla fuera de rango (1-{MAX_CLUE}): {(row, col, value)}")
+        self._build_edges()
+
+    @property
+    def board(self):
+        """Matriz densa del tablero (se construye al pedirla; ocupa rows * cols)"""
+        board = [[0] * self.cols for _ in range(self.rows)]
+        for row, col, value in self.islands:
+            board[row][col] = value
+        return board
+
+    def island_value(self, pos):
+        """Valor de la isla en una posición (0 si no hay isla)"""
+        index = self.island_index.get(pos)
+        return 0 if index is None else self.island_values[index]
+
+    def _build_edges(self):
+        """Precalcula las aristas candidatas (pares de islas vecinas) y sus cruces.
+
+        La disposición de las islas no cambia después de cargar el tablero, así
+        que cada par legal recibe un id entero y la lista de ids con los que se
+        cruza. Las comprobaciones de legalidad solo miran esas aristas.
+        """
+        self.islands = list(zip(self.island_rows, self.island_cols, self.island_values))
+
+        # Vecino más cercano abajo y a la derecha: recorriendo las islas por filas,
+        # es la isla anterior de la misma fila o de la misma columna
+        below = {}
+        right = {}
+        last_in_col = {}
+        previous = None
+        for row, col, _ in self.islands:
+            pos = (row, col)
+            if previous is not None and previous[0] == row:
+                right[previous] = pos
+            if col in last_in_col:
+                below[last_in_col[col]] = pos
+            last_in_col[col] = pos
+            previous = pos
+
+        self.edges = []  # Id de arista -> (start_pos, end_pos) normalizado
+        self.edge_ids = {}  # (start_pos, end_pos) normalizado -> id de arista
+        for row, col, _ in self.islands:
+            for neighbor in (below.get((row, col)), right.get((row, col))):
+                if neighbor is not None:
+                    self.edge_ids[((row, col), neighbor)] = len(self.edges)
+                    self.edges.append(((row, col), neighbor))
+
+        # Isla -> [(id de arista, vecino)] en el orden de get_neighbors
+        above = {end: start for start, end in below.items()}
+        left = {end: start for start, end in right.items()}
+        self.island_edges = {}
+        for row, col, _ in self.islands:
+            pos = (row, col)
+            entries = []
+            for neighbor in (above.get(pos), below.get(pos), left.get(pos), right.get(pos)):
+                if neighbor is not None:
+                    entries.append((self.edge_ids[self.edge_key(pos, neighbor)], neighbor))
+            self.island_edges[pos] = entries
+
+        self.island_index = {(row, col): i for i, (row, col, _) in enumerate(self.islands)}
+
+        # Id de arista -> ids de las aristas que la cruzan
+        # Las aristas horizontales de una fila no se solapan: ordenadas por columna
+        # inicial, basta una búsqueda binaria para encontrar la que pasa por una columna
+        self.edge_crossings = [[] for _ in self.edges]
+        rows_with_edges = {}  # Fila -> ([columna inicial], [(columna final, id)])
+        for edge_id, (start, end) in enumerate(self.edges):
+            if start[0] == end[0]:
+                starts, ends = rows_with_edges.setdefault(start[0], ([], []))
+                starts.append(start[1])
+                ends.append((end[1], edge_id))
+        edge_rows = sorted(rows_with_edges)
+        for edge_id, (start, end) in enumerate(self.edges):
+            if start[1] == end[1]:
+                col = start[1]
+                for index in range(bisect_right(edge_rows, start[0]), bisect_left(edge_rows, end[0])):
+                    starts, ends = rows_with_edges[edge_rows[index]]
+                    position = bisect_left(starts, col) - 1
+                    if position >= 0 and col < ends[position][0]:
+                        other = ends[position][1]
+                        self.edge_crossings[edge_id].append(other)
+                        self.edge_crossings[other].append(edge_id)
+
+        # Claves Zobrist por arista, indexadas por máscara de valores {0, 1, 2}:
+        # un número de puentes c usa la clave de la máscara 1 << c. La semilla es
+        # fija para que el hash de un tablero sea el mismo en todos los procesos.
+        self.zobrist_keys = _zobrist_keys(len(self.edges))
+
+    def get_islands(self):
+        """Retorna lista de todas las islas (row, col, value)"""
+        return list(self.islands)
+
+    def count_bridges_for_island(self, row, col):
+        """Cuenta puentes conectados a una isla"""
+        return self._degree.get((row, col), 0)
+
+    def get_bridge_between(self, start, end):
+        """Obtiene el puente entre dos islas (si existe)"""
+        return self._bridges.get(self.edge_key(start, end))
+
+    def can_add_bridge(self, start, end):
+        """Verifica si se puede agregar un puente entre dos islas"""
+        edge_id = self.edge_ids.get(self.edge_key(start, end))
+        if edge_id is None:
+            if start == end:
+                return False, "No puedes conectar una isla consigo misma"
+
+            if start[0] != end[0] and start[1] != end[1]:
+                return False, "Los puentes deben ser horizontales o verticales"
+
+            # Alineadas pero no vecinas: hay islas intermedias
+            return False, "Hay una isla en el camino"
+
+        # Verificar cruce de puentes
+        for other in self.edge_crossings[edge_id]:
+            if self.edge_counts[other]:
+                return False, "Los puentes no pueden cruzarse"
+
+        # Verificar límite de 2 puentes
+        if self.edge_counts[edge_id] >= 2:
+            return False, "Ya hay 2 puentes entre estas islas"
+
+        # Verificar que no exceda el límite de la isla
+        start_current = self.count_bridges_for_island(start[0], start[1])
+        end_current = self.count_bridges_for_island(end[0], end[1])
+        if start_current >= self.island_value(start):
+            return False, f"La isla {self.island_value(start)} ya tiene todos sus puentes"
+        if end_current >= self.island_value(end):
+            return False, f"La isla destino ya tiene todos sus puentes"
+
+        return True, "OK"
+
+    def can_add_edge(self, edge_id):
+        """Versión rápida de can_add_bridge para una arista candidata (sin mensaje)"""
+        if self.edge_counts[edge_id] >= 2:
+            return False
+        for other in self.edge_crossings[edge_id]:
+            if self.edge_counts[other]:
+                return False
+        start, end = self.edges[edge_id]
+        values = self.island_values
+        index = self.island_index
+        return (self._degree.get(start, 0) < values[index[start]] and
+                self._degree.get(end, 0) < values[index[end]])
+
+    def bridges_cross(self, bridge1, bridge2):
+        """Verifica si dos puentes se cruzan"""
+        s1, e1 = bridge1
+        s2, e2 = bridge2
+
+        # Si comparten un extremo, no se cruzan
+        if s1 == s2 or s1 == e2 or e1 == s2 or e1 == e2:
+            return False
+
+        # Uno horizontal y otro vertical
+        if s1[0] == e1[0] and s2[1] == e2[1]:  # bridge1 horizontal, bridge2 vertical
+            h_row = s1[0]
+            h_col_min, h_col_max = min(s1[1], e1[1]), max(s1[1], e1[1])
+            v_col = s2[1]
+            v_row_min, v_row_max = min(s2[0], e2[0]), max(s2[0], e2[0])
+            return (v_row_min < h_row < v_row_max) and (h_col_min < v_col < h_col_max)
+
+        if s1[1] == e1[1] and s2[0] == e2[0]:  # bridge1 vertical, bridge2 horizontal
+            v_col = s1[1]
+            v_row_min, v_row_max = min(s1[0], e1[0]), max(s1[0], e1[0])
+            h_row = s2[0]
+            h_col_min, h_col_max = min(s2[1], e2[1]), max(s2[1], e2[1])
+            return (v_row_min < h_row < v_row_max) and (h_col_min < v_col < h_col_max)
+
+        return False
+
+    def add_bridge(self, start, end):
+        """Agrega un puente entre dos islas"""
+        if self._shared:
+            self._unshare()
+        key = self.edge_key(start, end)
+        bridge = self._bridges.get(key)
+        if bridge:
+            self._bridges[key] = (bridge[0], bridge[1], bridge[2] + 1)
+        else:
+            self._bridges[key] = (start, end, 1)
+            if not self._components_dirty:
+                self._union(start, end)
+        self._change_degree(start, 1)
+        self._change_degree(end, 1)
+        edge_id = self.edge_ids.get(key)
+        if edge_id is not None:
+            count = self.edge_counts[edge_id]
+            keys = self.zobrist_keys[edge_id]
+            self.state_hash ^= keys[self._count_mask(count)] ^ keys[self._count_mask(count + 1)]
+            self.edge_counts[edge_id] = count + 1
+            self._pending.add(edge_id)
+        return True
+
+    def remove_bridge(self, start, end):
+        """Elimina un puente entre dos islas"""
+        key = self.edge_key(start, end)
+        bridge = self._bridges.get(key)
+        if not bridge:
+            return False
+        if self._shared:
+            self._unshare()
+        if bridge[2] > 1:
+            self._bridges[key] = (bridge[0], bridge[1], bridge[2] - 1)
+        else:
+            del self._bridges[key]
+            # La unión-búsqueda no admite borrados: se reconstruye en la próxima consulta
+            self._components_dirty = True
+        self._change_degree(start, -1)
+        self._change_degree(end, -1)
+        edge_id = self.edge_ids.get(key)
+        if edge_id is not None:
+            count = self.edge_counts[edge_id]
+            keys = self.zobrist_keys[edge_id]
+            self.state_hash ^= keys[self._count_mask(count)] ^ keys[self._count_mask(count - 1)]
+            self.edge_counts[edge_id] = count - 1
+            self._pending.add(edge_id)
+        return True
+
+    def _unshare(self):
+        """Copia propia de los puentes antes del primer cambio tras copy()"""
+        self._bridges = dict(self._bridges)
+        self._degree = dict(self._degree)
+        self.edge_counts = list(self.edge_counts)
+        self._shared = False
+
+    def _change_degree(self, pos, delta):
+        """Actualiza el grado de una isla y el contador de islas insatisfechas"""
+        before = self._degree.get(pos, 0)
+        self._degree[pos] = before + delta
+        required = self.island_value(pos)
+        self._unsatisfied += (before + delta != required) - (before != required)
+
+    def _find(self, i):
+        """Raíz de la componente de la isla con índice i (con compresión de caminos)"""
+        parent = self._parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def _union(self, start, end):
+        """Une las componentes de dos islas conectadas por un puente"""
+        i = self.island_index.get(start)
+        j = self.island_index.get(end)
+        if i is None or j is None:
+            return
+        root_i, root_j = self._find(i), self._find(j)
+        if root_i != root_j:
+            self._parent[root_i] = root_j
+            self._components -= 1
+
+    def _rebuild_components(self):
+        """Reconstruye la unión-búsqueda a partir de los puentes actuales"""
+        self._parent = list(range(len(self.islands)))
+        self._components = len(self.islands)
+        self._components_dirty = False
+        for start, end in self._bridges:
+            self._union(start, end)
+
+    def get_neighbors(self, island_pos):
+        """Obtiene las islas vecinas (en línea recta sin obstáculos)"""
+        return [neighbor for _, neighbor in self.island_edges.get(island_pos, ())]
+
+    def check_connectivity(self):
+        """Verifica que todas las islas estén conectadas mediante puentes"""
+        if not self.islands:
+            return True
+
+        if not self._bridges:
+            return False
+
+        if self._components_dirty:
+            self._rebuild_components()
+        return self._components == 1
+
+    def all_islands_complete(self):
+        """Verifica si todas las islas tienen el número correcto de puentes"""
+        return self._unsatisfied == 0
+
+    def check_victory(self):
+        """Verifica si el juego está completo"""
+        # Verificar que todas las islas tengan el número correcto de puentes
+        if self._unsatisfied:
+            return False
+
+        # Verificar que haya puentes
+        if not self._bridges:
+            return False
+
+        # Verificar conectividad (NO debe haber islas aisladas)
+        return self.check_connectivity()
+
+    def reset(self):
+        """Reinicia el estado del juego"""
+        self.bridges = []
+
+    def snapshot(self):
+        """Instantánea inmutable de los puentes (ver restore).
+
+        Es un PersistentVector con los puentes por arista: las instantáneas
+        comparten todos los nodos salvo los de las aristas que cambiaron. Se
+        pone al día al pedirla, en O(k log n) para k aristas cambiadas desde
+        la anterior; add_bridge y remove_bridge solo apuntan la arista.
+        """
+        if self._counts is None:
+            self._counts = PersistentVector(self.edge_counts)
+        elif self._pending:
+            counts = self._counts
+            for edge_id in self._pending:
+                counts = counts.set(edge_id, self.edge_counts[edge_id])
+            self._counts = counts
+        self._pending = set()
+        return self._counts
+
+    def restore(self, snapshot):
+        """Vuelve a los puentes de una instantánea de este tablero.
+
+        Solo toca las aristas que difieren (O(k log n) para k cambios) y
+        mantiene al día grados, hash y conectividad como add_bridge.
+        """
+        for edge_id in list(snapshot.diff(self.snapshot())):
+            start, end = self.edges[edge_id]
+            target = snapshot[edge_id]
+            while self.edge_counts[edge_id] < target:
+                self.add_bridge(start, end)
+            while self.edge_counts[edge_id] > target:
+                self.remove_bridge(start, end)
+        # Mismo contenido: quedarse con la instantánea para seguir compartiendo sus nodos
+        self._counts = snapshot
+        self._pending = set()
+
+    def copy(self):
+        """Crea una copia del estado del juego"""
+        new_state = GameState.__new__(GameState)
+        new_state.rows = self.rows
+        new_state.cols = self.cols
+        # Las islas y el grafo de aristas candidatas son estáticos y se comparten
+        new_state.island_rows = self.island_rows
+        new_state.island_cols = self.island_cols
+        new_state.island_values = self.island_values
+        new_state.islands = self.islands
+        new_state.edges = self.edges
+        new_state.edge_ids = self.edge_ids
+        new_state.island_edges = self.island_edges
+        new_state.edge_crossings = self.edge_crossings
+        new_state.zobrist_keys = self.zobrist_keys
+        new_state.state_hash = self.state_hash
+        # Los puentes se comparten hasta que uno de los dos los cambie
+        self._shared = new_state._shared = True
+        new_state._bridges = self._bridges
+        new_state._degree = self._degree
+        new_state.edge_counts = self.edge_counts
+        new_state._counts = self._counts
+        new_state._pending = set(self._pending)
+        new_state.island_index = self.island_index
+        new_state._unsatisfied = self._unsatisfied
+        new_state._components_dirty = True
+        return new_state
@@ -0,0 +1,61 @@
+"""Estadísticas estructuradas de una resolución"""
+
+import json
+
+# Motivos por los que termina una resolución
+END_SOLVED = "solved"  # Se alcanzó el número de soluciones pedido
+END_EXHAUSTED = "exhausted"  # Se recorrió todo el árbol (sin solución o con menos de las pedidas)
+END_NODE_LIMIT = "node_limit"
+END_CANCELLED = "cancelled"
+END_CONTRADICTION = "contradiction"  # La propagación inicial ya encontró una contradicción
+
+
+class SolverStats:
+    """Contadores de una resolución de EdgeSolver.
+
+    nodes son los nodos de búsqueda expandidos; propagations las
+    deducciones por regla; backtracks los valores probados que hubo que
+    deshacer; depth_histogram[d] los nodos visitados a profundidad d; phases
+    los segundos de cada fase ("propagation" antes de buscar, "search").
+    """
+
+    def __init__(self):
+        self.nodes = 0
+        self.propagations = {}
+        self.backtracks = 0
+        self.max_depth = 0
+        self.depth_histogram = []
+        self.pruned_components = 0
+        self.solutions = 0
+        self.phases = {"propagation": 0.0, "search": 0.0}
+        self.end_reason = None
+        self.table = {}
+
+    @property
+    def seconds(self):
+        return sum(self.phases.values())
+
+    def to_dict(self):
+        """Diccionario serializable"""
+        return {
+            "end_reason": self.end_reason,
+            "solutions": self.solutions,
+            "nodes": self.nodes,
+            "propagations": dict(self.propagations),
+            "backtracks": self.backtracks,
+            "max_depth": self.max_depth,
+            "depth_histogram": list(self.depth_histogram),
+            "pruned_components": self.pruned_components,
+            "phases": dict(self.phases),
+            "seconds": self.seconds,
+            "table": dict(self.table),
+        }
+
+    def write_json(self, filename):
+        """Guarda las estadísticas como JSON"""
+        with open(filename, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def __repr__(self):
+        return (f"SolverStats({self.end_reason}, nodes={self.nodes}, backtracks={self.backtracks}, "
+                f"max_depth={self.max_depth}, seconds={self.seconds:.3f})")
@@ -0,0 +1,160 @@
+"""Verificación vectorizada de muchas asignaciones de puentes del mismo tablero.
+
+Cada candidato es una fila de una matriz N x aristas (puentes por id de
+arista, como GameState.edge_counts). BatchVerifier comprueba todas las filas
+a la vez con NumPy: valores entre 0 y 2, número de cada isla, cruces y
+conectividad. NumPy es opcional: solo lo necesita este módulo.
+
+Uso:
+    verifier = BatchVerifier(game_state)
+    valid = verifier.verify(matrix)  # array de bool, uno por candidato
+"""
+
+try:
+    import numpy as np
+except ImportError:  # Sin numpy el resto del paquete funciona igual
+    np = None
+
+
+def assignment_matrix(game_state, assignments):
+    """Matriz N x aristas a partir de asignaciones en otros formatos.
+
+    Cada asignación puede ser una secuencia de puentes por id de arista, una
+    lista de puentes (start, end, count) o un diccionario {(start, end):
+    count} como el que devuelve generator.random_layout.
+    """
+    _require_numpy()
+    matrix = np.zeros((len(assignments), len(game_state.edges)), dtype=np.int8)
+    edge_ids = game_state.edge_ids
+    edge_key = game_state.edge_key
+    for row, assignment in enumerate(assignments):
+        if isinstance(assignment, dict):
+            assignment = [(start, end, count) for (start, end), count in assignment.items()]
+        if assignment and isinstance(assignment[0], tuple):
+            for start, end, count in assignment:
+                edge_id = edge_ids.get(edge_key(start, end))
+                if edge_id is None:
+                    raise ValueError(f"No hay arista entre {start} y {end}")
+                matrix[row, edge_id] = count
+        else:
+            matrix[row] = assignment
+    return matrix
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("La verificación por lotes necesita numpy (pip install numpy)")
+
+
+class BatchVerifier:
+    """Verificador por lotes para un tablero (las estructuras se precalculan una vez)"""
+
+    def __init__(self, game_state):
+        _require_numpy()
+        self.game_state = game_state
+        edges = game_state.edges
+        index = game_state.island_index
+        self.edge_count = len(edges)
+        self.starts = np.array([index[start] for start, _ in edges], dtype=np.intp)
+        self.ends = np.array([index[end] for _, end in edges], dtype=np.intp)
+        self.clues = np.array([value for _, _, value in game_state.islands], dtype=np.int16)
+
+        # Aristas de cada isla (hasta 4); los huecos apuntan a una columna extra que vale 0
+        self.island_edges = np.full((len(self.clues), 4), self.edge_count, dtype=np.intp)
+        for i, (row, col, _) in enumerate(game_state.islands):
+            for slot, (edge_id, _) in enumerate(game_state.island_edges[(row, col)]):
+                self.island_edges[i, slot] = edge_id
+
+        # Pares de aristas que se cruzan (cada par una vez)
+        pairs = [(edge_id, other) for edge_id in range(self.edge_count)
+                 for other in game_state.edge_crossings[edge_id] if edge_id < other]
+        self.crossing_pairs = np.array(pairs, dtype=np.intp).reshape(-1, 2)
+
+    def _matrix(self, assignments):
+        matrix = np.asarray(assignments)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        if matrix.ndim != 2 or matrix.shape[1] != self.edge_count:
+            raise ValueError(f"Se esperaba una matriz N x {self.edge_count} (una columna por arista)")
+        return matrix
+
+    def in_range(self, matrix):
+        """Todos los valores entre 0 y 2"""
+        return ((matrix >= 0) & (matrix <= 2)).all(axis=1)
+
+    def clues_satisfied(self, matrix):
+        """Cada isla tiene exactamente tantos puentes como su número"""
+        padded = np.zeros((matrix.shape[0], self.edge_count + 1), dtype=np.int16)
+        padded[:, :-1] = matrix
+        degrees = padded[:, self.island_edges].sum(axis=2)
+        return (degrees == self.clues).all(axis=1)
+
+    def crossings(self, matrix):
+        """Algún par de aristas con puente se cruza"""
+        if not len(self.crossing_pairs):
+            return np.zeros(matrix.shape[0], dtype=bool)
+        used = matrix > 0
+        return (used[:, self.crossing_pairs[:, 0]] & used[:, self.crossing_pairs[:, 1]]).any(axis=1)
+
+    def connected(self, matrix):
+        """Los puentes conectan todas las islas.
+
+        Unión-búsqueda en paralelo para todas las filas: cada ronda engancha
+        la raíz mayor de cada arista con puente a la menor y comprime los
+        caminos saltando de puntero en puntero hasta que no cambian.
+        """
+        count, islands = matrix.shape[0], len(self.clues)
+        if islands <= 1:
+            return np.full(count, True)
+        parent = np.tile(np.arange(islands, dtype=np.intp), (count, 1))
+        rows, edges = np.nonzero(matrix > 0)
+        starts, ends = self.starts[edges], self.ends[edges]
+        flat = parent.reshape(-1)
+        offsets = rows * islands
+        while True:
+            root_start = flat[offsets + starts]
+            root_end = flat[offsets + ends]
+            pending = root_start != root_end
+            if not pending.any():
+                break
+            low = np.minimum(root_start, root_end)[pending]
+            high = np.maximum(root_start, root_end)[pending]
+            np.minimum.at(flat, offsets[pending] + high, low)
+            while True:
+                jumped = np.take_along_axis(parent, parent, axis=1)
+                if np.array_equal(jumped, parent):
+                    break
+                parent[...] = jumped
+            # Solo siguen en juego las aristas que aún unen raíces distintas
+            rows, starts, ends, offsets = rows[pending], starts[pending], ends[pending], offsets[pending]
+        return (parent == 0).all(axis=1)
+
+    def checks(self, assignments):
+        """Resultado de cada comprobación por candidato (arrays de bool)"""
+        matrix = self._matrix(assignments)
+        result = {
+            "in_range": self.in_range(matrix),
+            "clues": self.clues_satisfied(matrix),
+            "no_crossings": ~self.crossings(matrix),
+            "connected": self.connected(matrix),
+        }
+        result["valid"] = (result["in_range"] & result["clues"] & result["no_crossings"] & result["connected"]
+                           & (matrix > 0).any(axis=1))
+        return result
+
+    def verify(self, assignments):
+        """Array de bool: True para los candidatos que son una solución.
+
+        Equivale a check_victory sobre cada candidato y además exige que no
+        haya cruces ni valores fuera de 0-2 (check_victory supone que los
+        puentes se colocaron con can_add_bridge).
+        """
+        matrix = self._matrix(assignments)
+        valid = self.in_range(matrix) & (matrix > 0).any(axis=1)
+        valid &= self.clues_satisfied(matrix)
+        valid &= ~self.crossings(matrix)
+        # La conectividad es la comprobación más cara: solo para los que pasan las demás
+        candidates = np.flatnonzero(valid)
+        if len(candidates):
+            valid[candidates] = self.connected(matrix[candidates])
+        return valid
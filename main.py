@@ -1,13 +1,34 @@
+import logging
 import pygame
 import sys
-from collections import deque
+import threading
+from bisect import bisect_left, bisect_right
 
-# Inicializar Pygame
-pygame.init()
+from hashi import AutoPlayer, GameState
+from hashi.cache import CACHE_FILE, SolutionCache
+from hashi.compact import CompactGameState
+from hashi.history import History
+from hashi.hints import HINT_CONFLICT, HINT_WRONG, HintEngine
 
 # Constantes
 CELL_SIZE = 70
 GRID_MARGIN = 80
+# Tamaño de celda permitido al hacer zoom (píxeles)
+MIN_CELL_SIZE = 12
+MAX_CELL_SIZE = 140
+# Área máxima de la cuadrícula en pantalla; los tableros mayores se recorren con la vista
+MAX_VIEW_WIDTH = 1120
+MAX_VIEW_HEIGHT = 720
+ZOOM_STEP = 1.25
+FPS = 60
+# Duración por defecto de los mensajes y pausa entre pasos de la reproducción (ms)
+MESSAGE_DURATION = 1000
+AUTO_STEP_DELAY = 80
+AUTO_STEP_DELAY_CHANGE = 30
+MIN_AUTO_STEP_DELAY = 15
+MAX_AUTO_STEP_DELAY = 1000
+# Cada cuánto se refresca el progreso de una resolución en segundo plano (ms)
+PROGRESS_INTERVAL = 100
 FONT_SIZE = 28
 FONT_SIZE_SMALL = 20
 BACKGROUND_COLOR = (240, 240, 245)
@@ -22,411 +43,396 @@ SUCCESS_COLOR = (50, 205, 50)
 ERROR_COLOR = (220, 20, 60)
 
 
-class GameState:
-    """Clase que maneja el estado del juego (tablero y puentes)"""
-
-    def __init__(self, filename):
-        self.load_board(filename)
-        self.bridges = []  # Lista de puentes: (start_pos, end_pos, count)
-
-    def load_board(self, filename):
-        """Carga el tablero desde un archivo"""
-        with open(filename, 'r') as f:
-            lines = f.readlines()
-            dimensions = lines[0].strip().split(',')
-            self.rows = int(dimensions[0])
-            self.cols = int(dimensions[1])
-            self.board = []
-            for i in range(1, self.rows + 1):
-                row = [int(char) for char in lines[i].strip()]
-                self.board.append(row)
-
-    def get_islands(self):
-        """Retorna lista de todas las islas (row, col, value)"""
-        islands = []
-        for row in range(self.rows):
-            for col in range(self.cols):
-                if self.board[row][col] > 0:
-                    islands.append((row, col, self.board[row][col]))
-        return islands
-
-    def count_bridges_for_island(self, row, col):
-        """Cuenta puentes conectados a una isla"""
-        count = 0
-        for bridge in self.bridges:
-            if bridge[0] == (row, col) or bridge[1] == (row, col):
-                count += bridge[2]
-        return count
-
-    def get_bridge_between(self, start, end):
-        """Obtiene el puente entre dos islas (si existe)"""
-        for bridge in self.bridges:
-            if (bridge[0] == start and bridge[1] == end) or (bridge[0] == end and bridge[1] == start):
-                return bridge
-        return None
-
-    def can_add_bridge(self, start, end):
-        """Verifica si se puede agregar un puente entre dos islas"""
-        if start == end:
-            return False, "No puedes conectar una isla consigo misma"
-
-        if start[0] != end[0] and start[1] != end[1]:
-            return False, "Los puentes deben ser horizontales o verticales"
-
-        # Verificar islas intermedias
-        if start[0] == end[0]:  # Horizontal
-            min_col = min(start[1], end[1])
-            max_col = max(start[1], end[1])
-            for col in range(min_col + 1, max_col):
-                if self.board[start[0]][col] > 0:
-                    return False, "Hay una isla en el camino"
-        else:  # Vertical
-            min_row = min(start[0], end[0])
-            max_row = max(start[0], end[0])
-            for row in range(min_row + 1, max_row):
-                if self.board[row][start[1]] > 0:
-                    return False, "Hay una isla en el camino"
-
-        # Verificar cruce de puentes
-        for bridge in self.bridges:
-            if self.bridges_cross((start, end), (bridge[0], bridge[1])):
-                return False, "Los puentes no pueden cruzarse"
-
-        # Verificar límite de 2 puentes
-        existing_bridge = self.get_bridge_between(start, end)
-        if existing_bridge and existing_bridge[2] >= 2:
-            return False, "Ya hay 2 puentes entre estas islas"
-
-        # Verificar que no exceda el límite de la isla
-        start_current = self.count_bridges_for_island(start[0], start[1])
-        end_current = self.count_bridges_for_island(end[0], end[1])
-        if start_current >= self.board[start[0]][start[1]]:
-            return False, f"La isla {self.board[start[0]][start[1]]} ya tiene todos sus puentes"
-        if end_current >= self.board[end[0]][end[1]]:
-            return False, f"La isla destino ya tiene todos sus puentes"
-
-        return True, "OK"
-
-    def bridges_cross(self, bridge1, bridge2):
-        """Verifica si dos puentes se cruzan"""
-        s1, e1 = bridge1
-        s2, e2 = bridge2
-
-        # Si comparten un extremo, no se cruzan
-        if s1 == s2 or s1 == e2 or e1 == s2 or e1 == e2:
-            return False
-
-        # Uno horizontal y otro vertical
-        if s1[0] == e1[0] and s2[1] == e2[1]:  # bridge1 horizontal, bridge2 vertical
-            h_row = s1[0]
-            h_col_min, h_col_max = min(s1[1], e1[1]), max(s1[1], e1[1])
-            v_col = s2[1]
-            v_row_min, v_row_max = min(s2[0], e2[0]), max(s2[0], e2[0])
-            return (v_row_min < h_row < v_row_max) and (h_col_min < v_col < h_col_max)
-
-        if s1[1] == e1[1] and s2[0] == e2[0]:  # bridge1 vertical, bridge2 horizontal
-            v_col = s1[1]
-            v_row_min, v_row_max = min(s1[0], e1[0]), max(s1[0], e1[0])
-            h_row = s2[0]
-            h_col_min, h_col_max = min(s2[1], e2[1]), max(s2[1], e2[1])
-            return (v_row_min < h_row < v_row_max) and (h_col_min < v_col < h_col_max)
-
-        return False
-
-    def add_bridge(self, start, end):
-        """Agrega un puente entre dos islas"""
-        for i, bridge in enumerate(self.bridges):
-            if (bridge[0] == start and bridge[1] == end) or (bridge[0] == end and bridge[1] == start):
-                self.bridges[i] = (bridge[0], bridge[1], bridge[2] + 1)
-                return True
-        self.bridges.append((start, end, 1))
-        return True
-
-    def remove_bridge(self, start, end):
-        """Elimina un puente entre dos islas"""
-        for i, bridge in enumerate(self.bridges):
-            if (bridge[0] == start and bridge[1] == end) or (bridge[0] == end and bridge[1] == start):
-                if bridge[2] > 1:
-                    self.bridges[i] = (bridge[0], bridge[1], bridge[2] - 1)
-                else:
-                    self.bridges.pop(i)
-                return True
-        return False
-
-    def get_neighbors(self, island_pos):
-        """Obtiene las islas vecinas (en línea recta sin obstáculos)"""
-        row, col = island_pos
-        neighbors = []
-
-        # Buscar hacia arriba
-        for r in range(row - 1, -1, -1):
-            if self.board[r][col] > 0:
-                neighbors.append((r, col))
-                break
-
-        # Buscar hacia abajo
-        for r in range(row + 1, self.rows):
-            if self.board[r][col] > 0:
-                neighbors.append((r, col))
-                break
-
-        # Buscar hacia la izquierda
-        for c in range(col - 1, -1, -1):
-            if self.board[row][c] > 0:
-                neighbors.append((row, c))
-                break
-
-        # Buscar hacia la derecha
-        for c in range(col + 1, self.cols):
-            if self.board[row][c] > 0:
-                neighbors.append((row, c))
-                break
-
-        return neighbors
-
-    def check_connectivity(self):
-        """Verifica que todas las islas estén conectadas mediante puentes"""
-        islands = self.get_islands()
-        if not islands:
-            return True
-
-        if len(self.bridges) == 0:
-            return False
-
-        # Construir grafo de adyacencia basado en puentes existentes
-        graph = {(island[0], island[1]): [] for island in islands}
-
-        for bridge in self.bridges:
-            start, end = bridge[0], bridge[1]
-            # Solo agregar si ambas islas existen en el grafo
-            if start in graph and end in graph:
-                if end not in graph[start]:
-                    graph[start].append(end)
-                if start not in graph[end]:
-                    graph[end].append(start)
-
-        # BFS desde la primera isla
-        start_island = (islands[0][0], islands[0][1])
-        visited = set()
-        queue = deque([start_island])
-        visited.add(start_island)
-
-        while queue:
-            current = queue.popleft()
-            for neighbor in graph.get(current, []):
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    queue.append(neighbor)
-
-        # Verificar que todas las islas fueron visitadas
-        all_island_positions = {(island[0], island[1]) for island in islands}
-        is_connected = visited == all_island_positions
-
-        if not is_connected:
-            print(f"Conectividad fallida: {len(visited)}/{len(all_island_positions)} islas conectadas")
-            print(f"Islas aisladas: {all_island_positions - visited}")
-
-        return is_connected
-
-    def check_victory(self):
-        """Verifica si el juego está completo"""
-        # Verificar que todas las islas tengan el número correcto de puentes
-        for row in range(self.rows):
-            for col in range(self.cols):
-                if self.board[row][col] > 0:
-                    current = self.count_bridges_for_island(row, col)
-                    required = self.board[row][col]
-                    if current != required:
-                        return False
-
-        # Verificar que haya puentes
-        if len(self.bridges) == 0:
-            return False
-
-        # Verificar conectividad (NO debe haber islas aisladas)
-        return self.check_connectivity()
-
-    def reset(self):
-        """Reinicia el estado del juego"""
-        self.bridges = []
-
-    def copy(self):
-        """Crea una copia del estado del juego"""
-        new_state = GameState.__new__(GameState)
-        new_state.rows = self.rows
-        new_state.cols = self.cols
-        new_state.board = [row[:] for row in self.board]
-        new_state.bridges = [bridge for bridge in self.bridges]
-        return new_state
-
-
 class GameRenderer:
-    """Clase que maneja el renderizado del juego"""
+    """Clase que maneja el renderizado del juego.
+
+    La cuadrícula se ve a través de una vista con desplazamiento y zoom: solo
+    se dibujan las islas y puentes visibles. El fondo, la cuadrícula y el
+    cuerpo de las islas visibles se dibujan una vez en una superficie en
+    caché que cada fotograma solo copia; se rehace al cambiar el tablero, la
+    ventana o la vista. Los textos renderizados se guardan por (fuente,
+    texto, color).
+    """
 
     def __init__(self, game_state):
         self.game_state = game_state
-        self.screen_width = game_state.cols * CELL_SIZE + 2 * GRID_MARGIN
-        self.screen_height = game_state.rows * CELL_SIZE + 2 * GRID_MARGIN + 60
+        # Vista: tamaño de celda y desplazamiento (en píxeles) de la cuadrícula.
+        # Se empieza con el tablero entero a la vista si cabe con MIN_CELL_SIZE.
+        fit = min(MAX_VIEW_WIDTH // max(1, game_state.cols), MAX_VIEW_HEIGHT // max(1, game_state.rows))
+        self.cell_size = max(MIN_CELL_SIZE, min(CELL_SIZE, fit))
+        self.view_x = 0
+        self.view_y = 0
+        self.view_width = min(game_state.cols * self.cell_size, MAX_VIEW_WIDTH)
+        self.view_height = min(game_state.rows * self.cell_size, MAX_VIEW_HEIGHT)
+        self._drag_origin = None
+
+        self.screen_width = self.view_width + 2 * GRID_MARGIN
+        self.screen_height = self.view_height + 2 * GRID_MARGIN + 60
         self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
         pygame.display.set_caption("Hashiwokakero - Puentes Japoneses")
         self.font = pygame.font.SysFont('Arial', FONT_SIZE, bold=True)
         self.font_small = pygame.font.SysFont('Arial', FONT_SIZE_SMALL)
         self.message = ""
         self.message_color = INFO_COLOR
-        self.message_timer = 0
+        self.message_timer = 0  # Instante (ms de pygame.time.get_ticks) en que desaparece el mensaje
         self.selected_island = None
-
-    def show_message(self, text, color=INFO_COLOR, duration=60):
-        """Muestra un mensaje temporal"""
+        self.progress_text = None  # Progreso de la resolución en segundo plano
+        self.highlight = None  # (aristas, color) resaltadas hasta que cambie el tablero
+        self._highlight_hash = None
+        self._glyphs = {}  # (fuente, texto, color) -> superficie renderizada
+        self._number_fonts = {FONT_SIZE: self.font}  # Tamaño -> fuente de los números
+        self._background = None
+        self._background_key = None  # (islas, ventana, vista) con que se dibujó el fondo
+        self._board_islands = None  # Islas para las que se calcularon los índices de la vista
+        self.visible_islands = []
+        self.visible_edges = []
+
+    def show_message(self, text, color=INFO_COLOR, duration=MESSAGE_DURATION):
+        """Muestra un mensaje temporal durante duration milisegundos"""
         self.message = text
         self.message_color = color
-        self.message_timer = duration
+        self.message_timer = pygame.time.get_ticks() + duration
+
+    def highlight_edges(self, edges, color):
+        """Resalta aristas (start, end) hasta el siguiente cambio del tablero"""
+        self.highlight = (edges, color)
+        self._highlight_hash = self.game_state.state_hash
+
+    def show_hint(self, hint):
+        """Muestra una pista: su mensaje y, si señala una arista, la resalta"""
+        color = ERROR_COLOR if hint.kind in (HINT_WRONG, HINT_CONFLICT) else HIGHLIGHT_COLOR
+        self.highlight_edges([hint.edge] if hint.edge is not None else [], color)
+        self.show_message(hint.message, color, 2000)
+
+    def message_deadline(self):
+        """Instante en que caduca el mensaje visible (None si no hay ninguno)"""
+        if self.message and self.message_timer > pygame.time.get_ticks():
+            return self.message_timer
+        return None
+
+    def render_text(self, text, color, font=None):
+        """Superficie de un texto, renderizada solo la primera vez"""
+        font = font or self.font_small
+        key = (font, text, color)
+        surface = self._glyphs.get(key)
+        if surface is None:
+            surface = font.render(text, True, color)
+            self._glyphs[key] = surface
+        return surface
+
+    def invalidate(self):
+        """Fuerza a redibujar la capa estática en el siguiente fotograma"""
+        self._background_key = None
+
+    def cell_center(self, row, col):
+        """Centro en pantalla de una celda según la vista actual"""
+        return (GRID_MARGIN + col * self.cell_size - self.view_x + self.cell_size // 2,
+                GRID_MARGIN + row * self.cell_size - self.view_y + self.cell_size // 2)
+
+    def pan(self, dx, dy):
+        """Desplaza la vista dx, dy píxeles"""
+        self.view_x += dx
+        self.view_y += dy
+        self._clamp_view()
+
+    def zoom_at(self, factor, pos=None):
+        """Cambia el tamaño de celda manteniendo fijo el punto del tablero bajo pos"""
+        if pos is None:
+            pos = (GRID_MARGIN + self.view_width // 2, GRID_MARGIN + self.view_height // 2)
+        cell_size = max(MIN_CELL_SIZE, min(MAX_CELL_SIZE, round(self.cell_size * factor)))
+        if cell_size == self.cell_size:
+            return
+        anchor_x = pos[0] - GRID_MARGIN
+        anchor_y = pos[1] - GRID_MARGIN
+        self.view_x = (self.view_x + anchor_x) * cell_size // self.cell_size - anchor_x
+        self.view_y = (self.view_y + anchor_y) * cell_size // self.cell_size - anchor_y
+        self.cell_size = cell_size
+        self._clamp_view()
+
+    def _clamp_view(self):
+        """Impide desplazar la cuadrícula fuera de la vista"""
+        self.view_x = max(0, min(self.view_x, self.game_state.cols * self.cell_size - self.view_width))
+        self.view_y = max(0, min(self.view_y, self.game_state.rows * self.cell_size - self.view_height))
+
+    def handle_view_event(self, event):
+        """Zoom con la rueda, desplazamiento con las flechas o arrastrando con el botón central.
+
+        Devuelve True si el evento era de la vista.
+        """
+        if event.type == pygame.MOUSEWHEEL:
+            self.zoom_at(ZOOM_STEP ** event.y, pygame.mouse.get_pos())
+            return True
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 2:
+            self._drag_origin = event.pos
+            return True
+        if event.type == pygame.MOUSEBUTTONUP and event.button == 2:
+            self._drag_origin = None
+            return True
+        if event.type == pygame.MOUSEMOTION and self._drag_origin is not None:
+            self.pan(self._drag_origin[0] - event.pos[0], self._drag_origin[1] - event.pos[1])
+            self._drag_origin = event.pos
+            return True
+        if event.type == pygame.KEYDOWN:
+            step = self.cell_size
+            moves = {pygame.K_LEFT: (-step, 0), pygame.K_RIGHT: (step, 0),
+                     pygame.K_UP: (0, -step), pygame.K_DOWN: (0, step)}
+            if event.key in moves:
+                self.pan(*moves[event.key])
+                return True
+        return False
 
     def draw(self):
         """Dibuja todo el juego"""
-        self.screen.fill(BACKGROUND_COLOR)
+        # Capa estática: se reconstruye solo si cambian las islas, la ventana o la vista
+        key = (self.game_state.islands, self.screen.get_size(), self.cell_size, self.view_x, self.view_y)
+        if self._background_key is None or self._background_key[0] is not key[0] or self._background_key[1:] != key[1:]:
+            self._update_visible()
+            self._build_background()
+            self._background_key = key
+        self.screen.blit(self._background, (0, 0))
 
-        # Dibujar título y estado
-        title = self.font_small.render("HASHIWOKAKERO", True, INFO_COLOR)
-        self.screen.blit(title, (20, 15))
-
-        status = self.font_small.render(
-            "Clic izq: conectar | Clic der: eliminar | ESC: reiniciar | ESPACIO: resolver | +/-: velocidad", True,
-            INFO_COLOR)
-        self.screen.blit(status, (20, 40))
-
-        # Dibujar cuadrícula
-        self._draw_grid()
+        # Puentes e islas solo dentro de la vista
+        self.screen.set_clip(pygame.Rect(GRID_MARGIN, GRID_MARGIN, self.view_width, self.view_height))
 
         # Dibujar puentes
         self._draw_bridges()
 
-        # Dibujar islas
+        # Aristas señaladas por una pista o un conflicto
+        if self.highlight is not None and self._highlight_hash == self.game_state.state_hash:
+            self._draw_highlight()
+
+        # Dibujar números y selección de las islas
         self._draw_islands()
 
+        self.screen.set_clip(None)
+
+        # Progreso de la resolución (texto distinto en cada refresco: no se guarda en caché)
+        if self.progress_text:
+            progress_surface = self.font_small.render(self.progress_text, True, INFO_COLOR)
+            progress_rect = progress_surface.get_rect(center=(self.screen_width // 2, self.screen_height - 60))
+            self.screen.blit(progress_surface, progress_rect)
+
         # Dibujar mensaje temporal
-        if self.message and self.message_timer > 0:
-            msg_surface = self.font_small.render(self.message, True, self.message_color)
+        if self.message_deadline() is not None:
+            msg_surface = self.render_text(self.message, self.message_color)
             msg_rect = msg_surface.get_rect(center=(self.screen_width // 2, self.screen_height - 30))
             pygame.draw.rect(self.screen, BACKGROUND_COLOR, msg_rect.inflate(20, 10))
             self.screen.blit(msg_surface, msg_rect)
-            self.message_timer -= 1
 
         # Verificar victoria
         if self.game_state.check_victory():
-            victory_text = self.font.render("¡JUEGO COMPLETADO!", True, SUCCESS_COLOR)
+            victory_text = self.render_text("¡JUEGO COMPLETADO!", SUCCESS_COLOR, self.font)
             victory_rect = victory_text.get_rect(center=(self.screen_width // 2, self.screen_height - 30))
             pygame.draw.rect(self.screen, BACKGROUND_COLOR, victory_rect.inflate(30, 15))
             pygame.draw.rect(self.screen, SUCCESS_COLOR, victory_rect.inflate(30, 15), 3)
             self.screen.blit(victory_text, victory_rect)
-        elif self._check_all_islands_complete() and not self.game_state.check_connectivity():
+        elif self.game_state.all_islands_complete() and not self.game_state.check_connectivity():
             # Todas las islas tienen sus puentes pero hay islas aisladas
-            warning_text = self.font_small.render("¡Hay islas aisladas!", True, ERROR_COLOR)
+            warning_text = self.render_text("¡Hay islas aisladas!", ERROR_COLOR)
             warning_rect = warning_text.get_rect(center=(self.screen_width // 2, self.screen_height - 30))
             pygame.draw.rect(self.screen, BACKGROUND_COLOR, warning_rect.inflate(20, 10))
             self.screen.blit(warning_text, warning_rect)
 
-    def _check_all_islands_complete(self):
-        """Verifica si todas las islas tienen el número correcto de puentes"""
-        for row in range(self.game_state.rows):
-            for col in range(self.game_state.cols):
-                if self.game_state.board[row][col] > 0:
-                    current = self.game_state.count_bridges_for_island(row, col)
-                    required = self.game_state.board[row][col]
-                    if current != required:
-                        return False
-        return True
-
-    def _draw_grid(self):
-        """Dibuja la cuadrícula"""
-        for row in range(self.game_state.rows + 1):
-            pygame.draw.line(
-                self.screen,
-                GRID_COLOR,
-                (GRID_MARGIN, GRID_MARGIN + row * CELL_SIZE),
-                (GRID_MARGIN + self.game_state.cols * CELL_SIZE, GRID_MARGIN + row * CELL_SIZE),
-                1
-            )
-        for col in range(self.game_state.cols + 1):
-            pygame.draw.line(
-                self.screen,
-                GRID_COLOR,
-                (GRID_MARGIN + col * CELL_SIZE, GRID_MARGIN),
-                (GRID_MARGIN + col * CELL_SIZE, GRID_MARGIN + self.game_state.rows * CELL_SIZE),
-                1
-            )
+    def _visible_cells(self):
+        """Rango de filas y columnas (inclusivo) que se ve, aunque sea en parte"""
+        row0 = self.view_y // self.cell_size
+        col0 = self.view_x // self.cell_size
+        row1 = min(self.game_state.rows - 1, (self.view_y + self.view_height - 1) // self.cell_size)
+        col1 = min(self.game_state.cols - 1, (self.view_x + self.view_width - 1) // self.cell_size)
+        return row0, row1, col0, col1
+
+    def _update_visible(self):
+        """Calcula las islas y aristas visibles.
+
+        Con las islas ordenadas por filas (y una copia por columnas) cada fila o
+        columna visible se resuelve con una búsqueda binaria, así que el coste
+        depende de lo que se ve y no del tamaño del tablero.
+        """
+        state = self.game_state
+        if self._board_islands is not state.islands:
+            self._board_islands = state.islands
+            self._row_keys = [row * state.cols + col for row, col, _ in state.islands]
+            self._by_col = sorted((col, row) for row, col, _ in state.islands)
+            self._col_keys = [col * state.rows + row for col, row in self._by_col]
+
+        row0, row1, col0, col1 = self._visible_cells()
+        islands = []
+        edges = set()
+        for row in range(row0, row1 + 1):
+            low = bisect_left(self._row_keys, row * state.cols + col0)
+            high = bisect_right(self._row_keys, row * state.cols + col1)
+            islands.extend(state.islands[low:high])
+            # Puente horizontal que entra por la izquierda desde una isla no visible
+            if low > 0 and state.islands[low - 1][0] == row:
+                edges.update(self._island_edges(state.islands[low - 1][:2], col0=col0))
+        for col in range(col0, col1 + 1):
+            # Puente vertical que entra por arriba desde una isla no visible
+            low = bisect_left(self._col_keys, col * state.rows + row0)
+            if low > 0 and self._by_col[low - 1][0] == col:
+                above_col, above_row = self._by_col[low - 1]
+                edges.update(self._island_edges((above_row, above_col), row0=row0))
+        for row, col, _ in islands:
+            edges.update(self._island_edges((row, col)))
+
+        self.visible_islands = islands
+        self.visible_edges = sorted(edges)
+
+    def _island_edges(self, pos, row0=None, col0=None):
+        """Aristas de una isla; con row0/col0 solo la que baja o va a la derecha hasta la vista"""
+        result = []
+        for edge_id, (row, col) in self.game_state.island_edges[pos]:
+            if row0 is not None and not (col == pos[1] and row >= row0):
+                continue
+            if col0 is not None and not (row == pos[0] and col >= col0):
+                continue
+            result.append(edge_id)
+        return result
+
+    def _build_background(self):
+        """Dibuja en caché el fondo, los textos fijos, la cuadrícula y el cuerpo de las islas visibles"""
+        self._background = pygame.Surface(self.screen.get_size())
+        self._background.fill(BACKGROUND_COLOR)
 
-    def _draw_bridges(self):
-        """Dibuja los puentes"""
-        for bridge in self.game_state.bridges:
-            start_row, start_col = bridge[0]
-            end_row, end_col = bridge[1]
-            count = bridge[2]
+        # Dibujar título y estado
+        title = self.render_text("HASHIWOKAKERO", INFO_COLOR)
+        self._background.blit(title, (20, 15))
+
+        status = self.render_text(
+            "Clic izq: conectar | Clic der: eliminar | ESC: reiniciar | ESPACIO: resolver | C: completar | "
+            "H: pista | Ctrl+Z/Y: deshacer/rehacer | +/-: velocidad | Rueda: zoom | Flechas: mover", INFO_COLOR)
+        self._background.blit(status, (20, 40))
+
+        self._background.set_clip(pygame.Rect(GRID_MARGIN, GRID_MARGIN, self.view_width, self.view_height))
+
+        # Dibujar cuadrícula
+        self._draw_grid(self._background)
+
+        radius = self.cell_size // 3
+        shadow = max(1, self.cell_size // 35)
+        border = max(1, self.cell_size * 3 // CELL_SIZE)
+        for row, col, _ in self.visible_islands:
+            x, y = self.cell_center(row, col)
+
+            # Sombra
+            pygame.draw.circle(self._background, (150, 150, 150), (x + shadow, y + shadow), radius)
+
+            # Círculo de la isla
+            pygame.draw.circle(self._background, ISLAND_COLOR, (x, y), radius)
+            pygame.draw.circle(self._background, ISLAND_BORDER, (x, y), radius, border)
+
+        self._background.set_clip(None)
+
+    def _draw_grid(self, surface):
+        """Dibuja las líneas visibles de la cuadrícula"""
+        row0, row1, col0, col1 = self._visible_cells()
+        left = GRID_MARGIN + col0 * self.cell_size - self.view_x
+        right = GRID_MARGIN + (col1 + 1) * self.cell_size - self.view_x
+        top = GRID_MARGIN + row0 * self.cell_size - self.view_y
+        bottom = GRID_MARGIN + (row1 + 1) * self.cell_size - self.view_y
+        for row in range(row0, row1 + 2):
+            y = GRID_MARGIN + row * self.cell_size - self.view_y
+            pygame.draw.line(surface, GRID_COLOR, (left, y), (right, y), 1)
+        for col in range(col0, col1 + 2):
+            x = GRID_MARGIN + col * self.cell_size - self.view_x
+            pygame.draw.line(surface, GRID_COLOR, (x, top), (x, bottom), 1)
 
-            start_x = GRID_MARGIN + start_col * CELL_SIZE + CELL_SIZE // 2
-            start_y = GRID_MARGIN + start_row * CELL_SIZE + CELL_SIZE // 2
-            end_x = GRID_MARGIN + end_col * CELL_SIZE + CELL_SIZE // 2
-            end_y = GRID_MARGIN + end_row * CELL_SIZE + CELL_SIZE // 2
+    def _draw_bridges(self):
+        """Dibuja los puentes de las aristas visibles.
+
+        Las islas ya están en el fondo, así que cada línea va de borde a borde
+        de los círculos en lugar de centro a centro.
+        """
+        radius = self.cell_size // 3
+        offset = max(2, self.cell_size // 10)
+        width = max(1, self.cell_size * 5 // CELL_SIZE)
+        # Distancia del centro al borde del círculo a la altura de una línea desplazada
+        inset_double = int((radius ** 2 - offset ** 2) ** 0.5) if radius > offset else 0
+        edges = self.game_state.edges
+        edge_counts = self.game_state.edge_counts
+        for edge_id in self.visible_edges:
+            count = edge_counts[edge_id]
+            if not count:
+                continue
+            (start_row, start_col), (end_row, end_col) = edges[edge_id]
+            start_x, start_y = self.cell_center(start_row, start_col)
+            end_x, end_y = self.cell_center(end_row, end_col)
 
             if start_row == end_row:  # Horizontal
                 if count == 1:
-                    pygame.draw.line(self.screen, BRIDGE_COLOR, (start_x, start_y), (end_x, end_y), 5)
+                    pygame.draw.line(self.screen, BRIDGE_COLOR, (start_x + radius, start_y), (end_x - radius, end_y),
+                                     width)
                 else:
-                    offset = 7
-                    pygame.draw.line(self.screen, BRIDGE_COLOR, (start_x, start_y - offset), (end_x, end_y - offset), 5)
-                    pygame.draw.line(self.screen, BRIDGE_COLOR, (start_x, start_y + offset), (end_x, end_y + offset), 5)
+                    start_x += inset_double
+                    end_x -= inset_double
+                    pygame.draw.line(self.screen, BRIDGE_COLOR, (start_x, start_y - offset), (end_x, end_y - offset),
+                                     width)
+                    pygame.draw.line(self.screen, BRIDGE_COLOR, (start_x, start_y + offset), (end_x, end_y + offset),
+                                     width)
             else:  # Vertical
                 if count == 1:
-                    pygame.draw.line(self.screen, BRIDGE_COLOR, (start_x, start_y), (end_x, end_y), 5)
+                    pygame.draw.line(self.screen, BRIDGE_COLOR, (start_x, start_y + radius), (end_x, end_y - radius),
+                                     width)
                 else:
-                    offset = 7
-                    pygame.draw.line(self.screen, BRIDGE_COLOR, (start_x - offset, start_y), (end_x - offset, end_y), 5)
-                    pygame.draw.line(self.screen, BRIDGE_COLOR, (start_x + offset, start_y), (end_x + offset, end_y), 5)
+                    start_y += inset_double
+                    end_y -= inset_double
+                    pygame.draw.line(self.screen, BRIDGE_COLOR, (start_x - offset, start_y), (end_x - offset, end_y),
+                                     width)
+                    pygame.draw.line(self.screen, BRIDGE_COLOR, (start_x + offset, start_y), (end_x + offset, end_y),
+                                     width)
+
+    def _draw_highlight(self):
+        """Resalta las aristas señaladas: línea entre las islas y anillo en cada una"""
+        edges, color = self.highlight
+        radius = self.cell_size // 3
+        width = max(2, self.cell_size * 3 // CELL_SIZE)
+        for edge in edges:
+            start, end = (self.cell_center(row, col) for row, col in edge)
+            pygame.draw.line(self.screen, color, start, end, width)
+            for center in (start, end):
+                pygame.draw.circle(self.screen, color, center, radius + max(2, radius // 4), width)
+
+    def _number_font(self):
+        """Fuente de los números escalada al zoom actual"""
+        size = max(8, FONT_SIZE * self.cell_size // CELL_SIZE)
+        font = self._number_fonts.get(size)
+        if font is None:
+            font = pygame.font.SysFont('Arial', size, bold=True)
+            self._number_fonts[size] = font
+        return font
 
     def _draw_islands(self):
-        """Dibuja las islas"""
-        for row in range(self.game_state.rows):
-            for col in range(self.game_state.cols):
-                if self.game_state.board[row][col] > 0:
-                    x = GRID_MARGIN + col * CELL_SIZE + CELL_SIZE // 2
-                    y = GRID_MARGIN + row * CELL_SIZE + CELL_SIZE // 2
-                    radius = CELL_SIZE // 3
-
-                    # Sombra
-                    pygame.draw.circle(self.screen, (150, 150, 150), (x + 2, y + 2), radius)
-
-                    # Círculo de la isla
-                    pygame.draw.circle(self.screen, ISLAND_COLOR, (x, y), radius)
-                    pygame.draw.circle(self.screen, ISLAND_BORDER, (x, y), radius, 3)
-
-                    # Resaltar isla seleccionada
-                    if self.selected_island == (row, col):
-                        pygame.draw.circle(self.screen, HIGHLIGHT_COLOR, (x, y), radius + 5, 4)
-
-                    # Determinar color del número según estado
-                    current = self.game_state.count_bridges_for_island(row, col)
-                    required = self.game_state.board[row][col]
-                    if current == required:
-                        num_color = SUCCESS_COLOR
-                    elif current > required:
-                        num_color = ERROR_COLOR
-                    else:
-                        num_color = TEXT_COLOR
+        """Dibuja los números de las islas visibles (el cuerpo está en el fondo) y la selección"""
+        radius = self.cell_size // 3
+        font = self._number_font()
+        for row, col, required in self.visible_islands:
+            x, y = self.cell_center(row, col)
+
+            # Resaltar isla seleccionada
+            if self.selected_island == (row, col):
+                pygame.draw.circle(self.screen, HIGHLIGHT_COLOR, (x, y), radius + max(2, radius // 4),
+                                   max(2, self.cell_size * 4 // CELL_SIZE))
+
+            # Determinar color del número según estado
+            current = self.game_state.count_bridges_for_island(row, col)
+            if current == required:
+                num_color = SUCCESS_COLOR
+            elif current > required:
+                num_color = ERROR_COLOR
+            else:
+                num_color = TEXT_COLOR
 
-                    # Número
-                    num_text = self.font.render(str(self.game_state.board[row][col]), True, num_color)
-                    text_rect = num_text.get_rect(center=(x, y))
-                    self.screen.blit(num_text, text_rect)
+            # Número
+            num_text = self.render_text(str(required), num_color, font)
+            text_rect = num_text.get_rect(center=(x, y))
+            self.screen.blit(num_text, text_rect)
 
     def get_island_at_pos(self, pos):
-        """Obtiene la isla en una posición de pantalla"""
+        """Obtiene la isla en una posición de pantalla (a través de la vista actual)"""
         x, y = pos
-        if (GRID_MARGIN <= x < GRID_MARGIN + self.game_state.cols * CELL_SIZE and
-                GRID_MARGIN <= y < GRID_MARGIN + self.game_state.rows * CELL_SIZE):
-            col = (x - GRID_MARGIN) // CELL_SIZE
-            row = (y - GRID_MARGIN) // CELL_SIZE
-            if 0 <= row < self.game_state.rows and 0 <= col < self.game_state.cols and self.game_state.board[row][
-                col] > 0:
+        if GRID_MARGIN <= x < GRID_MARGIN + self.view_width and GRID_MARGIN <= y < GRID_MARGIN + self.view_height:
+            col = (x - GRID_MARGIN + self.view_x) // self.cell_size
+            row = (y - GRID_MARGIN + self.view_y) // self.cell_size
+            if (row, col) in self.game_state.island_index:
                 return (row, col)
         return None
 
@@ -470,294 +476,36 @@ class HumanPlayer:
                         self.renderer.selected_island = None
 
 
-class AutoPlayer:
-    """Jugador automático que resuelve el juego usando backtracking con heurísticas"""
-
-    def __init__(self, game_state):
-        self.game_state = game_state
-        self.solution_steps = []
-        self.solving = False
-        self.step_index = 0
-        self.iterations = 0
-        self.max_iterations = 500000  # Límite de seguridad aumentado
-
-    def solve(self):
-        """Resuelve el juego y guarda los pasos de la solución"""
-        print("Iniciando resolución automática...")
-        self.solution_steps = []  # Limpiar pasos anteriores
-        self.iterations = 0
-
-        # Guardar estado inicial
-        initial_bridges = [bridge for bridge in self.game_state.bridges]
-
-        # Aplicar heurísticas simples primero
-        print("Aplicando heurísticas...")
-        self._apply_forced_moves()
-
-        print(f"Después de heurísticas: {len(self.game_state.bridges)} puentes")
-
-        # Usar backtracking para completar
-        print("Iniciando backtracking...")
-        if self._backtrack():
-            print(f"¡Solución encontrada con {len(self.solution_steps)} pasos!")
-            print(f"Iteraciones del backtracking: {self.iterations}")
-
-            # Verificar que la solución es válida
-            if self.game_state.check_victory():
-                print("✓ Solución validada correctamente")
-                print(f"✓ Total de puentes: {len(self.game_state.bridges)}")
-                print(f"✓ Conectividad verificada")
-                return True
-            else:
-                print("✗ ADVERTENCIA: La solución no es válida")
-                is_connected = self.game_state.check_connectivity()
-                print(f"  - Conectividad: {is_connected}")
-                # Restaurar estado inicial
-                self.game_state.bridges = initial_bridges
-                return False
-        else:
-            print(f"✗ No se encontró solución (iteraciones: {self.iterations})")
-            # Restaurar estado inicial
-            self.game_state.bridges = initial_bridges
-            return False
-
-    def _apply_forced_moves(self):
-        """Aplica movimientos forzados (heurísticas greedy)"""
-        changed = True
-        iterations = 0
-        max_iterations = 100
-
-        while changed and iterations < max_iterations:
-            changed = False
-            iterations += 1
-            islands = self.game_state.get_islands()
-
-            for row, col, required in islands:
-                current = self.game_state.count_bridges_for_island(row, col)
-                remaining = required - current
-
-                if remaining <= 0:
-                    continue
-
-                neighbors = self.game_state.get_neighbors((row, col))
-                valid_neighbors = []
-
-                for neighbor in neighbors:
-                    can_add, _ = self.game_state.can_add_bridge((row, col), neighbor)
-                    if can_add:
-                        # Verificar cuántos puentes más se pueden agregar
-                        existing = self.game_state.get_bridge_between((row, col), neighbor)
-                        if existing:
-                            if existing[2] < 2:
-                                valid_neighbors.append(neighbor)
-                        else:
-                            valid_neighbors.append(neighbor)
-
-                if len(valid_neighbors) == 0:
-                    continue
-
-                # Heurística 1: Si solo queda un vecino válido, conectar todo ahí
-                if len(valid_neighbors) == 1:
-                    neighbor = valid_neighbors[0]
-                    neighbor_current = self.game_state.count_bridges_for_island(neighbor[0], neighbor[1])
-                    neighbor_required = self.game_state.board[neighbor[0]][neighbor[1]]
-                    neighbor_remaining = neighbor_required - neighbor_current
-
-                    bridges_to_add = min(remaining, neighbor_remaining, 2)
-                    existing = self.game_state.get_bridge_between((row, col), neighbor)
-                    if existing:
-                        bridges_to_add = min(bridges_to_add, 2 - existing[2])
-
-                    for _ in range(bridges_to_add):
-                        can_add, _ = self.game_state.can_add_bridge((row, col), neighbor)
-                        if can_add:
-                            self.game_state.add_bridge((row, col), neighbor)
-                            self.solution_steps.append(((row, col), neighbor, "add"))
-                            changed = True
-
-                # Heurística 2: Si remaining == suma máxima posible de puentes a vecinos
-                total_capacity = 0
-                for neighbor in valid_neighbors:
-                    existing = self.game_state.get_bridge_between((row, col), neighbor)
-                    if existing:
-                        capacity = 2 - existing[2]
-                    else:
-                        capacity = 2
-
-                    neighbor_current = self.game_state.count_bridges_for_island(neighbor[0], neighbor[1])
-                    neighbor_required = self.game_state.board[neighbor[0]][neighbor[1]]
-                    neighbor_remaining = neighbor_required - neighbor_current
-
-                    capacity = min(capacity, neighbor_remaining)
-                    total_capacity += capacity
-
-                # Si el remaining es igual a la capacidad total, usar toda la capacidad
-                if total_capacity == remaining and remaining > 0:
-                    for neighbor in valid_neighbors:
-                        existing = self.game_state.get_bridge_between((row, col), neighbor)
-                        if existing:
-                            bridges_needed = 2 - existing[2]
-                        else:
-                            bridges_needed = 2
-
-                        neighbor_current = self.game_state.count_bridges_for_island(neighbor[0], neighbor[1])
-                        neighbor_required = self.game_state.board[neighbor[0]][neighbor[1]]
-                        neighbor_remaining = neighbor_required - neighbor_current
-
-                        bridges_needed = min(bridges_needed, neighbor_remaining)
-
-                        for _ in range(bridges_needed):
-                            can_add, _ = self.game_state.can_add_bridge((row, col), neighbor)
-                            if can_add:
-                                self.game_state.add_bridge((row, col), neighbor)
-                                self.solution_steps.append(((row, col), neighbor, "add"))
-                                changed = True
-
-    def _backtrack(self):
-        """Backtracking para encontrar solución"""
-        self.iterations += 1
-
-        # Límite de seguridad
-        if self.iterations > self.max_iterations:
-            print(f"Límite de iteraciones alcanzado ({self.max_iterations})")
-            return False
-
-        # Mostrar progreso cada 10000 iteraciones
-        if self.iterations % 10000 == 0:
-            print(f"  Iteración {self.iterations}, puentes actuales: {len(self.game_state.bridges)}")
-
-        # Verificar si ya está resuelto
-        if self.game_state.check_victory():
-            return True
-
-        # Encontrar isla con puentes incompletos
-        islands = self.game_state.get_islands()
-
-        # Verificar si alguna isla excedió su limite (poda temprana)
-        for row, col, required in islands:
-            current = self.game_state.count_bridges_for_island(row, col)
-            if current > required:
-                return False
-
-        # Ordenar por restricción (menos opciones primero)
-        islands_sorted = []
-        for row, col, required in islands:
-            current = self.game_state.count_bridges_for_island(row, col)
-            if current < required:
-                neighbors = self.game_state.get_neighbors((row, col))
-                valid_neighbors = []
-                for n in neighbors:
-                    # Verificar que el vecino no esté completo
-                    neighbor_current = self.game_state.count_bridges_for_island(n[0], n[1])
-                    neighbor_required = self.game_state.board[n[0]][n[1]]
-                    if neighbor_current < neighbor_required:
-                        can_add, _ = self.game_state.can_add_bridge((row, col), n)
-                        if can_add:
-                            valid_neighbors.append(n)
-
-                # Si una isla necesita puentes pero no tiene vecinos válidos, es imposible
-                remaining = required - current
-                if len(valid_neighbors) == 0 and remaining > 0:
-                    return False
-
-                islands_sorted.append((row, col, required, current, len(valid_neighbors), valid_neighbors, remaining))
-
-        # Si no hay islas incompletas, verificar solución completa
-        if not islands_sorted:
-            return self.game_state.check_victory()
-
-        # Ordenar por número de opciones válidas (MRV) y luego por puentes restantes
-        islands_sorted.sort(key=lambda x: (x[4], -x[6]))
-
-        row, col, required, current, _, valid_neighbors, remaining = islands_sorted[0]
-
-        # Intentar conectar con cada vecino válido
-        for neighbor in valid_neighbors:
-            neighbor_row, neighbor_col = neighbor
-            neighbor_required = self.game_state.board[neighbor_row][neighbor_col]
-            neighbor_current = self.game_state.count_bridges_for_island(neighbor_row, neighbor_col)
-            neighbor_remaining = neighbor_required - neighbor_current
-
-            if neighbor_remaining <= 0:
-                continue
-
-            # Determinar cuántos puentes intentar (1 o 2)
-            max_bridges = min(remaining, neighbor_remaining)
-
-            # Verificar cuántos puentes ya existen entre estas islas
-            existing_bridge = self.game_state.get_bridge_between((row, col), neighbor)
-            if existing_bridge:
-                existing_count = existing_bridge[2]
-                max_bridges = min(max_bridges, 2 - existing_count)
-            else:
-                max_bridges = min(max_bridges, 2)
-
-            if max_bridges <= 0:
-                continue
-
-            # Intentar agregar puentes (primero 1, luego 2 para explorar más rápido)
-            for bridges_to_add in range(1, max_bridges + 1):
-                success = True
-                added_count = 0
-
-                # Verificar y agregar puentes
-                for _ in range(bridges_to_add):
-                    can_add, _ = self.game_state.can_add_bridge((row, col), neighbor)
-                    if not can_add:
-                        success = False
-                        break
-                    self.game_state.add_bridge((row, col), neighbor)
-                    self.solution_steps.append(((row, col), neighbor, "add"))
-                    added_count += 1
-
-                if not success:
-                    # Deshacer puentes agregados parcialmente
-                    for _ in range(added_count):
-                        self.game_state.remove_bridge((row, col), neighbor)
-                        if self.solution_steps and self.solution_steps[-1][2] == "add":
-                            self.solution_steps.pop()
-                    continue
-
-                # Recursión
-                if self._backtrack():
-                    return True
-
-                # Deshacer (backtrack)
-                for _ in range(bridges_to_add):
-                    self.game_state.remove_bridge((row, col), neighbor)
-                    if self.solution_steps and self.solution_steps[-1][2] == "add":
-                        self.solution_steps.pop()
-
-        return False
-
-    def start_visualization(self):
-        """Inicia la visualización paso a paso de la solución"""
-        self.solving = True
-        self.step_index = 0
-        self.game_state.reset()
-
-    def next_step(self):
-        """Ejecuta el siguiente paso de la solución"""
-        if self.step_index < len(self.solution_steps):
-            start, end, action = self.solution_steps[self.step_index]
-            if action == "add":
-                self.game_state.add_bridge(start, end)
-            self.step_index += 1
-            return True
-        return False
-
-
 class HashiwokakeroGame:
     """Clase principal que coordina el juego"""
 
-    def __init__(self, filename, auto_mode=False):
-        self.game_state = GameState(filename)
+    def __init__(self, filename, auto_mode=False, idle_mode=False, threaded=True, compact=False,
+                 cache_file=CACHE_FILE):
+        # Inicializar Pygame
+        pygame.init()
+        # compact: tablero en arrays y máscaras de bits (mucha menos memoria en tableros grandes)
+        self.game_state = (CompactGameState if compact else GameState)(filename)
         self.renderer = GameRenderer(self.game_state)
         self.player = HumanPlayer(self.game_state, self.renderer)
         self.auto_player = AutoPlayer(self.game_state)
+        # Sin hilos, la búsqueda avanza un trozo (SOLVE_SLICE_MS) en cada vuelta del bucle
+        self.auto_player.threaded = threaded
+        # Soluciones ya encontradas (también de este tablero girado o reflejado); None la desactiva
+        if cache_file is not None:
+            self.auto_player.cache = SolutionCache(cache_file)
+        # Pistas: el motor se construye al cargar el tablero, en un hilo si se usan hilos
+        self.hints = HintEngine(self.game_state)
+        if threaded:
+            threading.Thread(target=self.hints.build, daemon=True).start()
+        else:
+            self.hints.build()
+        self.history = History(self.game_state)  # Deshacer/rehacer del jugador
         self.auto_mode = auto_mode
-        self.auto_step_timer = 0
-        self.auto_step_delay = 5  # frames entre pasos (ajustable con +/-)
+        self.next_step_time = 0  # Instante (ms) del siguiente paso de la reproducción
+        self.next_progress_time = 0  # Instante (ms) de la siguiente consulta al hilo de resolución
+        self.auto_step_delay = AUTO_STEP_DELAY  # ms entre pasos (ajustable con +/-)
+        # Modo reposo: en lugar de repintar a 60 FPS, esperar eventos y redibujar solo si algo cambia
+        self.idle_mode = idle_mode
         self.show_instructions = True
 
     def reset_game(self):
@@ -766,66 +514,196 @@ class HashiwokakeroGame:
         self.renderer.selected_island = None
         self.renderer.show_message("Juego reiniciado", INFO_COLOR)
         self.auto_mode = False
-
-    def start_auto_solve(self):
-        """Inicia la resolución automática"""
-        self.game_state.reset()
+        self.history.record()
+
+    def undo(self, redo=False):
+        """Deshace (o rehace) el último cambio del tablero"""
+        if self.auto_mode:
+            return
+        if redo:
+            changed = self.history.redo()
+        else:
+            changed = self.history.undo()
+        if not changed:
+            self.renderer.show_message("Nada que rehacer" if redo else "Nada que deshacer", INFO_COLOR)
+            return
+        self.renderer.selected_island = None
+        self.hints.sync()
+
+    def show_hint(self):
+        """Muestra la siguiente pista para el tablero actual"""
+        if self.auto_mode:
+            return
+        if not self.hints.ready:
+            self.renderer.show_message("Calculando pistas...", INFO_COLOR)
+            return
+        self.renderer.show_hint(self.hints.hint())
+
+    def start_auto_solve(self, keep_bridges=False):
+        """Inicia la resolución automática en segundo plano.
+
+        Con keep_bridges se parte de los puentes del jugador y solo se
+        reproducen los que faltan. La reproducción empieza en cuanto hay
+        pasos conocidos, sin esperar a que termine la búsqueda.
+        """
+        if self.auto_player.solving:
+            return
+        if not keep_bridges:
+            self.game_state.reset()
         self.renderer.selected_island = None
-        if self.auto_player.solve():
-            self.auto_player.start_visualization()
-            self.auto_mode = True
-            self.renderer.show_message("Reproduciendo solución...", SUCCESS_COLOR, 120)
+        self.auto_player.start_background_solve()
+        self.auto_mode = True
+        self.next_step_time = pygame.time.get_ticks()
+        if self.auto_player.solving:
+            self.renderer.show_message("Resolviendo... (ESC para cancelar)", INFO_COLOR, 2000)
         else:
-            self.renderer.show_message("No se pudo resolver el puzzle", ERROR_COLOR, 120)
+            self.renderer.show_message("Solución recuperada de la caché", SUCCESS_COLOR, 2000)
+
+    def cancel_auto_solve(self):
+        """Cancela la resolución en segundo plano"""
+        self.auto_player.cancel_background_solve()
+        self.renderer.show_message("Cancelando...", INFO_COLOR)
+
+    def _update_auto_solve(self):
+        """Recoge los pasos y el progreso del hilo de resolución"""
+        task = self.auto_player.background
+        progress = task.progress()
+        if self.auto_player.update_background_solve():
+            self.renderer.progress_text = (f"Resolviendo: {progress['nodes']} nodos, profundidad {progress['depth']}, "
+                                           f"{progress['elapsed']:.1f} s")
+            return
+
+        self.renderer.progress_text = None
+        if task.found:
+            self.renderer.show_message("Reproduciendo solución...", SUCCESS_COLOR, 2000)
+        else:
+            # Volver a los puentes con que empezó la resolución
+            self.auto_mode = False
+            self.game_state.bridges = self.auto_player.initial_bridges
+            self.history.record()
+            conflict = self.auto_player.conflict
+            if task.cancelled:
+                self.renderer.show_message("Resolución cancelada", INFO_COLOR, 2000)
+            elif conflict:
+                self.renderer.highlight_edges([self.game_state.edges[edge_id] for edge_id in conflict], ERROR_COLOR)
+                text = ("Este puente no cabe en ninguna solución" if len(conflict) == 1
+                        else f"Estos {len(conflict)} puentes no caben juntos en ninguna solución")
+                self.renderer.show_message(text, ERROR_COLOR, 3000)
+            elif self.auto_player.conflict_undecided:
+                self.renderer.show_message("No se pudo comprobar si tus puentes caben en una solución", ERROR_COLOR,
+                                           3000)
+            else:
+                self.renderer.show_message("No se pudo resolver el puzzle", ERROR_COLOR, 2000)
 
     def run(self):
         """Bucle principal del juego"""
         clock = pygame.time.Clock()
         running = True
+        redraw = True
 
         while running:
-            for event in pygame.event.get():
+            deadline = self._next_deadline()
+            if self.idle_mode and not redraw:
+                # Dormir hasta el siguiente evento o hasta que venza un temporizador
+                if deadline is None:
+                    events = [pygame.event.wait()]
+                else:
+                    events = [pygame.event.wait(max(1, deadline - pygame.time.get_ticks()))]
+                events.extend(pygame.event.get())
+            else:
+                events = pygame.event.get()
+
+            for event in events:
+                if event.type == pygame.NOEVENT:
+                    continue
                 if event.type == pygame.QUIT:
                     running = False
+                elif self.renderer.handle_view_event(event):
+                    redraw = True
                 elif event.type == pygame.KEYDOWN:
+                    redraw = True
                     if event.key == pygame.K_ESCAPE:
-                        self.reset_game()
+                        if self.auto_player.solving:
+                            self.cancel_auto_solve()
+                        else:
+                            self.reset_game()
+                    elif event.key in (pygame.K_z, pygame.K_y) and event.mod & pygame.KMOD_CTRL:
+                        # Ctrl+Z deshace, Ctrl+Y (o Ctrl+Mayús+Z) rehace
+                        self.undo(redo=event.key == pygame.K_y or bool(event.mod & pygame.KMOD_SHIFT))
+                    elif event.key == pygame.K_h:
+                        self.show_hint()
                     elif event.key == pygame.K_SPACE:
                         # Presionar ESPACIO para resolver automáticamente
                         self.start_auto_solve()
+                    elif event.key == pygame.K_c:
+                        # C: completar a partir de los puentes del jugador
+                        self.start_auto_solve(keep_bridges=True)
                     elif event.key == pygame.K_PLUS or event.key == pygame.K_EQUALS:
                         # Aumentar velocidad
-                        self.auto_step_delay = max(1, self.auto_step_delay - 2)
-                        self.renderer.show_message(f"Velocidad: {self.auto_step_delay} frames/paso", INFO_COLOR, 60)
+                        self.auto_step_delay = max(MIN_AUTO_STEP_DELAY, self.auto_step_delay - AUTO_STEP_DELAY_CHANGE)
+                        self.renderer.show_message(f"Velocidad: {self.auto_step_delay} ms/paso", INFO_COLOR)
                     elif event.key == pygame.K_MINUS:
                         # Disminuir velocidad
-                        self.auto_step_delay = min(60, self.auto_step_delay + 2)
-                        self.renderer.show_message(f"Velocidad: {self.auto_step_delay} frames/paso", INFO_COLOR, 60)
-                else:
-                    if not self.auto_mode:
-                        self.player.handle_event(event)
+                        self.auto_step_delay = min(MAX_AUTO_STEP_DELAY, self.auto_step_delay + AUTO_STEP_DELAY_CHANGE)
+                        self.renderer.show_message(f"Velocidad: {self.auto_step_delay} ms/paso", INFO_COLOR)
+                elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    redraw = True
+                elif not self.auto_mode:
+                    self.player.handle_event(event)
+                    if event.type == pygame.MOUSEBUTTONDOWN:
+                        # Los clics pueden seleccionar islas o cambiar puentes
+                        redraw = True
+                        self.history.record()
+                        self.hints.sync()
+
+            now = pygame.time.get_ticks()
+            # Resolución en segundo plano: nuevos pasos y progreso
+            if self.auto_player.solving and now >= self.next_progress_time:
+                self.next_progress_time = now + (PROGRESS_INTERVAL if self.auto_player.threaded else 0)
+                self._update_auto_solve()
+                redraw = True
+
+            # Un mensaje que acaba de caducar hay que borrarlo de la pantalla
+            if deadline is not None and now >= deadline:
+                redraw = True
 
             # Modo automático: ejecutar siguiente paso
-            if self.auto_mode:
-                self.auto_step_timer += 1
-                if self.auto_step_timer >= self.auto_step_delay:
-                    self.auto_step_timer = 0
-                    if not self.auto_player.next_step():
-                        self.auto_mode = False
-                        if self.game_state.check_victory():
-                            self.renderer.show_message("¡Solución completada!", SUCCESS_COLOR, 180)
-
-            self.renderer.draw()
-            pygame.display.flip()
-            clock.tick(60)
+            if self.auto_mode and now >= self.next_step_time:
+                self.next_step_time = now + self.auto_step_delay
+                redraw = True
+                if not self.auto_player.next_step() and not self.auto_player.solving:
+                    self.auto_mode = False
+                    self.history.record()
+                    if self.game_state.check_victory():
+                        self.renderer.show_message("¡Solución completada!", SUCCESS_COLOR, 3000)
+
+            if redraw or not self.idle_mode:
+                self.renderer.draw()
+                pygame.display.flip()
+                redraw = False
+            if not self.idle_mode:
+                clock.tick(FPS)
 
         pygame.quit()
         sys.exit()
 
+    def _next_deadline(self):
+        """Próximo instante (ms) en que hay que redibujar aunque no lleguen eventos"""
+        deadlines = [self.renderer.message_deadline()]
+        if self.auto_mode:
+            deadlines.append(self.next_step_time)
+        if self.auto_player.solving:
+            deadlines.append(self.next_progress_time)
+        deadlines = [deadline for deadline in deadlines if deadline is not None]
+        return min(deadlines) if deadlines else None
+
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG if "--verbose" in sys.argv else logging.INFO, format="%(message)s")
     try:
-        game = HashiwokakeroGame("prueba.txt")
+        game = HashiwokakeroGame("prueba.txt", idle_mode="--idle" in sys.argv, threaded="--sliced" not in sys.argv,
+                                 compact="--compact" in sys.argv,
+                                 cache_file=None if "--no-cache" in sys.argv else CACHE_FILE)
         game.run()
     except FileNotFoundError:
         print("Error: No se encontró el archivo 'board.txt'")
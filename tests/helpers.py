@@ -0,0 +1,33 @@
+"""Utilidades comunes de las pruebas"""
+
+import itertools
+import os
+import random
+
+from hashi import GameState
+from hashi.generator import random_layout
+
+# Tableros de referencia de los benchmarks
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "corpus")
+
+
+def small_boards(count, size=5, density=0.45, seed=0):
+    """Tableros pequeños generados al azar (siempre los mismos para una semilla)"""
+    rng = random.Random(seed)
+    return [random_layout(size, size, density, rng)[0] for _ in range(count)]
+
+
+def is_solution(state, values):
+    """Comprobación directa: sin cruces y check_victory con esos puentes"""
+    for edge_id, count in enumerate(values):
+        if count and any(values[other] for other in state.edge_crossings[edge_id]):
+            return False
+    state = state.copy()
+    state.bridges = [(*state.edges[edge_id], count) for edge_id, count in enumerate(values) if count]
+    return state.check_victory()
+
+
+def brute_force_count(board):
+    """Número de soluciones probando todas las asignaciones (solo tableros diminutos)"""
+    state = GameState.from_board(board)
+    return sum(is_solution(state, values) for values in itertools.product(range(3), repeat=len(state.edges)))
@@ -0,0 +1,96 @@
+"""Pruebas de la caché de soluciones y sus simetrías"""
+
+import pytest
+
+from hashi import AutoPlayer, GameState
+from hashi.cache import SYMMETRIES, SolutionCache, canonical_form, inverse_point, transform_point
+
+from tests.helpers import small_boards
+
+
+def _transformed(board, symmetry):
+    """Tablero girado o reflejado con symmetry"""
+    rows, cols = len(board), len(board[0])
+    shape = (cols, rows) if symmetry[0] else (rows, cols)
+    result = [[0] * shape[1] for _ in range(shape[0])]
+    for row in range(rows):
+        for col in range(cols):
+            new_row, new_col = transform_point(symmetry, rows, cols, (row, col))
+            result[new_row][new_col] = board[row][col]
+    return result
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = SolutionCache(str(tmp_path / "cache.sqlite"))
+    yield cache
+    cache.close()
+
+
+@pytest.mark.parametrize("symmetry", SYMMETRIES)
+def test_inverse_point_undoes_transform(symmetry):
+    for point in [(0, 0), (2, 5), (3, 1)]:
+        assert inverse_point(symmetry, 4, 6, transform_point(symmetry, 4, 6, point)) == point
+
+
+def test_canonical_key_is_shared_by_all_symmetries():
+    board = small_boards(1, size=9, density=0.35, seed=5)[0]
+    keys = {canonical_form(GameState.from_board(_transformed(board, symmetry)))[1] for symmetry in SYMMETRIES}
+    assert len(keys) == 1
+
+
+@pytest.mark.parametrize("symmetry", SYMMETRIES)
+def test_cached_solution_replays_in_every_orientation(cache, symmetry):
+    board = small_boards(1, size=9, density=0.35, seed=6)[0]
+    first = AutoPlayer(GameState.from_board(board))
+    first.cache = cache
+    assert first.solve() and first.stats is not None
+
+    state = GameState.from_board(_transformed(board, symmetry))
+    player = AutoPlayer(state)
+    player.cache = cache
+    assert player.solve()
+    assert player.stats is None  # Sin búsqueda
+    player.start_visualization()
+    while player.next_step():
+        pass
+    assert state.check_victory()
+
+
+def test_cache_is_bounded(tmp_path):
+    cache = SolutionCache(str(tmp_path / "cache.sqlite"), max_entries=3)
+    for board in small_boards(6, size=8, density=0.35, seed=7):
+        player = AutoPlayer(GameState.from_board(board))
+        player.cache = cache
+        player.solve()
+    assert len(cache) == 3
+    cache.close()
+
+
+def test_invalid_cached_solution_falls_back_to_search(cache):
+    board = small_boards(1, size=9, density=0.35, seed=6)[0]
+    state = GameState.from_board(board)
+    first = AutoPlayer(state.copy())
+    assert first.solve()
+    values = list(first.game_state.edge_counts)
+    edge_id = next(edge_id for edge_id, count in enumerate(values) if count)
+    values[edge_id] = 3 - values[edge_id]  # Entrada corrupta: un puente de más o de menos
+    cache.store(state, values)
+
+    player = AutoPlayer(state)
+    player.cache = cache
+    player.threaded = False
+    assert player.start_background_solve() is not None  # Se busca de nuevo
+    assert (cache.hits, cache.misses) == (0, 1)  # La entrada rechazada no cuenta como acierto
+    while player.update_background_solve():
+        pass
+    player.start_visualization()
+    while player.next_step():
+        pass
+    assert state.check_victory()
+
+    player = AutoPlayer(GameState.from_board(board))
+    player.cache = cache
+    assert player.solve()
+    assert player.game_state.check_victory()
+    assert (cache.hits, cache.misses) == (1, 1)  # La búsqueda guardó la solución buena
@@ -0,0 +1,25 @@
+"""Pruebas de las colecciones de tableros"""
+
+import glob
+import os
+
+import pytest
+
+from hashi import GameState
+from hashi.collection import PuzzleCollection, pack_files
+from hashi.compact import CompactGameState
+
+from tests.helpers import CORPUS_DIR
+
+
+@pytest.mark.parametrize("backend", [GameState, CompactGameState])
+def test_loaders_agree(tmp_path, backend):
+    files = sorted(glob.glob(os.path.join(CORPUS_DIR, "07x07_*.txt")))
+    filename = str(tmp_path / "tableros.hashi")
+    pack_files(files, filename)
+    for index, path in enumerate(files):
+        state = backend.from_collection(filename, index)
+        with PuzzleCollection(filename) as collection:
+            other = collection.game_state(index, backend)
+        assert type(state) is type(other) is backend
+        assert list(state.islands) == list(other.islands) == GameState(path).islands
@@ -0,0 +1,63 @@
+"""Pruebas del motor de pistas"""
+
+import threading
+import time
+
+from hashi import EdgeSolver, GameState
+from hashi.hints import HINT_FORCED, HINT_NONE, HINT_SOLUTION, HINT_WRONG, HintEngine
+
+from tests.helpers import small_boards
+
+
+def test_hints_follow_the_solution():
+    for board in small_boards(10, size=7, density=0.4, seed=3):
+        state = GameState.from_board(board)
+        engine = HintEngine(state)
+        for _ in range(len(state.edges) * 2):
+            hint = engine.hint()
+            if hint.kind == HINT_NONE:
+                break
+            assert hint.kind in (HINT_FORCED, HINT_SOLUTION)
+            assert state.add_bridge(*hint.edge)
+        assert engine.solution is not None
+        assert state.check_victory()
+
+
+def test_build_on_another_thread():
+    board = small_boards(1, size=9, density=0.35, seed=6)[0]
+    state = GameState.from_board(board)
+    engine = HintEngine(state)
+    assert not engine.ready
+    engine.sync()  # Sin efecto hasta que el motor esté listo
+
+    thread = threading.Thread(target=engine.build)
+    thread.start()
+    thread.join()
+    assert engine.ready
+
+    # Un puente de más sobre la solución única
+    assert engine.solution is not None
+    edge_id = next(edge_id for edge_id, value in enumerate(engine.solution) if value < 2)
+    for _ in range(engine.solution[edge_id] + 1):
+        assert state.add_bridge(*state.edges[edge_id])
+    assert engine.hint().kind == HINT_WRONG
+
+
+def test_hint_waits_for_the_build_in_progress(monkeypatch):
+    built = []
+
+    class SlowSolver(EdgeSolver):
+        def __init__(self, *args, **kwargs):
+            built.append(threading.current_thread().name)
+            time.sleep(0.02)  # Da tiempo a pedir una pista a mitad de la construcción
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr("hashi.hints.EdgeSolver", SlowSolver)
+    engine = HintEngine(GameState.from_board(small_boards(1, size=7, density=0.4, seed=3)[0]))
+    thread = threading.Thread(target=engine.build, name="build")
+    thread.start()
+    while not built:
+        time.sleep(0.001)
+    assert engine.hint().kind == HINT_FORCED
+    thread.join()
+    assert built == ["build"] * 3  # Un solo build(), el del hilo
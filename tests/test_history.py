@@ -0,0 +1,82 @@
+"""Pruebas de deshacer/rehacer con instantáneas persistentes"""
+
+import random
+
+from hashi import GameState
+from hashi.history import History
+from hashi.persistent import PersistentVector
+
+from tests.helpers import small_boards
+
+
+def _random_moves(state, history, rng, count):
+    """Hace count cambios al azar guardando cada estado; devuelve los puentes de cada uno"""
+    states = [sorted(state.bridges)]
+    for _ in range(count):
+        edge_id = rng.randrange(len(state.edges))
+        start, end = state.edges[edge_id]
+        if state.edge_counts[edge_id] and rng.random() < 0.4:
+            state.remove_bridge(start, end)
+        elif state.can_add_edge(edge_id):
+            state.add_bridge(start, end)
+        else:
+            continue
+        history.record()
+        states.append(sorted(state.bridges))
+    return states
+
+
+def test_undo_redo_round_trip():
+    rng = random.Random(0)
+    state = GameState.from_board(small_boards(1, size=12, density=0.35, seed=3)[0])
+    history = History(state)
+    states = _random_moves(state, history, rng, 200)
+    final_hash = state.state_hash
+
+    for expected in reversed(states[:-1]):
+        assert history.undo()
+        assert sorted(state.bridges) == expected
+    assert not history.undo()
+    assert state.state_hash == GameState.from_board(state.board).state_hash
+
+    for expected in states[1:]:
+        assert history.redo()
+        assert sorted(state.bridges) == expected
+    assert not history.redo()
+    assert state.state_hash == final_hash
+
+
+def test_record_after_undo_drops_redo():
+    state = GameState.from_board([[2, 0, 2], [0, 0, 0], [2, 0, 2]])
+    history = History(state)
+    first, second = state.edges[:2]
+    state.add_bridge(*first)
+    history.record()
+    state.add_bridge(*second)
+    history.record()
+    assert history.undo()
+    state.remove_bridge(*first)
+    assert history.record()
+    assert not history.redo()
+    assert state.bridges == []
+
+
+def test_restore_keeps_incremental_indexes():
+    rng = random.Random(1)
+    state = GameState.from_board(small_boards(1, size=10, density=0.35, seed=4)[0])
+    snapshot = state.snapshot()
+    _random_moves(state, History(state), rng, 50)
+    state.restore(snapshot)
+    fresh = GameState.from_board(state.board)
+    assert state.bridges == [] and state.edge_counts == fresh.edge_counts
+    assert state.state_hash == fresh.state_hash
+    assert state.count_bridges_for_island(*state.islands[0][:2]) == 0
+
+
+def test_persistent_vector_versions_are_independent():
+    base = PersistentVector(range(100))
+    changed = base.set(40, -1).set(99, -2)
+    assert base.tolist() == list(range(100))
+    assert changed[40] == -1 and changed[99] == -2
+    assert sorted(changed.diff(base)) == [40, 99]
+    assert base.set(5, 5) is base
@@ -0,0 +1,28 @@
+"""Pruebas de la resolución paralela"""
+
+import os
+
+from hashi import GameState
+from hashi import parallel
+
+from tests.helpers import is_solution, small_boards
+
+
+def test_parallel_solve_statuses():
+    state = GameState.from_board(small_boards(1, size=10, density=0.3, seed=2)[0])
+    values, stats = parallel.parallel_solve(state, workers=2)
+    assert stats["status"] == "solved" and is_solution(state, values)
+
+    values, stats = parallel.parallel_solve(GameState.from_board([[1, 0, 1], [0, 0, 0], [1, 0, 1]]), workers=2)
+    assert values is None and stats["status"] == "unsolvable"
+
+
+def _dead_worker(*args):
+    os._exit(1)
+
+
+def test_dead_workers_are_not_unsolvable(monkeypatch):
+    monkeypatch.setattr(parallel, "_worker", _dead_worker)
+    state = GameState.from_board(small_boards(1, size=10, density=0.3, seed=2)[0])
+    values, stats = parallel.parallel_solve(state, workers=2)
+    assert values is None and stats["status"] == "error"
@@ -0,0 +1,162 @@
+"""Pruebas del solver: número de soluciones y soluciones válidas"""
+
+import os
+
+import pytest
+
+from hashi import AutoPlayer, EdgeSolver, GameState
+from hashi.solver import ConflictUndecided, SlicedSolve, minimal_conflict
+
+from tests.helpers import CORPUS_DIR, brute_force_count, is_solution, small_boards
+
+# Tableros con un número conocido de soluciones
+KNOWN_COUNTS = [
+    ([[1, 1]], 1),
+    ([[2, 0, 2]], 1),
+    ([[1, 0, 2, 0, 1]], 1),
+    ([[2, 0, 2], [0, 0, 0], [2, 0, 2]], 1),  # Dos puentes dobles dejarían dos componentes
+    ([[3, 0, 3], [0, 0, 0], [3, 0, 3]], 2),
+    ([[1, 0, 1], [0, 0, 0], [1, 0, 1]], 0),  # Dos parejas sueltas
+    ([[3, 1]], 0),
+]
+
+
+@pytest.mark.parametrize("board, expected", KNOWN_COUNTS)
+def test_count_solutions_known_boards(board, expected):
+    solver = EdgeSolver(GameState.from_board(board))
+    assert solver.count_solutions(10) == expected
+    assert not solver.limit_reached
+
+
+def test_count_solutions_matches_brute_force():
+    boards = [board for board in small_boards(60, size=4) if len(GameState.from_board(board).edges) <= 9]
+    assert len(boards) >= 20
+    for board in boards:
+        solver = EdgeSolver(GameState.from_board(board))
+        assert solver.count_solutions(100) == brute_force_count(board), board
+
+
+def test_count_solutions_stops_at_limit():
+    solver = EdgeSolver(GameState.from_board([[3, 0, 3], [0, 0, 0], [3, 0, 3]]))
+    assert solver.count_solutions(1) == 1
+
+
+def test_solve_returns_valid_solution():
+    for board in small_boards(20, size=8, density=0.35, seed=1):
+        state = GameState.from_board(board)
+        solver = EdgeSolver(state.copy())
+        assert solver.solve()
+        assert is_solution(state, solver.values())
+
+
+def test_auto_player_steps_replay_solution():
+    state = GameState.from_board(small_boards(1, size=10, density=0.3, seed=2)[0])
+    player = AutoPlayer(state)
+    assert player.solve()
+    player.start_visualization()
+    assert not state.bridges
+    while player.next_step():
+        pass
+    assert state.check_victory()
+
+
+def test_parallel_steps_replay_from_players_bridges():
+    state = GameState.from_board(small_boards(1, size=10, density=0.3, seed=2)[0])
+    solver = EdgeSolver(state.copy())
+    assert solver.solve()
+    values = solver.values()
+    placed = [edge_id for edge_id, count in enumerate(values) if count]
+
+    player = AutoPlayer(state)
+    state.add_bridge(*state.edges[placed[0]])
+    assert player.solve()  # Deja initial_bridges con el puente de antes
+
+    state.bridges = [(*state.edges[edge_id], values[edge_id]) for edge_id in placed[:len(placed) // 2]]
+    before = sorted(state.bridges)
+    assert player.solve_parallel(workers=2)
+    player.start_visualization()
+    assert sorted(state.bridges) == before
+    while player.next_step():
+        pass
+    assert state.check_victory()
+
+
+def test_solver_can_be_reused():
+    # Una búsqueda terminada deja su rama aplicada: la siguiente debe partir de cero
+    for board in small_boards(80, size=7, density=0.4, seed=9):
+        state = GameState.from_board(board)
+        expected = EdgeSolver(state.copy()).count_solutions(3)
+        solver = EdgeSolver(state.copy())
+        found = solver.solve()
+        assert found == (expected > 0)
+        assert solver.count_solutions(3) == expected, board
+        assert solver.count_solutions(3) == expected, board
+        solver.begin(3)
+        solver.begin(3)
+        solver.run()
+        assert solver.solutions == expected, board
+        fresh = EdgeSolver(state.copy())
+        assert solver.prepare() == fresh.prepare()
+        assert solver.domains == fresh.domains and solver.state_hash == fresh.state_hash
+
+
+def test_sliced_solve_reduces_conflict_in_slices():
+    state = GameState(os.path.join(CORPUS_DIR, "15x15_dense_1.txt"))
+    solver = EdgeSolver(state.copy())
+    assert solver.solve()
+    values = solver.values()
+    placed = [edge_id for edge_id, count in enumerate(values) if count]
+    for edge_id in placed[:len(placed) // 2]:
+        for _ in range(values[edge_id]):
+            state.add_bridge(*state.edges[edge_id])
+    # Un puente que no está en la solución (el tablero tiene solución única)
+    wrong = next(edge_id for edge_id, count in enumerate(values) if not count and state.can_add_edge(edge_id))
+    state.add_bridge(*state.edges[wrong])
+
+    task = SlicedSolve(state).start()
+    steps = 1
+    while not task.step(1):
+        steps += 1
+    assert not task.found
+    assert task.conflict == minimal_conflict(state)
+    assert steps > 2  # La reducción no se hace de una vez
+
+    task = SlicedSolve(state).start()
+    while task._reduction is None:
+        task.step(1)
+    task.cancel()
+    assert task.step(1)
+    assert task.cancelled
+
+
+def _with_solution_bridge(name):
+    """Tablero del corpus con un puente correcto ya colocado"""
+    state = GameState(os.path.join(CORPUS_DIR, name))
+    solver = EdgeSolver(state.copy())
+    assert solver.solve()
+    values = solver.values()
+    edge_id = next(edge_id for edge_id, count in enumerate(values) if count)
+    for _ in range(values[edge_id]):
+        state.add_bridge(*state.edges[edge_id])
+    return state
+
+
+def test_conflict_check_reports_its_limit():
+    state = _with_solution_bridge("15x15_dense_1.txt")
+    assert minimal_conflict(state) is None  # Caben
+    with pytest.raises(ConflictUndecided):
+        minimal_conflict(state, max_nodes=1)  # Sin nodos para comprobarlo
+
+
+def test_auto_player_gives_up_when_conflict_is_undecided(monkeypatch):
+    def undecided(game_state):
+        raise ConflictUndecided("límite")
+
+    monkeypatch.setattr("hashi.solver.minimal_conflict", undecided)
+    state = GameState.from_board([[1, 0, 2, 0, 1]])
+    state.add_bridge((0, 0), (0, 2))
+    state.add_bridge((0, 0), (0, 2))  # Sobra un puente: no hay solución
+    player = AutoPlayer(state)
+    assert not player.solve()
+    assert player.conflict is None and player.conflict_undecided
+    assert state.edge_counts == [2, 0]
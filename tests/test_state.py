@@ -0,0 +1,62 @@
+"""Pruebas de la carga del tablero"""
+
+import pytest
+
+from hashi import GameState
+from hashi.batch import solve_file
+from hashi.compact import CompactGameState
+
+from tests.helpers import small_boards
+
+
+def _write(tmp_path, text):
+    path = tmp_path / "board.txt"
+    path.write_text(text)
+    return str(path)
+
+
+def test_sparse_and_dense_formats_agree(tmp_path):
+    dense = GameState(_write(tmp_path, "3,3\n201\n000\n101\n"))
+    sparse = GameState(_write(tmp_path, "3,3,4\n2,2,1\n0,0,2\n0,2,1\n2,0,1\n"))
+    assert dense.islands == sparse.islands and dense.edges == sparse.edges
+
+
+@pytest.mark.parametrize("backend", [GameState, CompactGameState])
+@pytest.mark.parametrize("text", [
+    "3,3,3\n0,0,12\n0,2,1\n2,0,1\n",  # Disperso con un valor mayor que 8
+    "3,3\n901\n000\n100\n",  # Denso con un 9
+    "3,3,2\n0,0,1\n0,2,-1\n",
+])
+def test_clues_out_of_range_are_rejected(tmp_path, backend, text):
+    with pytest.raises(ValueError, match="fuera de rango"):
+        backend(_write(tmp_path, text))
+
+
+def test_batch_reports_invalid_clue(tmp_path):
+    result = solve_file(_write(tmp_path, "3,3,3\n0,0,12\n0,2,1\n2,0,1\n"))
+    assert result["status"] == "error" and "fuera de rango" in result["error"]
+
+
+def test_island_outside_board_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="fuera del tablero"):
+        GameState(_write(tmp_path, "3,3,2\n0,0,1\n3,0,1\n"))
+
+
+@pytest.mark.parametrize("backend", [GameState, CompactGameState])
+def test_copies_do_not_share_changes(backend):
+    state = backend.from_board(small_boards(1, size=9, density=0.4, seed=2)[0])
+    movable = [edge_id for edge_id in range(len(state.edges)) if state.can_add_edge(edge_id)]
+    state.add_bridge(*state.edges[movable[0]])
+    before = (sorted(state.bridges), state.state_hash, state.snapshot())
+
+    copy = state.copy()
+    copy.add_bridge(*copy.edges[movable[0]])
+    copy.remove_bridge(*copy.edges[movable[0]])
+    copy.remove_bridge(*copy.edges[movable[0]])
+    assert (sorted(state.bridges), state.state_hash, state.snapshot()) == before
+    assert not copy.bridges and list(copy.snapshot()) == [0] * len(copy.edges)
+
+    other = state.copy()
+    state.add_bridge(*state.edges[movable[-1]])
+    assert sorted(other.bridges) == before[0] and other.state_hash == before[1]
+    assert state.snapshot()[movable[-1]] == 1 and other.snapshot()[movable[-1]] == 0
@@ -0,0 +1,62 @@
+"""Pruebas de la verificación por lotes frente a check_victory"""
+
+import random
+
+import pytest
+
+from hashi import EdgeSolver, GameState
+
+from tests.helpers import is_solution, small_boards
+
+np = pytest.importorskip("numpy")
+
+from hashi.verify import BatchVerifier, assignment_matrix  # noqa: E402
+
+
+def _candidates(state, solution, count, rng):
+    """La solución, mutaciones de ella y asignaciones al azar"""
+    candidates = [list(solution)]
+    for _ in range(count):
+        candidate = list(solution)
+        if rng.random() < 0.3:
+            candidate = [rng.choice((0, 0, 1, 2)) for _ in solution]
+        else:
+            for _ in range(rng.randint(1, 3)):
+                candidate[rng.randrange(len(candidate))] = rng.randint(0, 2)
+        candidates.append(candidate)
+    return candidates
+
+
+def test_batch_matches_check_victory():
+    rng = random.Random(0)
+    valid = 0
+    for board in small_boards(10, size=10, density=0.35, seed=8):
+        state = GameState.from_board(board)
+        solver = EdgeSolver(state.copy())
+        assert solver.solve()
+        candidates = _candidates(state, solver.values(), 100, rng)
+        verdicts = BatchVerifier(state).verify(np.array(candidates))
+        expected = [is_solution(state, candidate) for candidate in candidates]
+        assert verdicts.tolist() == expected
+        valid += sum(expected)
+    assert valid >= 10
+
+
+def test_disconnected_candidate_is_rejected():
+    # Dos cuadrados separados: cada isla cumple su número pero no hay conexión
+    half = [[2, 0, 2], [0, 0, 0], [2, 0, 2]]
+    state = GameState.from_board([row + [0] + row for row in half])
+    candidate = [0 if start[1] < 3 < end[1] else 1 for start, end in state.edges]
+    checks = BatchVerifier(state).checks([candidate])
+    assert checks["clues"][0] and checks["no_crossings"][0]
+    assert not checks["connected"][0] and not checks["valid"][0]
+
+
+def test_assignment_matrix_formats():
+    state = GameState.from_board([[2, 0, 2], [0, 0, 0], [2, 0, 2]])
+    per_edge = [1] * len(state.edges)
+    bridges = [(*edge, 1) for edge in state.edges]
+    as_dict = {edge: 1 for edge in state.edges}
+    matrix = assignment_matrix(state, [per_edge, bridges, as_dict])
+    assert (matrix == 1).all()
+    assert BatchVerifier(state).verify(matrix).all()